@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+RSS解析性能对比
+用cache/rss_feeds中缓存的RSS内容比较快速解析与feedparser的耗时和内存峰值，
+计时前先检查发布时间的解析结果，以及两者对同一条目计算的发布时间戳（published_ts）是否一致
+
+用法: python benchmarks/bench_feed_parser.py [--repeat 5] [--cache-dir cache/rss_feeds]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from diskcache import Cache
+from collect_rss import parse_with_feedparser
+from date_parser import parse_timestamp
+from fast_feed_parser import FastParseError, parse_fast
+
+
+# 各源常见的日期格式，feedparser会解析错（日期错误或把无时区的时间当作UTC），两种解析结果必须一致
+SAMPLE_DATES = [
+    'Fri, 25 Jul 2025 09:31:40 +0000',
+    'Fri, 25 Jul 2025 09:31:40 GMT',
+    'Fri, 25 Jul 2025 17:31:40',
+    'Fri, 25 Jul 2025 17:31:40 CST',
+    '2025-07-25T09:31:40+08:00',
+    '2025-07-25 09:31:40',
+    '2025/7/25 1:26:00',
+    '2025.07.25 10:30',
+    '2025年7月25日 10:30',
+    '1753407100',
+]
+SAMPLE_FEED = ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>sample</title>'
+               + ''.join(f'<item><title>{index}</title><link>https://example.com/{index}</link>'
+                         f'<pubDate>{date}</pubDate></item>' for index, date in enumerate(SAMPLE_DATES))
+               + '</channel></rss>')
+
+
+# 同一时刻（北京时间2025-07-25 10:30）的各种写法，没有时区的按DEFAULT_TZ（UTC+8）处理，CST为中国标准时间
+EXPECTED_TIMESTAMPS = {
+    'Fri, 25 Jul 2025 10:30:00': 1753410600,
+    'Fri, 25 Jul 2025 10:30:00 +0800': 1753410600,
+    'Fri, 25 Jul 2025 10:30:00 CST': 1753410600,
+    'Fri, 25 Jul 2025 02:30:00 GMT': 1753410600,
+    '2025-07-25 10:30:00': 1753410600,
+    '2025-07-25T10:30:00+08:00': 1753410600,
+    '2025年7月25日 10:30': 1753410600,
+}
+
+
+def check_date_parser():
+    """
+    检查parse_timestamp对各种日期写法的解析结果
+    Returns:
+        与预期不一致的 (日期, 解析结果, 预期) 列表
+    """
+    return [(value, parse_timestamp(value), expected) for value, expected in EXPECTED_TIMESTAMPS.items()
+            if parse_timestamp(value) != expected]
+
+
+def check_timestamps(feeds):
+    """
+    检查快速解析与feedparser对同一条目计算的发布时间戳是否一致
+    Args:
+        feeds: (名称, RSS内容) 列表，只包含可走快速解析的源
+    Returns:
+        不一致的 (名称, 发布时间, 快速解析结果, feedparser结果) 列表
+    """
+    mismatches = []
+    for name, content in feeds:
+        fast = parse_fast(content)
+        slow = parse_with_feedparser(content)
+        slow_timestamps = {(entry['link'], entry['guid']): timestamp
+                           for entry, timestamp in zip(slow['entries'], slow['timestamps'])}
+        for entry, timestamp in zip(fast['entries'], fast['timestamps']):
+            key = (entry['link'], entry['guid'])
+            if key in slow_timestamps and slow_timestamps[key] != timestamp:
+                mismatches.append((name, entry['published'], timestamp, slow_timestamps[key]))
+    return mismatches
+
+
+def load_cached_feeds(cache_dir):
+    """读取缓存中的RSS内容，复制到临时目录读取，避免改动仓库中的缓存文件"""
+    feeds = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        copy_dir = os.path.join(tmp_dir, 'cache')
+        shutil.copytree(cache_dir, copy_dir)
+        with Cache(copy_dir) as cache:
+            for key in cache.iterkeys():
+                value = cache.get(key)
+                # 兼容旧的纯文本缓存和新的带校验信息的缓存
+                if isinstance(value, dict):
+                    value = value.get('body')
+                if isinstance(value, str) and value:
+                    feeds.append((key, value))
+    return feeds
+
+
+def measure(func, feeds, repeat):
+    """返回每轮平均耗时（秒）和单轮内存峰值（字节）"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _, content in feeds:
+            func(content)
+    elapsed = (time.perf_counter() - started) / repeat
+    tracemalloc.start()
+    for _, content in feeds:
+        func(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对比快速解析与feedparser的性能')
+    parser.add_argument('--repeat', type=int, default=5, help='重复轮数')
+    parser.add_argument('--cache-dir', default='cache/rss_feeds', help='RSS缓存目录')
+    args = parser.parse_args()
+
+    feeds = load_cached_feeds(args.cache_dir) if os.path.isdir(args.cache_dir) else []
+
+    fast_feeds = []
+    for url, content in feeds:
+        try:
+            parse_fast(content)
+            fast_feeds.append((url, content))
+        except FastParseError:
+            pass
+    wrong_dates = check_date_parser()
+    for value, parsed, expected in wrong_dates:
+        print(f"发布时间解析错误 {value!r}: {parsed}，应为 {expected}")
+    if wrong_dates:
+        sys.exit(1)
+    mismatches = check_timestamps([('sample', SAMPLE_FEED)] + fast_feeds)
+    for name, published, fast, slow in mismatches:
+        print(f"发布时间戳不一致 {name}: {published!r} 快速解析 {fast}，feedparser {slow}")
+    if mismatches:
+        sys.exit(1)
+    print(f"快速解析与feedparser的发布时间戳一致（含 {len(SAMPLE_DATES)} 种样例日期格式）")
+
+    if not feeds:
+        print(f"{args.cache_dir} 中没有缓存的RSS内容")
+        sys.exit(1)
+    total_chars = sum(len(content) for _, content in fast_feeds)
+    print(f"共 {len(feeds)} 个缓存源，其中 {len(fast_feeds)} 个可走快速解析，"
+          f"合计 {total_chars / 1024:.0f} K字符\n")
+
+    results = [
+        ('feedparser', measure(parse_with_feedparser, fast_feeds, args.repeat)),
+        ('fast_path', measure(parse_fast, fast_feeds, args.repeat)),
+    ]
+    baseline = results[0][1][0]
+    print(f"{'解析器':<12}{'每轮耗时(ms)':>14}{'内存峰值(KB)':>14}{'加速比':>10}")
+    for name, (elapsed, peak) in results:
+        print(f"{name:<12}{elapsed * 1000:>14.1f}{peak / 1024:>14.0f}{baseline / elapsed:>10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
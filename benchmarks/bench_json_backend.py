@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+JSON序列化性能对比
+用raw_news中的新闻比较标准库json与orjson（已安装时）读写新闻文件的耗时：
+- 整个列表：JSON数组，缩进格式（news_format为json时的文件）
+- 逐行：每条新闻一行的紧凑格式（news_format为jsonl时的文件）
+
+用法: python benchmarks/bench_json_backend.py [--news output/raw_news.jsonl] [--repeat 5] [--copies 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from json_backend import BACKENDS
+from news_io import find_news_file, load_news
+
+
+def timed(func, repeat):
+    """返回每轮平均耗时（秒）和最后一轮的结果"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def run_cases(backend, records):
+    """返回各项操作的 (名称, 函数)"""
+    document = backend.dumps(records)
+    lines = [backend.dumps(record, compact=True) for record in records]
+    return [
+        ('读取整个列表', lambda: backend.loads(document)),
+        ('写入整个列表', lambda: backend.dumps(records)),
+        ('逐行读取', lambda: [backend.loads(line) for line in lines]),
+        ('逐行写入', lambda: [backend.dumps(record, compact=True) for record in records]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对比标准库json与orjson读写新闻文件的耗时')
+    parser.add_argument('--news', default=None, help='新闻文件（JSON或JSON Lines），默认为raw_news')
+    parser.add_argument('--repeat', type=int, default=5, help='重复轮数')
+    parser.add_argument('--copies', type=int, default=1, help='将新闻重复多少份，模拟更大的文件')
+    args = parser.parse_args()
+
+    news_path = args.news or find_news_file('output/raw_news')
+    records = [item.to_dict() for item in load_news(news_path)] * args.copies
+    if not records:
+        raise SystemExit(f"{news_path}: 没有新闻")
+    size = len(BACKENDS['json'].dumps(records).encode('utf-8'))
+    print(f"{news_path}: {len(records)} 条新闻，缩进格式 {size / 1024 / 1024:.1f} MB")
+    if len(BACKENDS) == 1:
+        print("未安装orjson，只测试标准库json")
+
+    results = {}
+    for name, backend in BACKENDS.items():
+        for case, func in run_cases(backend, records):
+            elapsed, result = timed(func, args.repeat)
+            results.setdefault(case, {})[name] = (elapsed, result)
+
+    names = list(BACKENDS)
+    print(f"{'':<10}" + ''.join(f"{name + '(ms)':>14}" for name in names) + (f"{'加速比':>10}" if len(names) > 1 else ''))
+    for case, timings in results.items():
+        outputs = [result for _, result in timings.values()]
+        if any(output != outputs[0] for output in outputs):
+            raise SystemExit(f"{case}: 各实现的结果不一致")
+        row = f"{case:<10}" + ''.join(f"{timings[name][0] * 1000:>14.1f}" for name in names)
+        if len(names) > 1:
+            row += f"{timings['json'][0] / timings[names[-1]][0]:>10.1f}x"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+关键词匹配性能对比
+比较逐个关键词执行 `in` 的原实现与编译后的KeywordMatcher在筛选（标题）和分组（标题+描述+正文）上的耗时，
+并用从新闻中随机抽取的词扩充关键词列表，观察关键词数量增长时的变化
+
+用法: python benchmarks/bench_keyword_matcher.py [--news output/raw_news.jsonl] [--repeat 5] [--sizes 200 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import yaml
+from keyword_matcher import KeywordMatcher
+from news_io import find_news_file, load_news
+
+
+def naive_contains(text, keywords):
+    """原utils.contains_keywords的实现"""
+    if not text or not keywords:
+        return False
+    text_lower = text.lower()
+    return any(keyword.lower() in text_lower for keyword in keywords)
+
+
+def naive_extract(text, keywords):
+    """原generate_github_pages.extract_keywords_from_text的实现"""
+    text_lower = text.lower()
+    return [keyword for keyword in keywords if keyword.lower() in text_lower]
+
+
+def full_text(news):
+    return f"{news.get('title', '')} {news.get('description', '')} {news.get('content', '')}"
+
+
+def sample_keywords(texts, count, seed=0):
+    """从新闻标题中随机截取2~4个字符作为额外的关键词"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        text = rng.choice(texts).strip()
+        if len(text) < 4:
+            continue
+        length = rng.randint(2, 4)
+        start = rng.randrange(len(text) - length + 1)
+        word = text[start:start + length].strip()
+        if len(word) >= 2:
+            words.add(word)
+    return sorted(words)
+
+
+def timed(func, repeat):
+    """返回每轮平均耗时（秒）和最后一轮的结果"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def run_case(name, news_list, include, exclude, repeat):
+    titles = [news.get('title', '') for news in news_list]
+    texts = [full_text(news) for news in news_list]
+
+    def naive_filter():
+        return [t for t in titles if naive_contains(t, include) and not naive_contains(t, exclude)]
+
+    def naive_group():
+        return [naive_extract(text, include) for text in texts]
+
+    compile_started = time.perf_counter()
+    include_matcher = KeywordMatcher(include)
+    exclude_matcher = KeywordMatcher(exclude)
+    compile_ms = (time.perf_counter() - compile_started) * 1000
+
+    def matcher_filter():
+        return [t for t in titles if include_matcher.contains(t) and not exclude_matcher.contains(t)]
+
+    def matcher_group():
+        return [include_matcher.matches(text) for text in texts]
+
+    rows = []
+    for stage, baseline, candidate in (('筛选', naive_filter, matcher_filter),
+                                       ('分组', naive_group, matcher_group)):
+        baseline_time, expected = timed(baseline, repeat)
+        candidate_time, actual = timed(candidate, repeat)
+        if expected != actual:
+            raise SystemExit(f"{name}/{stage}: 匹配结果不一致")
+        rows.append((stage, baseline_time, candidate_time))
+
+    print(f"{name}: {len(include)} 个包含关键词, {len(exclude)} 个排除关键词, 编译耗时 {compile_ms:.1f} ms")
+    for stage, baseline_time, candidate_time in rows:
+        print(f"  {stage:<4}{baseline_time * 1000:>12.1f}{candidate_time * 1000:>12.1f}"
+              f"{baseline_time / candidate_time:>10.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对比逐个关键词匹配与KeywordMatcher的性能')
+    parser.add_argument('--news', default=None, help='新闻文件（JSON或JSON Lines），默认依次尝试raw_news和filtered_news')
+    parser.add_argument('--keywords', default='config/keywords.yaml', help='关键词配置')
+    parser.add_argument('--repeat', type=int, default=5, help='重复轮数')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[200, 1000], help='扩充后的包含关键词数量')
+    args = parser.parse_args()
+
+    news_path = args.news
+    if news_path is None:
+        candidates = [find_news_file('output/raw_news'), find_news_file('output/filtered_news')]
+        news_path = next((path for path in candidates if os.path.exists(path)), candidates[-1])
+    news_list = load_news(news_path)
+    with open(args.keywords, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    include = config.get('include_keywords', [])
+    exclude = config.get('exclude_keywords', [])
+    total_chars = sum(len(full_text(news)) for news in news_list)
+    print(f"{news_path}: {len(news_list)} 条新闻，合计 {total_chars / 1024:.0f} K字符")
+    print(f"{'':<6}{'原实现(ms)':>12}{'匹配器(ms)':>12}{'加速比':>10}")
+
+    run_case('当前配置', news_list, include, exclude, args.repeat)
+    titles = [news.get('title', '') for news in news_list]
+    for size in args.sizes:
+        extra = sample_keywords(titles, max(size - len(include), 0))
+        run_case(f'{size}个关键词', news_list, include + extra, exclude, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+新闻条目内存占用对比
+用tracemalloc统计同一批新闻分别保存为dict和NewsItem时的内存占用：
+- 收集时的dict：source、category来自同一个源配置（共享），collected_at每条新生成一个字符串
+- 读取的dict：从文件逐行json.loads，每条新闻的每个字符串各自独立
+- NewsItem：从文件读取后转为NewsItem（slots、source/category驻留、整数收集时间、content与description相同时共用）
+
+用法: python benchmarks/bench_news_item.py [--news output/raw_news.jsonl] [--copies 1]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from news_io import find_news_file, load_news
+from news_item import NewsItem
+
+
+def measure(build):
+    """返回build()结果占用的内存（字节）、耗时（秒）和结果"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对比新闻条目保存为dict和NewsItem时的内存占用')
+    parser.add_argument('--news', default=None, help='新闻文件（JSON或JSON Lines），默认为raw_news')
+    parser.add_argument('--copies', type=int, default=1, help='将新闻重复多少份，模拟更大的批次')
+    args = parser.parse_args()
+
+    news_path = args.news or find_news_file('output/raw_news')
+    records = [item.to_dict() for item in load_news(news_path)] * args.copies
+    if not records:
+        raise SystemExit(f"{news_path}: 没有新闻")
+    lines = [json.dumps(record, ensure_ascii=False) for record in records]
+    sources = {}
+
+    def collected_dicts():
+        # 收集时的构造方式：源配置中的字符串共享，collected_at逐条格式化
+        result = []
+        for record in json.loads('[' + ','.join(lines) + ']'):
+            shared = sources.setdefault((record.get('source'), record.get('category')),
+                                        (record.get('source'), record.get('category')))
+            record['source'], record['category'] = shared
+            record['collected_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            result.append(record)
+        return result
+
+    cases = [
+        ('读取的dict', lambda: [json.loads(line) for line in lines]),
+        ('收集时的dict', collected_dicts),
+        ('NewsItem', lambda: [NewsItem(json.loads(line)) for line in lines]),
+    ]
+    print(f"{news_path}: {len(records)} 条新闻")
+    print(f"{'':<14}{'合计(KB)':>12}{'每条(字节)':>12}{'耗时(ms)':>12}{'比读取的dict':>14}")
+    sizes = {}
+    for name, build in cases:
+        size, elapsed, result = measure(build)
+        if name == 'NewsItem' and [item.to_dict() for item in result] != [json.loads(line) for line in lines]:
+            raise SystemExit("NewsItem序列化结果与原数据不一致")
+        del result
+        sizes[name] = size
+        change = (size / sizes['读取的dict'] - 1) * 100
+        print(f"{name:<14}{size / 1024:>12.0f}{size / len(records):>12.0f}{elapsed * 1000:>12.1f}"
+              f"{change:>+13.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,9 +5,13 @@ GitHub Pages 设置助手
 """
 
 import os
-import json
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from news_io import save_news
+
 def check_github_pages_setup():
     """检查GitHub Pages设置状态"""
     print("🔍 检查GitHub Pages设置状态...")
@@ -55,12 +59,12 @@ def generate_sample_data():
         }
     ]
     
-    # 保存示例数据
-    os.makedirs("output", exist_ok=True)
-    with open("output/filtered_news.json", "w", encoding="utf-8") as f:
-        json.dump(sample_news, f, ensure_ascii=False, indent=2)
+    # 保存示例数据，与流水线相同的JSON Lines格式，每行一条新闻
+    if not save_news(sample_news, "output/filtered_news.jsonl"):
+        print("❌ 示例数据生成失败")
+        return
     
-    print("✅ 示例数据已生成到 output/filtered_news.json")
+    print("✅ 示例数据已生成到 output/filtered_news.jsonl")
 
 def test_github_pages_generation():
     """测试GitHub Pages生成功能"""
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+原子文件写入
+直接以'w'打开目标文件写入时，运行中断会留下被截断的文件，下一阶段读取时当作空数据或格式错误。
+所有输出和状态文件都通过这里写入：
+- 先写入同目录下的临时文件，fsync后用os.replace替换目标文件，读取方任何时候看到的都是完整的旧文件或新文件
+- 内容与现有文件相同时不替换，文件的修改时间不变，也不会产生无意义的git变更
+- 可选为文件生成 <文件名>.sha256 校验和（sha256sum格式，可用 sha256sum -c 检查），读取检查点时校验
+"""
+import hashlib
+import logging
+import os
+import uuid
+from functools import lru_cache
+from typing import Optional, Union
+
+import json_backend
+
+CHECKSUM_SUFFIX = '.sha256'
+_CHUNK_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=1)
+def checksums_enabled() -> bool:
+    """是否默认生成校验和，由config/collector.json中的checksums决定"""
+    try:
+        with open('config/collector.json', 'r', encoding='utf-8') as f:
+            return bool(json_backend.load(f).get('checksums', False))
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def checksum_path(path: str) -> str:
+    """校验和文件的路径"""
+    return path + CHECKSUM_SUFFIX
+
+
+def file_checksum(path: str) -> str:
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_checksum(path: str) -> Optional[bool]:
+    """
+    校验文件内容
+    Args:
+        path: 文件路径
+    Returns:
+        与校验和文件一致返回True，不一致返回False，没有校验和文件时返回None
+    """
+    try:
+        with open(checksum_path(path), 'r', encoding='utf-8') as f:
+            expected = f.read().split()[0]
+    except (OSError, IndexError):
+        return None
+    return file_checksum(path) == expected
+
+
+def _same_content(first: str, second: str) -> bool:
+    """逐块比较两个文件的内容"""
+    if os.path.getsize(first) != os.path.getsize(second):
+        return False
+    with open(first, 'rb') as a, open(second, 'rb') as b:
+        while True:
+            chunk = a.read(_CHUNK_SIZE)
+            if chunk != b.read(_CHUNK_SIZE):
+                return False
+            if not chunk:
+                return True
+
+
+def _fsync_directory(directory: str):
+    """同步目录，使替换操作本身落盘；不支持的平台（Windows）忽略"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class AtomicFile:
+    """
+    原子写入的文件，用法与open相同：
+        with AtomicFile('output/a.json') as f:
+            f.write(...)
+    正常退出时提交（内容相同时不替换），发生异常时丢弃临时文件，目标文件保持不变
+    """
+
+    def __init__(self, path: str, mode: str = 'w', encoding: Optional[str] = 'utf-8',
+                 checksum: Optional[bool] = None, skip_unchanged: bool = True):
+        """
+        Args:
+            path: 目标文件路径
+            mode: 'w'（文本）或'wb'（二进制）
+            encoding: 文本模式的编码
+            checksum: 是否生成校验和文件，默认由config/collector.json中的checksums决定
+            skip_unchanged: 内容与现有文件相同时不替换
+        """
+        if mode not in ('w', 'wb'):
+            raise ValueError(f"不支持的写入模式: {mode}")
+        self.path = path
+        self.checksum = checksums_enabled() if checksum is None else checksum
+        self.skip_unchanged = skip_unchanged
+        # 提交后为True（已替换）或False（内容未变化）
+        self.changed: Optional[bool] = None
+        self.directory = os.path.dirname(path) or '.'
+        os.makedirs(self.directory, exist_ok=True)
+        # 临时文件与目标文件在同一目录，保证os.replace是同一文件系统内的原子操作
+        self.temp_path = os.path.join(self.directory, f'.{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.tmp')
+        if mode == 'wb':
+            self.file = open(self.temp_path, 'xb')
+        else:
+            self.file = open(self.temp_path, 'x', encoding=encoding)
+
+    def __enter__(self):
+        return self.file
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def commit(self) -> bool:
+        """
+        提交写入的内容
+        Returns:
+            bool: 替换了目标文件返回True，内容未变化返回False
+        """
+        if self.changed is not None:
+            return self.changed
+        try:
+            self.file.flush()
+            if self.skip_unchanged and os.path.exists(self.path) and _same_content(self.temp_path, self.path):
+                self.file.close()
+                os.remove(self.temp_path)
+                self.changed = False
+            else:
+                os.fsync(self.file.fileno())
+                self.file.close()
+                os.replace(self.temp_path, self.path)
+                _fsync_directory(self.directory)
+                self.changed = True
+        except BaseException:
+            self.discard()
+            raise
+        if self.checksum and (self.changed or not os.path.exists(checksum_path(self.path))):
+            atomic_write(checksum_path(self.path),
+                         f'{file_checksum(self.path)}  {os.path.basename(self.path)}\n', checksum=False)
+        if not self.changed:
+            logging.debug(f"内容未变化，跳过写入: {self.path}")
+        return self.changed
+
+    def discard(self):
+        """放弃写入，删除临时文件"""
+        if not self.file.closed:
+            self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+def atomic_write(path: str, data: Union[str, bytes], encoding: str = 'utf-8',
+                 checksum: Optional[bool] = None, skip_unchanged: bool = True) -> bool:
+    """
+    原子地写入整个文件
+    Args:
+        path: 目标文件路径
+        data: 文本或字节
+        encoding: 文本的编码
+        checksum: 是否生成校验和文件，默认由配置决定
+        skip_unchanged: 内容与现有文件相同时不替换
+    Returns:
+        bool: 替换了目标文件返回True，内容未变化返回False
+    Raises:
+        OSError: 写入失败，目标文件保持不变
+    """
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    writer = AtomicFile(path, mode, encoding if mode == 'w' else None, checksum, skip_unchanged)
+    with writer as f:
+        f.write(data)
+    return writer.changed
+
+
+def atomic_copy(source: str, path: str, checksum: Optional[bool] = None, skip_unchanged: bool = True) -> bool:
+    """
+    原子地复制文件
+    Args:
+        source: 源文件
+        path: 目标文件
+        checksum: 是否生成校验和文件，默认由配置决定
+        skip_unchanged: 内容与现有文件相同时不替换
+    Returns:
+        bool: 替换了目标文件返回True，内容未变化返回False
+    """
+    writer = AtomicFile(path, 'wb', None, checksum, skip_unchanged)
+    with writer as f, open(source, 'rb') as src:
+        for chunk in iter(lambda: src.read(_CHUNK_SIZE), b''):
+            f.write(chunk)
+    return writer.changed
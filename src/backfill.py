@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+历史存档回填
+修改关键词后重新筛选output/archive中的历史新闻：按文件名顺序流式读取存档，分块交给进程池筛选，
+各进程在启动时接收一次编译好的关键词规则，结果按提交顺序合并，输出与运行次数和进程数无关
+"""
+import glob
+import logging
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from keyword_rules import KeywordRules
+from news_io import iter_news
+from news_item import NewsItem
+from seen_index import entry_key
+
+DEFAULT_ARCHIVE_DIR = 'output/archive'
+DEFAULT_PATTERNS = ('raw_news_*.md', 'raw_news_*.json', 'raw_news_*.jsonl', 'raw_news_*.jsonl.gz')
+DEFAULT_OUTPUT = 'output/backfill_filtered_news.json'
+DEFAULT_CHUNK_SIZE = 2000
+# 每个进程最多排队的分块数，限制内存中同时存在的分块
+MAX_PENDING_PER_WORKER = 2
+# 进度报告的最小间隔（秒）
+PROGRESS_INTERVAL = 5
+
+_ITEM_RE = re.compile(r'^- \[(?P<title>.*)\]\((?P<link>\S*)\)\s*$')
+_SOURCE_RE = re.compile(r'^\s+- 来源: (?P<source>.*?)\s*$')
+_PUBLISHED_RE = re.compile(r'^\s+- 发布时间: (?P<published>.*?)\s*$')
+
+# 工作进程中的关键词规则，由_init_worker设置
+_worker_rules: Optional[KeywordRules] = None
+
+
+def archive_files(archive_dir: str = DEFAULT_ARCHIVE_DIR, patterns: Iterable[str] = DEFAULT_PATTERNS) -> List[str]:
+    """
+    列出需要回填的存档文件
+    Args:
+        archive_dir: 存档目录
+        patterns: 文件名通配符
+    Returns:
+        按文件名（即存档时间）排序的文件路径
+    """
+    files = set()
+    for pattern in patterns:
+        files.update(glob.glob(os.path.join(archive_dir, pattern)))
+    return sorted(files, key=os.path.basename)
+
+
+def parse_markdown_archive(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    逐条读取generate_markdown生成的存档
+    存档中只有标题、链接、来源和发布时间
+    Args:
+        path: 存档文件路径
+    Yields:
+        新闻条目
+    """
+    item = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = _ITEM_RE.match(line)
+            if match:
+                if item:
+                    yield item
+                item = NewsItem(title=match.group('title'), link=match.group('link'),
+                                source='', published='')
+                continue
+            if item is None:
+                continue
+            match = _SOURCE_RE.match(line)
+            if match:
+                item['source'] = match.group('source')
+                continue
+            match = _PUBLISHED_RE.match(line)
+            if match:
+                item['published'] = match.group('published')
+    if item:
+        yield item
+
+
+def iter_archive_items(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    依次读取存档文件中的新闻，支持Markdown存档和JSON/JSON Lines新闻文件
+    Args:
+        paths: 存档文件路径
+    Yields:
+        新闻条目
+    """
+    for path in paths:
+        try:
+            if path.endswith('.md'):
+                yield from parse_markdown_archive(path)
+            else:
+                yield from iter_news(path)
+        except (OSError, ValueError) as e:
+            logging.error(f"读取存档失败 {path}: {e}")
+
+
+def chunked(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """将新闻流切分为固定大小的分块"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _init_worker(rules: KeywordRules):
+    """工作进程初始化：保存编译好的关键词规则"""
+    global _worker_rules
+    _worker_rules = rules
+
+
+def _filter_chunk(chunk: List[Dict[str, Any]]) -> List[int]:
+    """在工作进程中筛选一个分块，只返回保留条目的序号以减少进程间传输"""
+    return _worker_rules.select(chunk)
+
+
+def _ordered_results(chunks: Iterator[List[Dict[str, Any]]], rules: KeywordRules, workers: int):
+    """
+    按提交顺序产生 (分块, 保留序号)
+    workers为1时在当前进程中执行；否则同时排队的分块数有上限，存档不会被一次性读入内存
+    """
+    if workers <= 1:
+        _init_worker(rules)
+        for chunk in chunks:
+            yield chunk, _filter_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rules,)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(_filter_chunk, chunk)))
+            if len(pending) >= workers * MAX_PENDING_PER_WORKER:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+def backfill(rules: KeywordRules, paths: List[str], workers: Optional[int] = None,
+             chunk_size: int = DEFAULT_CHUNK_SIZE, dedupe: bool = True) -> Dict[str, Any]:
+    """
+    用关键词规则重新筛选存档中的新闻
+    Args:
+        rules: 编译后的关键词规则
+        paths: 存档文件路径，按顺序读取
+        workers: 进程数，默认为CPU核数
+        chunk_size: 每个分块的条目数
+        dedupe: 是否去除多个存档中重复出现的新闻（保留最早的一条）
+    Returns:
+        包含news（保留的新闻）、scanned、matched、duplicates的结果
+    """
+    workers = workers or os.cpu_count() or 1
+    started = last_report = time.time()
+    scanned = matched = duplicates = 0
+    seen = set()
+    news = []
+    chunks = chunked(iter_archive_items(paths), chunk_size)
+    for chunk, kept in _ordered_results(chunks, rules, workers):
+        scanned += len(chunk)
+        for index in kept:
+            item = chunk[index]
+            matched += 1
+            if dedupe:
+                key = entry_key(item)
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+            news.append(item)
+        now = time.time()
+        if now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            print(f"已处理 {scanned} 条，命中 {matched} 条，{scanned / (now - started):.0f} 条/秒")
+    elapsed = time.time() - started
+    logging.info(f"回填完成: {len(paths)} 个存档，处理 {scanned} 条，命中 {matched} 条，"
+                 f"去重 {duplicates} 条，耗时 {elapsed:.1f} 秒（{workers} 个进程）")
+    return {'news': news, 'scanned': scanned, 'matched': matched, 'duplicates': duplicates}
@@ -1,218 +1,492 @@
 #!/usr/bin/env python3
+import argparse
+import calendar
 import feedparser
-import json
 import os
 import sys
 import time
-import requests
 import logging
-from datetime import datetime, timedelta
-from diskcache import Cache
-from utils import load_config, save_json_data, format_datetime
+import requests
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from date_parser import parse_timestamp
+from collection_metrics import build_collection_metrics, write_collection_metrics
+from http_client import get_http_client
+from fast_feed_parser import FastParseError, parse_fast
+from feed_cache import FeedCache, ParsedEntryCache, DEFAULT_TTL, DEFAULT_RETENTION
+from scheduler import create_scheduler, extract_feed_hints
+from seen_index import SeenIndex, STATUS_SEEN, DEFAULT_RETENTION_DAYS
+from source_health import (STATE_BACKOFF, get_health_status, is_due,
+                           load_health_options, record_fetch_result)
+from url_dedup import DEFAULT_TRACKING_PARAMS, DEFAULT_TRACKING_VALUES, EntryDeduplicator, UrlCanonicalizer
+from news_io import news_path, save_news
+from news_item import NewsItem
+from news_snapshot import write_run_snapshot
+from utils import load_config, save_json_data
+
+# 默认并发收集线程数
+DEFAULT_MAX_WORKERS = 8
+
+
+def load_collector_config():
+    """加载收集器配置"""
+    return load_config('config/collector.json') or {}
+
+
+def create_deduplicator(collector_config):
+    """根据配置创建按链接去重器，未启用时返回None"""
+    dedup_config = collector_config.get('url_dedup', {})
+    if not dedup_config.get('enabled', True):
+        return None
+    return EntryDeduplicator(UrlCanonicalizer(
+        dedup_config.get('tracking_params', DEFAULT_TRACKING_PARAMS),
+        dedup_config.get('tracking_values', DEFAULT_TRACKING_VALUES)
+    ))
+
+
+def entry_timestamp(entry):
+    """返回feedparser条目的发布时间（UTC时间戳），缺失时返回None
+
+    与快速解析一样先用parse_timestamp解析原始日期字符串：feedparser会把"2025年7月25日 10:30"等格式
+    解析成错误的日期，没有时区的时间按UTC而不是DEFAULT_TZ处理，只在parse_timestamp无法解析时才使用
+    feedparser的解析结果。
+    """
+    timestamp = parse_timestamp(entry.get('published') or entry.get('updated') or '')
+    if timestamp is not None:
+        return timestamp
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    return calendar.timegm(parsed) if parsed else None
+
+
+def new_fetch_result():
+    """创建抓取结果记录，健康状态根据该记录更新"""
+    return {
+        'ok': False,
+        'status_code': None,
+        'error': None,
+        'parse_error': False,
+        'cache_status': None,
+        'latency_ms': None,
+        'ttfb_ms': None,
+        'transfer_ms': None,
+        'bytes': None,
+        'wire_bytes': None,
+        'parse_cache': None,
+        'parse_ms': None,
+        'entries': 0
+    }
+
+
+def fetch_feed_content(source, cache, fetch_result, due=True):
+    """获取RSS源内容，优先使用缓存并通过条件请求重新验证
+
+    Args:
+        source (dict): RSS源配置，可通过cache_ttl设置该源的缓存新鲜期（秒）
+        cache (FeedCache): 条件请求缓存
+        fetch_result (dict): 抓取结果记录，原地写入状态码、缓存状态、耗时和字节数
+        due (bool): 调度器判断该源是否到期，未到期且有缓存时直接使用缓存
+
+    Returns:
+        str: RSS内容
+    """
+    name = source.get('name', '未知源')
+    url = source.get('url', '')
+    ttl = source.get('cache_ttl', cache.default_ttl)
+    entry = cache.get(url)
+    # 未到抓取时间，使用上次抓取的内容
+    if not due and entry:
+        logging.info(f"源 {name} 未到抓取时间，使用缓存内容")
+        fetch_result['cache_status'] = 'scheduled'
+        return entry['body']
+    # 新鲜期内直接使用缓存
+    if cache.is_fresh(entry, ttl):
+        logging.info(f"从缓存获取 {name} 的内容")
+        fetch_result['cache_status'] = 'fresh'
+        return entry['body']
+
+    logging.info(f"从网络获取 {name} 的内容")
+    started = time.perf_counter()
+    response = get_http_client().get(url, headers=FeedCache.conditional_headers(entry), stream=True)
+    # elapsed为发出请求到解析完响应头的时间（含DNS解析和建立连接），其余为传输响应体的时间
+    fetch_result['ttfb_ms'] = round(response.elapsed.total_seconds() * 1000, 1)
+    body = response.content
+    fetch_result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    fetch_result['transfer_ms'] = round(max(fetch_result['latency_ms'] - fetch_result['ttfb_ms'], 0), 1)
+    fetch_result['status_code'] = response.status_code
+    fetch_result['bytes'] = len(body)
+    # 压缩传输时实际接收的字节数
+    fetch_result['wire_bytes'] = response.raw.tell()
+    if response.status_code == 304 and entry:
+        # 内容未变化，复用缓存内容
+        logging.info(f"{name} 内容未变化 (304)，使用缓存内容")
+        fetch_result['cache_status'] = 'not_modified'
+        cache.refresh(url, entry, response.headers.get('ETag'),
+                      response.headers.get('Last-Modified'), ttl)
+        return entry['body']
+    if response.status_code == 304:
+        # 没有缓存内容时不会发送条件请求，304的响应体为空，不能当作新内容缓存
+        raise requests.HTTPError("返回304但没有可用的缓存内容", response=response)
+    response.raise_for_status()
+    fetch_result['cache_status'] = 'miss'
+    content = response.text
+    # 存入缓存，空响应不缓存，避免在新鲜期内一直使用空内容
+    if content:
+        cache.store(url, content, response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'), ttl)
+    return content
+
+
+def parse_feed(content, max_entries=None, max_bytes=None, fast_path=True):
+    """解析RSS内容，返回规范化的条目
+
+    格式规范的RSS 2.0/Atom优先使用流式快速解析，格式错误或其他格式回退到feedparser。
+
+    Args:
+        content (str): RSS内容
+        max_entries (int, optional): 最多返回的条目数
+        max_bytes (int, optional): 快速解析最多读取的字符数
+        fast_path (bool): 是否尝试快速解析
+
+    Returns:
+        dict: entries为条目字段列表，timestamps为对应的发布时间戳，
+              error为解析失败原因，warning为已自动纠正的编码问题
+    """
+    if fast_path:
+        try:
+            return parse_fast(content, max_entries, max_bytes)
+        except FastParseError as e:
+            logging.debug(f"快速解析失败，回退到feedparser: {e}")
+    return parse_with_feedparser(content, max_entries)
+
+
+def parse_with_feedparser(content, max_entries=None):
+    """用feedparser解析RSS内容，返回结构与parse_feed相同
+
+    Args:
+        content (str): RSS内容
+        max_entries (int, optional): 最多返回的条目数
+
+    Returns:
+        dict: 解析结果
+    """
+    feed = feedparser.parse(content)
+    parsed = {'entries': [], 'timestamps': [], 'error': None, 'warning': None}
+    if feed.bozo > 0:
+        if isinstance(feed.bozo_exception, feedparser.CharacterEncodingOverride):
+            parsed['warning'] = str(feed.bozo_exception)
+        else:
+            parsed['error'] = str(feed.bozo_exception)
+            return parsed
+
+    for entry in feed.entries[:max_entries]:
+        # 尝试获取内容
+        if hasattr(entry, 'content'):
+            content_value = entry.content[0].value if entry.content else ''
+        else:
+            content_value = entry.get('summary', '')
+        parsed['entries'].append({
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'guid': entry.get('id', ''),
+            'description': entry.get('description', ''),
+            'published': entry.get('published', ''),
+            'content': content_value
+        })
+        parsed['timestamps'].append(entry_timestamp(entry))
+    return parsed
+
+
+def collect_source(source, cache, parsed_cache, parser_options, health_status, health_options,
+                   current_time, due=True):
+    """收集单个RSS源的内容
+
+    Args:
+        source (dict): RSS源配置，可通过max_entries/max_bytes覆盖解析上限
+        cache (FeedCache): 共享的条件请求缓存
+        parsed_cache (ParsedEntryCache): 共享的解析结果缓存
+        parser_options (dict): 解析配置，包含fast_path、max_entries、max_bytes
+        health_status (dict): 健康状态快照（只读）
+        health_options (dict): 健康检查配置，未启用时为None
+        current_time (datetime): 本次运行的时间
+        due (bool): 调度器判断该源是否到期
+
+    Returns:
+        dict: 包含news、invalid_sources、fetch_result、schedule（供调度器学习，
+              未访问网络时为None）、更新后的health_status（无更新时为None）、
+              skipped（跳过原因）和duration_ms（处理耗时）
+    """
+    name = source.get('name', '未知源')
+    url = source.get('url', '')
+    category = source.get('category', 'general')
+    enabled = source.get('enabled', True)
+    fetch_result = new_fetch_result()
+    result = {'news': [], 'invalid_sources': [], 'fetch_result': fetch_result,
+              'schedule': None, 'health_status': None, 'skipped': None, 'duration_ms': None}
+    started = time.perf_counter()
+
+    # 如果源已手动禁用，跳过处理
+    if not enabled:
+        logging.info(f"源 {name} 已手动禁用，跳过处理")
+        result['skipped'] = 'disabled'
+        return result
+
+    # 现有RSS收集逻辑
+    if not url:
+        logging.warning(f"跳过无效源: {name}")
+        result['skipped'] = 'no_url'
+        return result
+
+    source_status = None
+    # 健康检查：处于退避期的源本次跳过
+    if health_options:
+        source_status = get_health_status(health_status, url)
+        if not is_due(source_status, current_time):
+            logging.info(f"源 {name} 连续失败 {source_status['consecutive_failures']} 次，"
+                         f"退避至 {source_status['next_attempt_at']}，跳过处理")
+            result['skipped'] = 'backoff'
+            return result
+
+    logging.info(f"正在收集: {name}")
+    try:
+        content = fetch_feed_content(source, cache, fetch_result, due)
+        max_entries = source.get('max_entries', parser_options.get('max_entries'))
+        max_bytes = source.get('max_bytes', parser_options.get('max_bytes'))
+        fast_path = parser_options.get('fast_path', True)
+        # 解析参数不同时解析结果也不同，作为缓存键的一部分
+        variant = f'{fast_path}:{max_entries}:{max_bytes}'
+        parsed = parsed_cache.get(content, variant)
+        if parsed is None:
+            parse_started = time.perf_counter()
+            parsed = parse_feed(content, max_entries, max_bytes, fast_path)
+            fetch_result['parse_ms'] = round((time.perf_counter() - parse_started) * 1000, 2)
+            fetch_result['parse_cache'] = 'miss'
+            parsed_cache.set(content, parsed, variant)
+        else:
+            logging.debug(f"{name} 内容未变化，使用已解析的条目")
+            fetch_result['parse_cache'] = 'hit'
+        fetch_result['entries'] = len(parsed['entries'])
+
+        # 检查RSS解析错误
+        if parsed['warning']:
+            logging.warning(f"{name} RSS解析警告: {parsed['warning']}")
+            logging.info("已自动纠正编码问题")
+        if parsed['error']:
+            logging.warning(f"{name} RSS解析警告: {parsed['error']}")
+            logging.error(f"{name} RSS解析失败: {parsed['error']}")
+            # 解析失败也计入健康状态
+            fetch_result['parse_error'] = True
+            fetch_result['error'] = f'RSS解析失败: {parsed["error"]}'
+            result['invalid_sources'].append({
+                'name': name,
+                'url': url,
+                'reason': fetch_result['error'],
+                'timestamp': current_time.isoformat()
+            })
+        else:
+            fetch_result['ok'] = True
+            # 同一个源的条目共用一个收集时间戳，序列化时才格式化为collected_at
+            collected_ts = int(time.time())
+            for entry, timestamp in zip(parsed['entries'], parsed['timestamps']):
+                item = NewsItem(
+                    title=entry['title'],
+                    link=entry['link'],
+                    guid=entry['guid'],
+                    description=entry['description'],
+                    published=entry['published'],
+                    # 发布时间的UTC时间戳，后续排序和展示都使用该字段
+                    published_ts=timestamp,
+                    source=name,
+                    category=category,
+                    content=entry['content']
+                )
+                item.collected_ts = collected_ts
+                result['news'].append(item)
+
+            # 访问了网络时记录发布时间和频率提示，供调度器学习
+            if fetch_result['cache_status'] in ('miss', 'not_modified'):
+                result['schedule'] = {
+                    'hints': extract_feed_hints(content),
+                    'entry_timestamps': parsed['timestamps']
+                }
+
+            # 检查该源是否产生了0条新闻
+            if not result['news']:
+                result['invalid_sources'].append({
+                    'name': name,
+                    'url': url,
+                    'reason': '0条新闻',
+                    'timestamp': current_time.isoformat()
+                })
+
+    except Exception as e:
+        logging.error(f"收集 {name} 时出错: {str(e)}")
+        fetch_result['error'] = f'收集出错: {str(e)}'
+        result['invalid_sources'].append({
+            'name': name,
+            'url': url,
+            'reason': fetch_result['error'],
+            'timestamp': current_time.isoformat()
+        })
+
+    # 根据抓取结果更新健康状态，直接使用缓存时未访问网络，不计入健康状态
+    if source_status is not None and (fetch_result['cache_status'] not in ('fresh', 'scheduled')
+                                      or not fetch_result['ok']):
+        result['health_status'] = record_fetch_result(source_status, fetch_result, current_time, health_options)
+        if source_status['state'] == STATE_BACKOFF:
+            logging.warning(f"源 {name} 连续失败 {source_status['consecutive_failures']} 次，"
+                            f"下次尝试时间: {source_status['next_attempt_at']}")
+    result['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
 
-def collect_rss_feeds():
-    """收集RSS源内容"""
+def collect_rss_feeds(max_workers=None, incremental=None):
+    """收集RSS源内容
+
+    各源在线程池中并发收集，结果按配置中的源顺序合并，输出顺序与串行收集一致。
+    合并时按规范化链接去重，重复条目合并到最先出现的条目中。
+    所有条目都会写入已收集条目索引，增量模式下只返回新增或内容有变化的条目。
+
+    Args:
+        max_workers (int, optional): 并发线程数，默认读取config/collector.json中的max_workers
+        incremental (bool, optional): 是否只返回新增条目，默认读取config/collector.json中的incremental
+
+    Returns:
+        list: 新闻列表
+    """
     # 加载配置
     rss_sources = load_config('config/rss-sources.json')
     health_config = load_config('config/health-check.json')
     health_status = load_config('config/rss-health-status.json') or {}
-    
+    collector_config = load_collector_config()
+
     # 用于记录无效RSS源
     invalid_sources = []
-    
+
     if not rss_sources:
         logging.error("未找到RSS源配置")
         return []
-    
+
     # 健康检查功能开关
-    health_check_enabled = health_config.get('enabled', False)
-    failure_threshold = health_config.get('failure_threshold', 3)
-    check_interval = timedelta(hours=health_config.get('check_interval_hours', 24))
-    timeout = health_config.get('timeout_seconds', 10)
-    auto_disable = health_config.get('auto_disable', True)
-    
-    all_news = []
+    health_options = load_health_options(health_config)
+
+    if max_workers is None:
+        max_workers = collector_config.get('max_workers', DEFAULT_MAX_WORKERS)
+    max_workers = max(1, min(int(max_workers), len(rss_sources)))
+
+    deduplicator = create_deduplicator(collector_config)
+    all_news = deduplicator.items if deduplicator else []
     current_time = datetime.now()
-    
-    for source in rss_sources:
-        name = source.get('name', '未知源')
-        url = source.get('url', '')
-        category = source.get('category', 'general')
-        enabled = source.get('enabled', True)
-        
-        # 如果源已手动禁用，跳过处理
-        if not enabled:
-            logging.info(f"源 {name} 已手动禁用，跳过处理")
-            continue
-            
-        # 健康检查功能处理
-        if health_check_enabled:
-            # 获取源的健康状态
-            source_status = health_status.get(url, {
-                'failures': 0,
-                'last_check': None,
-                'disabled': False,
-                'last_disabled_time': None
-            })
-            
-            # 如果源已被自动禁用，检查是否超过检查间隔
-            if source_status['disabled']:
-                if source_status['last_disabled_time']:
-                    last_disabled = datetime.fromisoformat(source_status['last_disabled_time'])
-                    if current_time - last_disabled < check_interval:
-                        logging.info(f"源 {name} 因多次失败已被自动禁用，跳过处理")
-                        continue
-                    else:
-                        # 超过检查间隔，尝试重新启用并检查
-                        logging.info(f"源 {name} 自动禁用时间已过，尝试重新检查")
-                        source_status['disabled'] = False
-                        source_status['failures'] = 0
-                else:
-                    # 没有禁用时间记录，视为需要重新检查
-                    source_status['disabled'] = False
-                    source_status['failures'] = 0
-            
-            # 执行健康检查
-            try:
-                # 发送HEAD请求检查URL是否可达
-                response = requests.head(url, timeout=timeout, allow_redirects=True)
-                if response.status_code < 400:
-                    # URL可达，重置失败计数
-                    source_status['failures'] = 0
-                    source_status['last_check'] = current_time.isoformat()
-                    logging.debug(f"源 {name} 健康检查通过")
-                else:
-                    # HTTP状态码错误
-                    raise Exception(f"HTTP状态码错误: {response.status_code}")
-            except Exception as e:
-                # 健康检查失败
-                source_status['failures'] += 1
-                source_status['last_check'] = current_time.isoformat()
-                logging.warning(f"源 {name} 健康检查失败 ({source_status['failures']}/{failure_threshold}): {str(e)}")
-                
-                # 达到失败阈值，自动禁用
-            if source_status['failures'] >= failure_threshold and auto_disable:
-                source_status['disabled'] = True
-                source_status['last_disabled_time'] = current_time.isoformat()
-                logging.error(f"源 {name} 连续失败 {failure_threshold} 次，已自动禁用")
-                health_status[url] = source_status
-                invalid_sources.append({
-                    'name': name,
-                    'url': url,
-                    'reason': f'健康检查失败{source_status["failures"]}次',
-                    'timestamp': current_time.isoformat()
-                })
-                continue
-            
-            # 更新健康状态
-            health_status[url] = source_status
-            
-            # 如果检查后被禁用，跳过处理
-            if source_status['disabled']:
-                continue
-        
-        # 现有RSS收集逻辑
-        if not url:
-            logging.warning(f"跳过无效源: {name}")
-            continue
-            
-        logging.info(f"正在收集: {name}")
-        try:
-            # 初始化缓存，设置1小时超时
-            with Cache('cache/rss_feeds', timeout=3600) as cache:
-                # 尝试从缓存获取
-                cached_content = cache.get(url)
-                if cached_content:
-                    logging.info(f"从缓存获取 {name} 的内容")
-                    feed = feedparser.parse(cached_content)
-                else:
-                    logging.info(f"从网络获取 {name} 的内容")
-                    response = requests.get(url, timeout=10)
-                    response.raise_for_status()
-                    content = response.text
-                    # 存入缓存
-                    cache.set(url, content)
-                    feed = feedparser.parse(content)
-            
-            # 检查RSS解析错误
-            if feed.bozo > 0:
-                logging.warning(f"{name} RSS解析警告: {feed.bozo_exception}")
-                if isinstance(feed.bozo_exception, feedparser.CharacterEncodingOverride):
-                    logging.info("已自动纠正编码问题")
-                else:
-                    logging.error(f"{name} RSS解析失败: {feed.bozo_exception}")
-                    # 解析失败也计入健康状态
-                    if health_check_enabled:
-                        source_status['failures'] += 1
-                        health_status[url] = source_status
-                    invalid_sources.append({
-                        'name': name,
-                        'url': url,
-                        'reason': f'RSS解析失败: {feed.bozo_exception}',
-                        'timestamp': current_time.isoformat()
-                    })
-                    continue
-            
-            for entry in feed.entries:
-                news_item = {
-                    'title': entry.get('title', ''),
-                    'link': entry.get('link', ''),
-                    'description': entry.get('description', ''),
-                    'published': entry.get('published', ''),
-                    'source': name,
-                    'category': category,
-                    'collected_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # 尝试获取内容
-                if hasattr(entry, 'content'):
-                    news_item['content'] = entry.content[0].value if entry.content else ''
+    run_started = time.perf_counter()
+
+    # 自适应调度，未到期的源使用缓存内容
+    scheduler = create_scheduler(collector_config)
+    schedule_time = datetime.now(timezone.utc)
+    due_flags = [scheduler.is_due(source, schedule_time) if scheduler else True for source in rss_sources]
+    if scheduler:
+        logging.info(f"本次到期需要抓取的源 {sum(due_flags)}/{len(rss_sources)} 个")
+
+    logging.info(f"使用 {max_workers} 个线程并发收集 {len(rss_sources)} 个源")
+    # 初始化条件请求缓存
+    feed_cache = FeedCache(
+        'cache/rss_feeds',
+        default_ttl=collector_config.get('cache_ttl_seconds', DEFAULT_TTL),
+        retention=collector_config.get('cache_retention_seconds', DEFAULT_RETENTION)
+    )
+    parser_options = collector_config.get('parser', {})
+    parsed_cache = ParsedEntryCache(
+        'cache/parsed_entries',
+        retention=collector_config.get('cache_retention_seconds', DEFAULT_RETENTION)
+    )
+    with feed_cache as cache, parsed_cache:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # executor.map按提交顺序返回结果，保证输出顺序确定
+            results = list(executor.map(
+                lambda source, due: collect_source(source, cache, parsed_cache, parser_options,
+                                                   health_status, health_options, current_time, due),
+                rss_sources, due_flags
+            ))
+            for source, result in zip(rss_sources, results):
+                if deduplicator:
+                    deduplicator.extend(result['news'])
                 else:
-                    news_item['content'] = entry.get('summary', '')
-                
-                all_news.append(news_item)
-            
-            # 检查该源是否产生了0条新闻
-            if not any(n['source'] == name for n in all_news):
-                invalid_sources.append({
-                    'name': name,
-                    'url': url,
-                    'reason': '0条新闻',
-                    'timestamp': current_time.isoformat()
-                })
-                
-        except Exception as e:
-            logging.error(f"收集 {name} 时出错: {str(e)}")
-            if health_check_enabled:
-                source_status['failures'] += 1
-                health_status[url] = source_status
-            invalid_sources.append({
-                'name': name,
-                'url': url,
-                'reason': f'收集出错: {str(e)}',
-                'timestamp': current_time.isoformat()
-            })
-    
+                    all_news.extend(result['news'])
+                invalid_sources.extend(result['invalid_sources'])
+                if result['health_status'] is not None:
+                    health_status[source.get('url', '')] = result['health_status']
+
+    if deduplicator and deduplicator.duplicates:
+        logging.info(f"按链接合并重复新闻 {deduplicator.duplicates} 条")
+
+    # 更新已收集条目索引
+    if incremental is None:
+        incremental = collector_config.get('incremental', False)
+    with SeenIndex(collector_config.get('seen_index_path', 'cache/seen_entries.db')) as seen_index:
+        entry_states = seen_index.update(all_news)
+        seen_index.prune(collector_config.get('seen_retention_days', DEFAULT_RETENTION_DAYS))
+    new_news = [item for item, status in entry_states if status != STATUS_SEEN]
+    logging.info(f"其中新增或有更新的新闻 {len(new_news)} 条")
+
+    # 按列保存本次收集的快照，用于历史统计
+    snapshot_config = collector_config.get('snapshot', {})
+    if snapshot_config.get('enabled', False):
+        write_run_snapshot(entry_states, snapshot_config, current_time)
+
+    new_counts = Counter(item['source'] for item in new_news)
+
+    # 保存每个源的收集指标
+    write_collection_metrics(
+        build_collection_metrics(rss_sources, results, new_counts, current_time,
+                                 time.perf_counter() - run_started),
+        collector_config.get('metrics', {})
+    )
+
+    # 根据本次抓取结果更新调度状态
+    if scheduler:
+        for source, result in zip(rss_sources, results):
+            if result['schedule']:
+                scheduler.record(source, result['schedule']['hints'], result['schedule']['entry_timestamps'],
+                                 new_counts.get(source.get('name', '未知源'), 0), schedule_time)
+        scheduler.save()
+
     # 保存健康状态
-    if health_check_enabled:
+    if health_options:
         save_json_data(health_status, 'config/rss-health-status.json')
-    
+
     # 保存无效RSS源信息
     if invalid_sources:
         save_json_data(invalid_sources, 'output/invalid_rss_sources.json')
-    
+
     logging.info(f"总共收集到 {len(all_news)} 条新闻")
+    if incremental:
+        return new_news
     return all_news
 
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='收集RSS源内容')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='并发收集的线程数（默认读取config/collector.json）')
+    parser.add_argument('--incremental', action='store_true', default=None,
+                        help='只输出新增或内容有变化的新闻')
+    return parser.parse_args()
+
+
 def main():
     """主函数"""
+    args = parse_args()
     print("开始收集RSS内容...")
     # 收集RSS内容
-    news_data = collect_rss_feeds()
-    if news_data:
+    incremental = args.incremental
+    if incremental is None:
+        incremental = load_collector_config().get('incremental', False)
+    news_data = collect_rss_feeds(max_workers=args.workers, incremental=incremental)
+    if news_data or incremental:
+        # 增量模式下没有新增新闻也是正常结果
         # 保存原始数据
-        output_file = 'output/raw_news.json'
-        if save_json_data(news_data, output_file):
+        output_file = news_path('output/raw_news')
+        if save_news(news_data, output_file):
             print(f"原始数据已保存到: {output_file}")
         else:
             print("保存原始数据失败")
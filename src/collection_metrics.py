@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+RSS收集指标
+记录每个源的耗时、状态码、字节数、缓存命中情况、解析耗时和条目数，
+输出为JSON文件和Prometheus textfile，便于找出拖慢收集的源
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from atomic_io import atomic_write
+from utils import save_json_data
+
+# 每个源输出为Prometheus指标的字段：(字段, 指标名, 说明)
+PROMETHEUS_SOURCE_METRICS = [
+    ('duration_ms', 'news_rss_source_duration_milliseconds', '处理该源的总耗时'),
+    ('latency_ms', 'news_rss_source_fetch_milliseconds', 'HTTP请求总耗时'),
+    ('ttfb_ms', 'news_rss_source_ttfb_milliseconds', '收到响应头的耗时（含DNS解析和建立连接）'),
+    ('transfer_ms', 'news_rss_source_transfer_milliseconds', '传输响应体的耗时'),
+    ('parse_ms', 'news_rss_source_parse_milliseconds', '解析耗时'),
+    ('status_code', 'news_rss_source_http_status', 'HTTP状态码'),
+    ('bytes', 'news_rss_source_bytes', '响应体字节数（解压后）'),
+    ('wire_bytes', 'news_rss_source_wire_bytes', '实际接收的字节数'),
+    ('entries', 'news_rss_source_entries', '解析出的条目数'),
+    ('new_entries', 'news_rss_source_new_entries', '新增或有更新的条目数'),
+    ('ok', 'news_rss_source_up', '本次收集是否成功'),
+]
+
+
+def build_collection_metrics(sources: List[Dict[str, Any]], results: List[Dict[str, Any]],
+                             new_counts: Dict[str, int], run_time: datetime,
+                             total_seconds: float) -> Dict[str, Any]:
+    """
+    汇总本次收集的指标
+    Args:
+        sources: RSS源配置列表
+        results: 与sources一一对应的collect_source结果
+        new_counts: 按源名称统计的新增条目数
+        run_time: 本次运行时间
+        total_seconds: 收集总耗时（秒）
+    Returns:
+        指标字典
+    """
+    source_metrics = []
+    for source, result in zip(sources, results):
+        fetch_result = result['fetch_result']
+        name = source.get('name', '未知源')
+        source_metrics.append({
+            'name': name,
+            'url': source.get('url', ''),
+            'ok': fetch_result['ok'],
+            'skipped': result['skipped'],
+            'error': fetch_result['error'],
+            'cache_status': fetch_result['cache_status'],
+            'parse_cache': fetch_result['parse_cache'],
+            'status_code': fetch_result['status_code'],
+            'duration_ms': result['duration_ms'],
+            'latency_ms': fetch_result['latency_ms'],
+            'ttfb_ms': fetch_result['ttfb_ms'],
+            'transfer_ms': fetch_result['transfer_ms'],
+            'parse_ms': fetch_result['parse_ms'],
+            'bytes': fetch_result['bytes'],
+            'wire_bytes': fetch_result['wire_bytes'],
+            'entries': fetch_result['entries'],
+            'new_entries': new_counts.get(name, 0)
+        })
+    cache_counts = {}
+    for metrics in source_metrics:
+        if metrics['cache_status']:
+            cache_counts[metrics['cache_status']] = cache_counts.get(metrics['cache_status'], 0) + 1
+    return {
+        'generated_at': run_time.isoformat(),
+        'total_seconds': round(total_seconds, 3),
+        'sources_total': len(source_metrics),
+        'sources_ok': sum(1 for m in source_metrics if m['ok']),
+        'cache_status_counts': cache_counts,
+        'entries_total': sum(m['entries'] for m in source_metrics),
+        'bytes_total': sum(m['bytes'] or 0 for m in source_metrics),
+        'wire_bytes_total': sum(m['wire_bytes'] or 0 for m in source_metrics),
+        # 按耗时从高到低排列，便于定位慢源
+        'sources': sorted(source_metrics, key=lambda m: m['duration_ms'] or 0, reverse=True)
+    }
+
+
+def _escape_label(value: str) -> str:
+    """转义Prometheus标签值"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_prometheus(metrics: Dict[str, Any]) -> str:
+    """
+    将指标转换为Prometheus textfile格式
+    Args:
+        metrics: build_collection_metrics的结果
+    Returns:
+        textfile内容
+    """
+    lines = [
+        '# HELP news_rss_collection_seconds 本次收集总耗时',
+        '# TYPE news_rss_collection_seconds gauge',
+        f"news_rss_collection_seconds {metrics['total_seconds']}",
+    ]
+    for field, metric_name, help_text in PROMETHEUS_SOURCE_METRICS:
+        lines.append(f'# HELP {metric_name} {help_text}')
+        lines.append(f'# TYPE {metric_name} gauge')
+        for source in metrics['sources']:
+            value = source[field]
+            if value is None:
+                continue
+            labels = f'source="{_escape_label(source["name"])}",url="{_escape_label(source["url"])}"'
+            lines.append(f'{metric_name}{{{labels}}} {int(value) if isinstance(value, bool) else value}')
+    # 缓存状态（fresh/scheduled/not_modified/miss）作为标签单独输出
+    lines.append('# HELP news_rss_source_cache_info 本次获取内容的缓存状态')
+    lines.append('# TYPE news_rss_source_cache_info gauge')
+    for source in metrics['sources']:
+        if source['cache_status']:
+            labels = (f'source="{_escape_label(source["name"])}",url="{_escape_label(source["url"])}",'
+                      f'status="{source["cache_status"]}"')
+            lines.append(f'news_rss_source_cache_info{{{labels}}} 1')
+    return '\n'.join(lines) + '\n'
+
+
+def write_collection_metrics(metrics: Dict[str, Any], metrics_config: Dict[str, Any]) -> bool:
+    """
+    保存收集指标到JSON文件和Prometheus textfile
+    Args:
+        metrics: build_collection_metrics的结果
+        metrics_config: 指标配置，可设置json_path和prometheus_path
+    Returns:
+        bool: 是否全部保存成功
+    """
+    json_path = metrics_config.get('json_path', 'output/collection_metrics.json')
+    prometheus_path = metrics_config.get('prometheus_path', 'output/collection_metrics.prom')
+    success = save_json_data(metrics, json_path)
+    if prometheus_path:
+        try:
+            atomic_write(prometheus_path, format_prometheus(metrics))
+        except Exception as e:
+            logging.error(f"保存Prometheus指标失败: {e}")
+            success = False
+    slowest = [m for m in metrics['sources'] if m['duration_ms']][:3]
+    if slowest:
+        logging.info("耗时最长的源: " + ", ".join(f"{m['name']} ({m['duration_ms']:.0f}ms)" for m in slowest))
+    return success
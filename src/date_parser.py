@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+发布时间解析
+各源的发布时间格式不一（RFC 822、ISO 8601、"2025-07-25 09:31:40"、"2025/7/25 1:26:00"、
+"2025年7月25日 10:30"等），收集时统一解析为UTC时间戳保存在published_ts中，
+排序、时间窗口和展示都使用整数时间戳，不再各自解析字符串
+"""
+import calendar
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import mktime_tz, parsedate_tz
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+# 没有时区的日期按该时区处理（没有时区信息的多为国内源），展示时也使用该时区
+DEFAULT_TZ = timezone(timedelta(hours=8))
+DISPLAY_FORMAT = '%Y-%m-%d %H:%M'
+
+# 数字形式的日期：YYYY-MM-DD、YYYY/M/D、YYYY年M月D日，可带时间和时区
+_NUMERIC_DATE_RE = re.compile(
+    r'^(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*日?'
+    r'(?:[ T]+(\d{1,2})[:时](\d{2})(?:[:分](\d{2})(?:\.\d+)?秒?)?)?\s*(Z|UTC|GMT|[+-]\d{2}:?\d{2})?$',
+    re.IGNORECASE
+)
+
+
+# RFC 822日期末尾的时区：数字偏移或时区缩写；parsedate_tz对没有时区的日期也返回偏移0，需单独判断
+_RFC822_ZONE_RE = re.compile(r'\s(?:[+-]\d{4}|[A-Za-z]{1,5})$')
+# 国内源的CST是中国标准时间，parsedate_tz按美国中部时间（-06:00）处理
+_CST_RE = re.compile(r'\sCST$', re.IGNORECASE)
+
+
+def _parse_numeric_date(value: str) -> Optional[int]:
+    """解析数字形式的日期，没有时区时按DEFAULT_TZ处理"""
+    match = _NUMERIC_DATE_RE.match(value)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, zone = match.groups()
+    try:
+        timestamp = calendar.timegm((int(year), int(month), int(day), int(hour or 0), int(minute or 0),
+                                     int(second or 0), 0, 0, 0))
+    except ValueError:
+        return None
+    if zone is None:
+        offset = DEFAULT_TZ.utcoffset(None).total_seconds()
+    elif zone.upper() in ('Z', 'UTC', 'GMT'):
+        offset = 0
+    else:
+        sign = -1 if zone[0] == '-' else 1
+        digits = zone[1:].replace(':', '')
+        offset = sign * (int(digits[:2]) * 3600 + int(digits[2:]) * 60)
+    return int(timestamp - offset)
+
+
+@lru_cache(maxsize=8192)
+def parse_timestamp(value: str) -> Optional[int]:
+    """
+    解析发布时间，结果按字符串缓存
+    Args:
+        value: 日期字符串，支持RFC 822、ISO 8601及常见的数字和中文日期格式
+    Returns:
+        UTC时间戳，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    # 部分源直接输出Unix时间戳（秒或毫秒）
+    if value.isdigit() and len(value) in (10, 13):
+        return int(value) if len(value) == 10 else int(value) // 1000
+    parsed = parsedate_tz(_CST_RE.sub(' +0800', value))
+    if parsed:
+        if parsed[9] is None or not _RFC822_ZONE_RE.search(value):
+            parsed = parsed[:9] + (int(DEFAULT_TZ.utcoffset(None).total_seconds()),)
+        try:
+            return int(mktime_tz(parsed))
+        except (OverflowError, ValueError):
+            return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return _parse_numeric_date(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=DEFAULT_TZ)
+    return int(dt.timestamp())
+
+
+def item_timestamp(item: Dict[str, Any]) -> Optional[int]:
+    """
+    返回新闻的发布时间戳
+    优先使用收集时保存的published_ts，旧数据（如历史存档）没有该字段或为None时解析published
+    Args:
+        item: 新闻条目
+    Returns:
+        UTC时间戳，未知时返回None
+    """
+    timestamp = item.get('published_ts')
+    if timestamp is not None:
+        return timestamp
+    return parse_timestamp(item.get('published') or '')
+
+
+def format_timestamp(timestamp: Optional[int], output_format: str = DISPLAY_FORMAT,
+                     default: str = '') -> str:
+    """
+    将时间戳格式化为DEFAULT_TZ时区的时间
+    Args:
+        timestamp: UTC时间戳
+        output_format: 输出格式
+        default: 时间戳为None时的返回值
+    Returns:
+        格式化后的时间
+    """
+    if timestamp is None:
+        return default
+    return datetime.fromtimestamp(timestamp, DEFAULT_TZ).strftime(output_format)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+RSS 2.0 / Atom 快速解析
+用XMLPullParser流式读取格式规范的RSS 2.0和Atom内容，只提取收集需要的字段，
+每个条目处理完后立即释放；遇到格式错误或其他格式时抛出FastParseError，由调用方回退到feedparser
+"""
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Optional, Tuple
+
+from date_parser import parse_timestamp
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+DC_DATE = '{http://purl.org/dc/elements/1.1/}date'
+
+# 每次送入解析器的字符数
+CHUNK_SIZE = 64 * 1024
+
+# XML声明中的encoding对已解码的文本没有意义，且expat会拒绝部分编码名，送入前去掉
+_XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+_ENCODING_RE = re.compile(r'encoding\s*=\s*["\']([\w.:-]+)["\']', re.IGNORECASE)
+# GB2312/GBK按超集GB18030解码
+_ENCODING_ALIASES = {'gb2312': 'gb18030', 'gbk': 'gb18030'}
+
+
+class FastParseError(Exception):
+    """快速解析失败，需要回退到feedparser"""
+
+
+def repair_decoding(content: str) -> str:
+    """
+    修复按ISO-8859-1误解码的内容
+    服务器未声明charset时requests按ISO-8859-1解码文本，此时按XML声明的编码（默认UTF-8）重新解码
+    Args:
+        content: RSS内容
+    Returns:
+        修复后的内容，无需修复时原样返回
+    """
+    try:
+        raw = content.encode('latin-1')
+    except UnicodeEncodeError:
+        # 含有ISO-8859-1以外的字符，说明已正确解码
+        return content
+    declaration = _XML_DECLARATION_RE.match(content)
+    encoding = 'utf-8'
+    if declaration:
+        match = _ENCODING_RE.search(declaration.group(0))
+        if match:
+            encoding = _ENCODING_ALIASES.get(match.group(1).lower(), match.group(1))
+    try:
+        return raw.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        return content
+
+
+def _text(element: Optional[ET.Element]) -> str:
+    """返回元素的文本，去除首尾空白"""
+    if element is None or element.text is None:
+        return ''
+    return element.text.strip()
+
+
+def _rss_item(item: ET.Element) -> Tuple[Dict[str, Any], str]:
+    """提取RSS 2.0条目的字段，同时返回用于计算时间戳的日期"""
+    guid_element = item.find('guid')
+    guid = _text(guid_element)
+    link = _text(item.find('link'))
+    # 没有link时，永久链接形式的guid即为文章地址
+    if not link and guid and guid_element.get('isPermaLink', 'true') != 'false' and guid.startswith('http'):
+        link = guid
+    description = _text(item.find('description'))
+    published = _text(item.find('pubDate')) or _text(item.find(DC_DATE))
+    content = _text(item.find(CONTENT_ENCODED)) or description
+    fields = {
+        'title': _text(item.find('title')),
+        'link': link,
+        'guid': guid,
+        'description': description,
+        'published': published,
+        'content': content
+    }
+    # 部分RSS只提供Atom命名空间的updated
+    return fields, published or _text(item.find(ATOM_NS + 'updated'))
+
+
+def _atom_entry(entry: ET.Element) -> Tuple[Dict[str, Any], str]:
+    """提取Atom条目的字段，同时返回用于计算时间戳的日期"""
+    link = ''
+    for link_element in entry.findall(ATOM_NS + 'link'):
+        if link_element.get('rel', 'alternate') == 'alternate':
+            link = link_element.get('href', '')
+            break
+    summary = _text(entry.find(ATOM_NS + 'summary'))
+    content = _text(entry.find(ATOM_NS + 'content'))
+    published = _text(entry.find(ATOM_NS + 'published')) or _text(entry.find(ATOM_NS + 'updated'))
+    fields = {
+        'title': _text(entry.find(ATOM_NS + 'title')),
+        'link': link,
+        'guid': _text(entry.find(ATOM_NS + 'id')),
+        'description': summary or content,
+        'published': published,
+        'content': content or summary
+    }
+    return fields, published
+
+
+def parse_fast(content: str, max_entries: Optional[int] = None,
+               max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    流式解析RSS 2.0或Atom内容
+    Args:
+        content: RSS内容
+        max_entries: 最多返回的条目数
+        max_bytes: 最多读取的字符数，超出部分的条目被忽略
+    Returns:
+        与collect_rss.parse_feed相同结构的解析结果
+    Raises:
+        FastParseError: 内容格式错误或不是RSS 2.0/Atom
+    """
+    parsed = {'entries': [], 'timestamps': [], 'error': None, 'warning': None}
+    text = _XML_DECLARATION_RE.sub('', repair_decoding(content), count=1)
+    limit = len(text) if max_bytes is None else min(len(text), max_bytes)
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root_tag = None
+    done = False
+    position = 0
+    try:
+        while position < limit and not done:
+            parser.feed(text[position:position + CHUNK_SIZE])
+            position += CHUNK_SIZE
+            for event, element in parser.read_events():
+                if event == 'start':
+                    if root_tag is None:
+                        root_tag = element.tag
+                        if root_tag not in ('rss', ATOM_NS + 'feed'):
+                            raise FastParseError(f'不支持的格式: {root_tag}')
+                    continue
+                if element.tag == 'item' and root_tag == 'rss':
+                    fields, date_text = _rss_item(element)
+                elif element.tag == ATOM_NS + 'entry':
+                    fields, date_text = _atom_entry(element)
+                else:
+                    continue
+                parsed['entries'].append(fields)
+                parsed['timestamps'].append(parse_timestamp(date_text))
+                # 条目处理完后释放其子元素，保持内存占用有界
+                element.clear()
+                if max_entries is not None and len(parsed['entries']) >= max_entries:
+                    done = True
+                    break
+        if not done and limit >= len(text):
+            parser.close()
+    except ET.ParseError as e:
+        raise FastParseError(str(e))
+    if root_tag is None:
+        raise FastParseError('内容为空')
+    return parsed
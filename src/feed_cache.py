@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+RSS源缓存
+FeedCache将内容与ETag/Last-Modified校验信息一起保存，过期后通过条件请求重新验证；
+ParsedEntryCache按内容哈希保存解析后的条目，内容未变化时跳过feedparser
+"""
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from diskcache import Cache
+
+# 默认新鲜期（秒），在此时间内直接使用缓存内容
+DEFAULT_TTL = 3600
+# 默认保留期（秒），超过后缓存条目（包括校验信息）被删除
+DEFAULT_RETENTION = 7 * 24 * 3600
+
+
+class FeedCache:
+    """保存RSS内容及HTTP校验信息的磁盘缓存"""
+
+    def __init__(self, directory: str = 'cache/rss_feeds', default_ttl: int = DEFAULT_TTL,
+                 retention: int = DEFAULT_RETENTION):
+        """
+        初始化缓存
+        Args:
+            directory: 缓存目录
+            default_ttl: 默认新鲜期（秒）
+            retention: 条目保留期（秒），不小于新鲜期
+        """
+        # timeout为SQLite锁等待时间，不是过期时间
+        self.cache = Cache(directory, timeout=60)
+        self.default_ttl = default_ttl
+        self.retention = retention
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """关闭缓存"""
+        self.cache.close()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        获取缓存条目
+        Args:
+            url: RSS源地址
+        Returns:
+            缓存条目，不存在或为旧格式（纯文本）时返回None
+        """
+        entry = self.cache.get(url)
+        if not isinstance(entry, dict) or 'body' not in entry:
+            return None
+        return entry
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]], ttl: Optional[int] = None) -> bool:
+        """
+        判断缓存条目是否仍在新鲜期内
+        Args:
+            entry: 缓存条目
+            ttl: 新鲜期（秒），默认使用default_ttl
+        Returns:
+            bool: 新鲜期内返回True
+        """
+        if not entry:
+            return False
+        if ttl is None:
+            ttl = self.default_ttl
+        return time.time() - entry.get('fetched_at', 0) < ttl
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        根据缓存条目生成条件请求头
+        Args:
+            entry: 缓存条目
+        Returns:
+            包含If-None-Match/If-Modified-Since的请求头
+        """
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url: str, body: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None, ttl: Optional[int] = None) -> Dict[str, Any]:
+        """
+        保存新获取的内容
+        Args:
+            url: RSS源地址
+            body: 响应内容
+            etag: 响应的ETag头
+            last_modified: 响应的Last-Modified头
+            ttl: 该源的新鲜期（秒）
+        Returns:
+            保存的缓存条目
+        """
+        entry = {
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time()
+        }
+        self._set(url, entry, ttl)
+        return entry
+
+    def refresh(self, url: str, entry: Dict[str, Any], etag: Optional[str] = None,
+                last_modified: Optional[str] = None, ttl: Optional[int] = None) -> Dict[str, Any]:
+        """
+        服务器返回304时刷新条目的获取时间
+        Args:
+            url: RSS源地址
+            entry: 原缓存条目
+            etag: 304响应中的ETag头（如有）
+            last_modified: 304响应中的Last-Modified头（如有）
+            ttl: 该源的新鲜期（秒）
+        Returns:
+            刷新后的缓存条目
+        """
+        entry = dict(entry)
+        entry['etag'] = etag or entry.get('etag')
+        entry['last_modified'] = last_modified or entry.get('last_modified')
+        entry['fetched_at'] = time.time()
+        self._set(url, entry, ttl)
+        return entry
+
+    def _set(self, url: str, entry: Dict[str, Any], ttl: Optional[int]):
+        """写入条目，过期时间取新鲜期与保留期的较大值"""
+        if ttl is None:
+            ttl = self.default_ttl
+        self.cache.set(url, entry, expire=max(ttl, self.retention))
+
+
+# 解析结果格式版本，解析逻辑或条目字段变化时递增，使旧的解析缓存失效
+PARSED_FORMAT_VERSION = 3
+
+
+class ParsedEntryCache:
+    """按RSS内容哈希缓存解析后的规范化条目，内容未变化时无需再次解析"""
+
+    def __init__(self, directory: str = 'cache/parsed_entries', retention: int = DEFAULT_RETENTION):
+        """
+        初始化缓存
+        Args:
+            directory: 缓存目录
+            retention: 条目保留期（秒）
+        """
+        self.cache = Cache(directory, timeout=60)
+        self.retention = retention
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """关闭缓存"""
+        self.cache.close()
+
+    @staticmethod
+    def key(content: str, variant: str = '') -> str:
+        """计算RSS内容的缓存键，variant区分不同的解析参数"""
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        return f'v{PARSED_FORMAT_VERSION}:{variant}:{digest}'
+
+    def get(self, content: str, variant: str = '') -> Optional[Dict[str, Any]]:
+        """
+        获取内容对应的解析结果
+        Args:
+            content: RSS内容
+            variant: 解析参数标识
+        Returns:
+            解析结果，未命中时返回None
+        """
+        return self.cache.get(self.key(content, variant))
+
+    def set(self, content: str, parsed: Dict[str, Any], variant: str = ''):
+        """
+        保存内容对应的解析结果
+        Args:
+            content: RSS内容
+            parsed: 解析结果
+            variant: 解析参数标识
+        """
+        self.cache.set(self.key(content, variant), parsed, expire=self.retention)
@@ -3,9 +3,7 @@
 飞书消息通知模块
 基于TrendRadar项目的通知功能实现
 """
-import json
 import os
-import requests
 import time
 from datetime import datetime
 from typing import Dict, List, Any
@@ -15,7 +13,11 @@ import re
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from utils import load_json_config, format_datetime
+from date_parser import format_timestamp, item_timestamp
+from http_client import get_http_client
+from relevance import RelevanceScorer
+from news_io import find_news_file, load_news
+from url_dedup import display_categories
 
 
 class FeishuNotifier:
@@ -38,11 +40,10 @@ class FeishuNotifier:
             bool: 是否发送成功
         """
         try:
-            response = requests.post(
+            response = get_http_client().post(
                 self.webhook_url,
                 json=message,
-                headers={'Content-Type': 'application/json'},
-                timeout=10
+                headers={'Content-Type': 'application/json'}
             )
             response.raise_for_status()
             result = response.json()
@@ -56,12 +57,14 @@ class FeishuNotifier:
             print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 发送飞书消息时出错: {e}")
             return False
     
-    def create_news_card(self, news_items: List[Dict[str, Any]], summary: Dict[str, Any]) -> Dict[str, Any]:
+    def create_news_card(self, news_items: List[Dict[str, Any]], summary: Dict[str, Any],
+                         max_news: int = 10) -> Dict[str, Any]:
         """
         创建新闻卡片消息
         Args:
-            news_items: 新闻列表
+            news_items: 要展示的新闻列表
             summary: 摘要信息
+            max_news: 最多展示的新闻条数
         Returns:
             Dict: 飞书卡片消息
         """
@@ -96,11 +99,12 @@ class FeishuNotifier:
         elements.append({"tag": "hr"})
         
         # 添加新闻列表
-        for idx, item in enumerate(news_items[:10], 1):  # 最多显示10条
+        shown = news_items[:max_news]
+        for idx, item in enumerate(shown, 1):
             title = item.get('title', '无标题')
             source = item.get('source', '未知来源')
-            category = item.get('category', '未分类')
-            published = item.get('published', '未知时间')
+            category = display_categories(item)
+            published = format_timestamp(item_timestamp(item), default=item.get('published') or '未知时间')
             
             # 清理描述文本，限制长度
             description = item.get('description', '')
@@ -124,16 +128,17 @@ class FeishuNotifier:
                 }
             })
             
-            if idx < len(news_items) and idx < 10:
+            if idx < len(shown):
                 elements.append({"tag": "hr"})
         
         # 如果新闻太多，添加提示
-        if len(news_items) > 10:
+        remaining = max(summary.get('filtered_count', len(news_items)), len(news_items)) - len(shown)
+        if remaining > 0:
             elements.append({
                 "tag": "div",
                 "text": {
                     "tag": "lark_md",
-                    "content": f"\n*... 还有 {len(news_items) - 10} 条新闻，请查看完整报告 *"
+                    "content": f"\n*... 还有 {remaining} 条新闻，请查看完整报告 *"
                 }
             })
         
@@ -198,35 +203,56 @@ class FeishuNotifier:
             }
         }
     
-    def notify_filtered_news(self, filtered_news_path: str = "output/filtered_news.json") -> bool:
+    def notify_filtered_news(self, filtered_news_path: str = None) -> bool:
         """
         发送筛选后的新闻通知
         Args:
-            filtered_news_path: 筛选新闻文件路径
+            filtered_news_path: 筛选新闻文件路径，默认为output/filtered_news.jsonl（或.json、.jsonl.gz）
         Returns:
             bool: 是否发送成功
         """
         try:
             # 加载筛选后的新闻
-            news_items = load_json_config(filtered_news_path)
+            news_items = load_news(filtered_news_path or find_news_file("output/filtered_news"))
+            return self.notify_news(news_items)
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 发送新闻通知时出错: {e}")
+            return False
+
+    def notify_news(self, news_items: List[Dict[str, Any]], summary: Dict[str, Any] = None,
+                    max_news: int = 10, scorer: RelevanceScorer = None) -> bool:
+        """
+        发送新闻列表通知，只展示相关度最高的max_news条
+        Args:
+            news_items: 筛选后的新闻列表
+            summary: 摘要信息，未提供时根据新闻列表生成
+            max_news: 卡片中最多展示的新闻条数
+            scorer: 相关度评分器，默认按config/keywords.yaml中的scoring配置评分
+        Returns:
+            bool: 是否发送成功
+        """
+        try:
             if not news_items:
                 print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 没有筛选到的新闻，跳过通知")
                 return True
             
-            # 生成摘要信息
-            sources = list(set(item.get('source', '未知') for item in news_items))
-            keywords = []  # 可以从配置中获取
-            
-            summary = {
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'total_collected': len(news_items),  # 这里简化处理
-                'filtered_count': len(news_items),
-                'sources': sources[:5],  # 限制显示数量
-                'keywords': keywords
-            }
+            if summary is None:
+                # 生成摘要信息
+                sources = list(set(item.get('source', '未知') for item in news_items))
+                keywords = []  # 可以从配置中获取
+                
+                summary = {
+                    'date': datetime.now().strftime('%Y-%m-%d'),
+                    'total_collected': len(news_items),  # 这里简化处理
+                    'filtered_count': len(news_items),
+                    'sources': sources[:5],  # 限制显示数量
+                    'keywords': keywords
+                }
             
+            # 用容量为max_news的堆选出最相关的新闻，不对全部新闻排序
+            top_news = (scorer or RelevanceScorer()).top_k(news_items, max_news)
             # 创建并发送消息
-            message = self.create_news_card(news_items, summary)
+            message = self.create_news_card(top_news, summary, max_news)
             return self.send_message(message)
             
         except Exception as e:
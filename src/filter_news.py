@@ -1,40 +1,69 @@
 #!/usr/bin/env python3
-import json
+import argparse
 import logging
 import sys
-from utils import load_config, save_json_data, filter_by_keywords
+from backfill import DEFAULT_ARCHIVE_DIR, DEFAULT_CHUNK_SIZE, DEFAULT_OUTPUT, archive_files, backfill
+from date_parser import item_timestamp
+from keyword_rules import get_keyword_rules
+from news_io import find_news_file, iter_news, news_path, save_news
+from utils import save_json_data
+
+
+def filter_news_items(news_data, keywords_config=None, index=None):
+    """按关键词配置过滤新闻列表
+
+    Args:
+        news_data (list | Iterable): 新闻列表，按子串匹配时可以是逐条读取的生成器
+        keywords_config (dict | KeywordRules, optional): 关键词配置或编译后的规则，
+            默认读取config/keywords.yaml
+        index (InvertedIndex, optional): match_mode为token时使用的倒排索引，须按顺序包含news_data的全部新闻，
+            默认临时建立
+
+    Returns:
+        list: 过滤后的新闻列表，按发布时间倒序
+    """
+    rules = get_keyword_rules(keywords_config)
+    if not rules:
+        logging.warning("关键词配置为空，使用默认过滤规则")
+        return []
+
+    # 过滤新闻：标题包含任一include关键词或命中任一表达式规则，且标题不含exclude关键词
+    if rules.match_mode == 'token':
+        # 按词匹配时在倒排索引上求值，需要全部新闻
+        news_data = news_data if isinstance(news_data, list) else list(news_data)
+        filtered_news = [news_data[position] for position in rules.select(news_data, index)]
+    else:
+        # 按子串匹配时逐条判断，原始新闻不必整体载入内存
+        filtered_news = rules.plan.filter(news_data)
+
+    # 按发布时间戳排序（最新的在前），发布时间未知的排在最后
+    filtered_news.sort(key=lambda x: item_timestamp(x) or 0, reverse=True)
+    return filtered_news
+
+
+def build_summary(filtered_data):
+    """生成过滤结果的摘要"""
+    return {
+        'total_news': len(filtered_data),
+        'sources': list(set(item['source'] for item in filtered_data)),
+        'generated_at': filtered_data[0]['collected_at'] if filtered_data else None
+    }
+
 
 def filter_news():
     """过滤新闻内容"""
-    # 加载新闻数据
+    # 逐条读取原始新闻
     try:
-        with open('output/raw_news.json', 'r', encoding='utf-8') as f:
-            news_data = json.load(f)
-    except json.JSONDecodeError:
+        filtered_news = filter_news_items(iter_news(find_news_file('output/raw_news')))
+    except ValueError:
         logging.error("原始新闻数据JSON格式错误")
         return []
     except Exception as e:
         logging.error(f"加载原始新闻数据失败: {str(e)}")
         return []
-    
-    # 加载关键词配置
-    keywords_config = load_config('config/keywords.yaml', 'config/schema/keywords.schema.json')
-    if not keywords_config:
-        logging.warning("关键词配置为空，使用默认过滤规则")
-        return []
-    
-    # 提取关键词列表
-    include_keywords = keywords_config.get('include_keywords', [])
-    exclude_keywords = keywords_config.get('exclude_keywords', [])
-    
-    # 过滤新闻
-    filtered_news = filter_by_keywords(news_data, include_keywords, exclude_keywords)
-    
-    # 按发布时间排序（最新的在前）
-    filtered_news.sort(key=lambda x: x.get('published', ''), reverse=True)
-    
+
     # 保存过滤后的新闻
-    if save_json_data(filtered_news, 'output/filtered_news.json'):
+    if save_news(filtered_news, news_path('output/filtered_news')):
         print(f"已过滤 {len(filtered_news)} 条新闻")
     else:
         logging.error("保存过滤后新闻失败")
@@ -42,22 +71,49 @@ def filter_news():
     
     return filtered_news
 
+def backfill_archive(archive_dir, output_file, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """用当前关键词配置重新筛选历史存档"""
+    paths = archive_files(archive_dir)
+    if not paths:
+        print(f"{archive_dir} 中没有可回填的存档")
+        return False
+    rules = get_keyword_rules()
+    if not rules:
+        print("关键词配置为空，无法回填")
+        return False
+    print(f"开始回填 {len(paths)} 个存档...")
+    result = backfill(rules, paths, workers=workers, chunk_size=chunk_size)
+    if not save_news(result['news'], output_file):
+        return False
+    print(f"共处理 {result['scanned']} 条，命中 {result['matched']} 条，"
+          f"去重后 {len(result['news'])} 条，已保存到: {output_file}")
+    return True
+
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='按关键词配置过滤新闻')
+    parser.add_argument('--backfill', nargs='?', const=DEFAULT_ARCHIVE_DIR, metavar='ARCHIVE_DIR',
+                        help=f'重新筛选历史存档（默认 {DEFAULT_ARCHIVE_DIR}）')
+    parser.add_argument('--workers', type=int, default=None, help='回填使用的进程数，默认为CPU核数')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='回填时每个分块的条目数')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='回填结果文件，.jsonl或.jsonl.gz结尾时逐行写入')
+    args = parser.parse_args()
+    if args.backfill:
+        if not backfill_archive(args.backfill, args.output, args.workers, args.chunk_size):
+            sys.exit(1)
+        return
+
     print("开始过滤新闻...")
     # 过滤新闻
     filtered_data = filter_news()
     if filtered_data:
         # 保存过滤后的数据
-        output_file = 'output/filtered_news.json'
-        if save_json_data(filtered_data, output_file):
+        output_file = news_path('output/filtered_news')
+        if save_news(filtered_data, output_file):
             print(f"过滤结果已保存到: {output_file}")
             # 生成摘要报告
-            summary = {
-                'total_news': len(filtered_data),
-                'sources': list(set(item['source'] for item in filtered_data)),
-                'generated_at': filtered_data[0]['collected_at'] if filtered_data else None
-            }
+            summary = build_summary(filtered_data)
             summary_file = 'output/summary.json'
             if save_json_data(summary, summary_file):
                 print(f"摘要报告已保存到: {summary_file}")
@@ -67,8 +123,8 @@ def main():
     else:
         print("没有找到匹配的新闻")
         # 创建空结果文件
-        save_json_data([], 'output/filtered_news.json')
-        save_json_data({'total_news': 0, 'sources': [], 'generated_at': None}, 'output/summary.json')
+        save_news([], news_path('output/filtered_news'))
+        save_json_data(build_summary([]), 'output/summary.json')
 
 if __name__ == "__main__":
     main()
@@ -2,7 +2,6 @@
 """
 Generate GitHub Pages HTML from filtered news
 """
-import json
 import os
 import logging
 import sys
@@ -13,58 +12,61 @@ import re
 # 添加Python路径处理
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from utils import load_config
+from atomic_io import atomic_write
+from date_parser import format_timestamp, item_timestamp
+from keyword_matcher import get_keyword_matcher
+from keyword_rules import get_keyword_rules
+from news_io import find_news_file, load_news
+from relevance import RelevanceScorer
+from url_dedup import display_categories
 
 
 def load_filtered_news() -> List[Dict[str, Any]]:
     """
     加载筛选后的新闻数据
-    从output/filtered_news.json文件中读取已筛选的新闻数据
+    从output/filtered_news.jsonl（或.json、.jsonl.gz）文件中读取已筛选的新闻数据
     如果文件不存在或为空，返回空列表
     @return {List[Dict[str, Any]]} 新闻数据列表，每个元素为包含新闻信息的字典
     """
     # 新闻数据文件路径
-    news_file = "output/filtered_news.json"
+    news_file = find_news_file("output/filtered_news")
     # 检查文件是否存在
     if not os.path.exists(news_file):
         logging.warning(f"新闻数据文件不存在: {news_file}")
         return []
-    # 读取并返回JSON数据
-    with open(news_file, 'r', encoding='utf-8') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            logging.error(f"新闻数据文件格式错误: {news_file}")
-            return []
+    # 读取全部新闻，格式错误时记录日志并返回空列表
+    return load_news(news_file)
 
 
-def extract_keywords_from_text(text: str, keywords: List[str]) -> List[str]:
+def extract_keywords_from_text(text: str, keywords) -> List[str]:
     """
     从文本中提取匹配的关键词
-    将文本和关键词都转为小写后进行匹配，避免大小写敏感问题
+    不区分大小写，关键词编译成匹配器后对文本只扫描一遍
     @param {str} text - 需要提取关键词的文本内容
-    @param {List[str]} keywords - 关键词列表
+    @param {List[str] | KeywordMatcher} keywords - 关键词列表或已编译的匹配器
     @return {List[str]} 匹配到的关键词列表
     """
-    # 将文本转为小写，实现大小写不敏感匹配
-    text_lower = text.lower()
-    matched_keywords = []
-    # 遍历所有关键词，检查是否在文本中出现
-    for keyword in keywords:
-        if keyword.lower() in text_lower:
-            matched_keywords.append(keyword)
-    return matched_keywords
+    return get_keyword_matcher(keywords).matches(text)
 
 
-def group_news_by_keywords(news_list: List[Dict[str, Any]], keywords: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+def group_news_by_keywords(news_list: List[Dict[str, Any]], keywords, index=None) -> Dict[str, List[Dict[str, Any]]]:
     """
     将新闻按匹配的关键词分组
     组合新闻标题、描述和内容，提取匹配的关键词，并将新闻归类到对应的关键词组
     @param {List[Dict[str, Any]]} news_list - 新闻列表
-    @param {List[str]} keywords - 关键词列表
+    @param {List[str] | KeywordMatcher} keywords - 关键词列表或已编译的匹配器
+    @param {InvertedIndex} index - 按词匹配时使用的倒排索引，须按顺序包含news_list的全部新闻，
+        提供时每个关键词查询一次索引，不再逐条扫描新闻
     @return {Dict[str, List[Dict[str, Any]]]} 按关键词分组的新闻字典
     """
+    matcher = get_keyword_matcher(keywords)
     keyword_groups = {}
+    if index is not None:
+        for keyword in matcher.keywords:
+            doc_ids = index.phrase(keyword)
+            if doc_ids:
+                keyword_groups[keyword] = [news_list[doc_id] for doc_id in sorted(doc_ids)]
+        return keyword_groups
     for news in news_list:
         # 提取新闻的标题、描述和内容
         title = news.get('title', '')
@@ -72,7 +74,7 @@ def group_news_by_keywords(news_list: List[Dict[str, Any]], keywords: List[str])
         content = news.get('content', '')
         # 组合所有文本用于关键词匹配
         full_text = f"{title} {description} {content}"
-        matched_keywords = extract_keywords_from_text(full_text, keywords)
+        matched_keywords = matcher.matches(full_text)
         # 将新闻添加到每个匹配的关键词组
         for keyword in matched_keywords:
             if keyword not in keyword_groups:
@@ -81,17 +83,9 @@ def group_news_by_keywords(news_list: List[Dict[str, Any]], keywords: List[str])
     return keyword_groups
 
 
-def format_date(date_str: str) -> str:
-    """Format date string for display"""
-    try:
-        # Handle different date formats
-        if 'T' in date_str:
-            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        else:
-            dt = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %z')
-        return dt.strftime('%Y-%m-%d %H:%M')
-    except:
-        return date_str
+def format_date(news: Dict[str, Any]) -> str:
+    """Format the published timestamp for display (UTC+8), falling back to the original string"""
+    return format_timestamp(item_timestamp(news), default=news.get('published', ''))
 
 
 def truncate_text(text: str, max_length: int = 200) -> str:
@@ -110,9 +104,41 @@ def clean_html(text: str) -> str:
     return re.sub(clean, '', text)
 
 
-def generate_html(news_data: List[Dict[str, Any]], keywords: List[str]) -> str:
-    """Generate HTML content for GitHub Pages"""
-    keyword_groups = group_news_by_keywords(news_data, keywords)
+def render_news_item(news: Dict[str, Any]) -> str:
+    """
+    生成单条新闻的HTML
+    @param {Dict[str, Any]} news - 新闻条目
+    @return {str} 新闻条目的HTML片段
+    """
+    title = clean_html(news.get('title', '无标题'))
+    link = news.get('link', '#')
+    description = clean_html(news.get('description', ''))
+    source = news.get('source', '未知来源')
+    category = display_categories(news)
+    published = format_date(news)
+    return f"""
+                <div class="news-item">
+                    <div class="news-title">
+                        <a href="{link}" target="_blank" rel="noopener noreferrer">{title}</a>
+                    </div>
+                    <div class="news-meta">
+                        📅 {published} | 🏢 {source}
+                    </div>
+                    <div class="news-description">
+                        {truncate_text(description, 300)}
+                    </div>
+                    <div class="news-tags">
+                        <span class="tag source-tag">{source}</span>
+                        <span class="tag category-tag">{category}</span>
+                    </div>
+                </div>
+"""
+
+
+def generate_html(news_data: List[Dict[str, Any]], keywords, top_news: List[Dict[str, Any]] = None,
+                  index=None) -> str:
+    """Generate HTML content for GitHub Pages, with the most relevant news (top_news) in front"""
+    keyword_groups = group_news_by_keywords(news_data, keywords, index)
     html_content = f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
@@ -185,6 +211,9 @@ def generate_html(news_data: List[Dict[str, Any]], keywords: List[str]) -> str:
             font-size: 1.3em;
             font-weight: bold;
         }}
+        .top-header {{
+            background: #FF9800;
+        }}
         .news-list {{
             padding: 0;
         }}
@@ -296,6 +325,21 @@ def generate_html(news_data: List[Dict[str, Any]], keywords: List[str]) -> str:
         <div class="update-time">
             <strong>最后更新：</strong>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (UTC+8)
         </div>
+"""
+    # Add the most relevant news section
+    if top_news:
+        html_content += f"""
+        <div class="keyword-section">
+            <div class="keyword-header top-header">
+                最相关 ({len(top_news)} 篇)
+            </div>
+            <div class="news-list">
+"""
+        for news in top_news:
+            html_content += render_news_item(news)
+        html_content += """
+            </div>
+        </div>
 """
     # Add keyword sections
     for keyword, news_list in sorted(keyword_groups.items(), key=lambda x: len(x[1]), reverse=True):
@@ -307,29 +351,7 @@ def generate_html(news_data: List[Dict[str, Any]], keywords: List[str]) -> str:
             <div class="news-list">
 """
         for news in news_list:
-            title = clean_html(news.get('title', '无标题'))
-            link = news.get('link', '#')
-            description = clean_html(news.get('description', ''))
-            source = news.get('source', '未知来源')
-            category = news.get('category', '未分类')
-            published = format_date(news.get('published', ''))
-            html_content += f"""
-                <div class="news-item">
-                    <div class="news-title">
-                        <a href="{link}" target="_blank" rel="noopener noreferrer">{title}</a>
-                    </div>
-                    <div class="news-meta">
-                        📅 {published} | 🏢 {source}
-                    </div>
-                    <div class="news-description">
-                        {truncate_text(description, 300)}
-                    </div>
-                    <div class="news-tags">
-                        <span class="tag source-tag">{source}</span>
-                        <span class="tag category-tag">{category}</span>
-                    </div>
-                </div>
-"""
+            html_content += render_news_item(news)
         html_content += """
             </div>
         </div>
@@ -359,15 +381,52 @@ def save_html_to_pages(html_content: str) -> bool:
         # GitHub Pages默认使用docs目录作为发布源
         os.makedirs("docs", exist_ok=True)
         # 保存HTML内容到docs/index.html
-        with open("docs/index.html", "w", encoding="utf-8") as f:
-            f.write(html_content)
-        logging.info("✅ GitHub Pages HTML 已生成并保存到 docs/index.html")
+        # 原子写入，内容未变化时不改写文件
+        if atomic_write("docs/index.html", html_content):
+            logging.info("✅ GitHub Pages HTML 已生成并保存到 docs/index.html")
+        else:
+            logging.info("✅ GitHub Pages HTML 内容未变化，docs/index.html 保持不变")
         return True
     except Exception as e:
         logging.error(f"保存HTML文件失败: {str(e)}")
         return False
 
 
+def generate_pages(news_data: List[Dict[str, Any]] = None, keywords_config=None) -> bool:
+    """
+    生成GitHub Pages的HTML页面并保存到docs目录
+    @param {List[Dict[str, Any]]} news_data - 筛选后的新闻列表，默认读取output/filtered_news.jsonl
+    @param {Dict[str, Any] | KeywordRules} keywords_config - 关键词配置或编译后的规则，默认读取config/keywords.yaml
+    @return {bool} 生成成功或没有数据可生成时返回True，失败返回False
+    """
+    if news_data is None:
+        news_data = load_filtered_news()
+    # 检查是否有新闻数据
+    if not news_data:
+        logging.warning("没有新闻数据可供生成页面")
+        return True
+    # 关键词规则与过滤阶段共用同一份编译结果
+    rules = get_keyword_rules(keywords_config)
+    if not rules.include_keywords:
+        logging.warning("未配置任何关键词，将无法按关键词分组")
+    # 首页最相关栏目：用容量为K的堆选出相关度最高的新闻
+    scorer = RelevanceScorer(rules)
+    top_news = scorer.top_k(news_data, scorer.config['pages_top_k'])
+    # 按词匹配时，关键词分组查询标题、描述和内容的倒排索引
+    index = None
+    if rules.match_mode == 'token':
+        index = rules.create_index(('title', 'description', 'content'))
+        index.extend(news_data)
+    # 生成HTML内容
+    try:
+        html_content = generate_html(news_data, rules.include, top_news, index)
+    except Exception as e:
+        logging.error(f"生成HTML内容失败: {str(e)}")
+        return False
+    # 保存HTML到GitHub Pages目录
+    return save_html_to_pages(html_content)
+
+
 def main():
     """
     主函数：生成GitHub Pages的HTML页面
@@ -388,35 +447,8 @@ def main():
     )
     try:
         logging.info("开始生成GitHub Pages...")
-        # 加载筛选后的新闻数据
-        news_data = load_filtered_news()
-        # 检查是否有新闻数据
-        if not news_data:
-            logging.warning("没有新闻数据可供生成页面")
-            return
-        # 加载关键词配置
-        try:
-            # 关键词配置文件路径：config/keywords.yaml
-            keywords_config = load_config('config/keywords.yaml')
-        except json.JSONDecodeError:
-            logging.error("关键词配置文件JSON格式错误，请检查文件语法")
-            sys.exit(1)
-        except Exception as e:
-            logging.error(f"加载关键词配置失败: {str(e)}")
-            sys.exit(1)
-        # 提取需要匹配的关键词列表
-        keywords = keywords_config.get('include_keywords', [])
-        if not keywords:
-            logging.warning("未配置任何关键词，将无法按关键词分组")
-        # 生成HTML内容
-        try:
-            html_content = generate_html(news_data, keywords)
-        except Exception as e:
-            logging.error(f"生成HTML内容失败: {str(e)}")
-            sys.exit(1)
-        # 保存HTML到GitHub Pages目录
-        if save_html_to_pages(html_content):
-            logging.info("GitHub Pages生成成功，文件已保存到docs/index.html")
+        if generate_pages():
+            logging.info("GitHub Pages生成完成")
         else:
             logging.error("GitHub Pages生成失败")
             sys.exit(1)
@@ -1,65 +1,115 @@
 #!/usr/bin/env python3
-import json
 import os
-import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
+
+from atomic_io import AtomicFile, atomic_copy, atomic_write
+from news_io import count_news, find_news_file, iter_news, load_news
 
 
 def load_json_data(file_path: str) -> List[Dict[str, Any]]:
-    """加载JSON数据
+    """加载新闻数据
     Args:
-        file_path: JSON文件路径
+        file_path: 新闻文件路径，支持JSON和JSON Lines（可gzip压缩）
     Returns:
-        解析后的JSON数据列表
+        新闻列表，文件不存在或格式错误时为空列表
     """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        logging.error(f"JSON文件解析错误: {file_path}")
-        return []
-    except Exception as e:
-        logging.error(f"加载JSON数据失败: {str(e)}")
-        return []
+    return load_news(file_path)
 
 
-def generate_markdown(news_data: List[Dict[str, Any]], title: str) -> str:
-    """生成Markdown格式的内容"""
-    if not news_data:
-        return f"# {title}\n\n没有找到相关新闻。\n"
-    markdown_content = f"# {title}\n\n"
+def iter_markdown(news_data: Iterable[Dict[str, Any]], title: str, count: int) -> Iterator[str]:
+    """逐段生成Markdown内容
+    Args:
+        news_data: 新闻条目，可以是逐条读取的生成器
+        title: 标题
+        count: 新闻条数
+    Yields:
+        Markdown片段
+    """
+    if not count:
+        yield f"# {title}\n\n没有找到相关新闻。\n"
+        return
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    markdown_content += f"更新时间: {now}\n\n"
-    count = len(news_data)
-    markdown_content += f"共找到 {count} 条新闻\n\n"
+    yield f"# {title}\n\n更新时间: {now}\n\n共找到 {count} 条新闻\n\n"
     for item in news_data:
         title_text = item.get('title', '无标题')
         link = item.get('link', '#')
         source = item.get('source', '未知来源')
         published_date = item.get('published', '')
-        markdown_content += f"- [{title_text}]({link})\n"
-        markdown_content += f"  - 来源: {source}\n"
+        entry = f"- [{title_text}]({link})\n"
+        entry += f"  - 来源: {source}\n"
         if published_date:
-            markdown_content += f"  - 发布时间: {published_date}\n"
-        markdown_content += "\n"
-    return markdown_content
+            entry += f"  - 发布时间: {published_date}\n"
+        yield entry + "\n"
+
+
+def generate_markdown(news_data: List[Dict[str, Any]], title: str) -> str:
+    """生成Markdown格式的内容"""
+    return ''.join(iter_markdown(news_data or [], title, len(news_data or [])))
 
 
 def save_markdown(content: str, file_path: str) -> bool:
     """保存Markdown内容到文件"""
     try:
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        atomic_write(file_path, content)
         return True
     except Exception as e:
         print(f"保存Markdown文件失败: {e}")
         return False
 
 
-def generate_all_markdown():
-    """生成所有Markdown文件"""
+def write_markdown(news_data: Iterable[Dict[str, Any]], title: str, count: int, file_path: str) -> bool:
+    """逐条写入Markdown文件，新闻不必整体载入内存
+    Args:
+        news_data: 新闻条目，可以是逐条读取的生成器
+        title: 标题
+        count: 新闻条数
+        file_path: 文件路径
+    Returns:
+        bool: 写入成功返回True
+    """
+    try:
+        with AtomicFile(file_path) as f:
+            f.writelines(iter_markdown(news_data, title, count))
+        return True
+    except Exception as e:
+        print(f"保存Markdown文件失败: {e}")
+        return False
+
+
+def generate_news_markdown(news_data, name: str, title: str, date_str: str, label: str):
+    """生成一类新闻的Markdown存档并更新当前文件
+    Args:
+        news_data: 新闻列表，为None时从output/{name}文件逐条读取
+        name: 文件名前缀，如raw_news
+        title: Markdown标题
+        date_str: 存档文件名中的时间
+        label: 输出信息中的名称
+    """
+    if news_data is None:
+        news_file = find_news_file(os.path.join('output', name))
+        count = count_news(news_file)
+        news_data = iter_news(news_file) if count else []
+    else:
+        count = len(news_data)
+    # 保存到存档文件
+    archive_path = os.path.join('output', 'archive', f"{name}_{date_str}.md")
+    if not write_markdown(news_data, title, count, archive_path):
+        return
+    print(f"已生成{label}Markdown存档: {archive_path} ({count} 条)")
+    # 同时更新当前文件
+    current_path = os.path.join('output', f"{name}.md")
+    atomic_copy(archive_path, current_path)
+    print(f"已更新当前{label}Markdown: {current_path}")
+
+
+def generate_all_markdown(raw_news: List[Dict[str, Any]] = None,
+                          filtered_news: List[Dict[str, Any]] = None):
+    """生成所有Markdown文件
+    Args:
+        raw_news: 原始新闻列表，默认从output/raw_news.jsonl逐条读取
+        filtered_news: 过滤后新闻列表，默认从output/filtered_news.jsonl逐条读取
+    """
     # 获取当前时间作为文件名
     current_time = datetime.now()
     date_str = current_time.strftime("%Y%m%d_%H%M%S")
@@ -67,29 +117,11 @@ def generate_all_markdown():
     archive_dir = os.path.join('output', 'archive')
     os.makedirs(archive_dir, exist_ok=True)
     # 生成原始新闻的Markdown
-    raw_news = load_json_data('output/raw_news.json')
     title = f"RSS原始新闻列表 - {current_time.strftime('%Y-%m-%d %H:%M:%S')}"
-    raw_markdown = generate_markdown(raw_news, title)
-    # 保存到存档文件
-    raw_archive_path = os.path.join(archive_dir, f"raw_news_{date_str}.md")
-    save_markdown(raw_markdown, raw_archive_path)
-    count = len(raw_news) if raw_news else 0
-    print(f"已生成原始新闻Markdown存档: {raw_archive_path} ({count} 条)")
-    # 同时更新当前文件
-    save_markdown(raw_markdown, 'output/raw_news.md')
-    print(f"已更新当前原始新闻Markdown: output/raw_news.md")
+    generate_news_markdown(raw_news, 'raw_news', title, date_str, '原始新闻')
     # 生成过滤后新闻的Markdown
-    filtered_news = load_json_data('output/filtered_news.json')
     filtered_title = f"过滤后新闻列表 - {current_time.strftime('%Y-%m-%d %H:%M:%S')}"
-    filtered_markdown = generate_markdown(filtered_news, filtered_title)
-    # 保存到存档文件
-    filtered_archive_path = os.path.join(archive_dir, f"filtered_news_{date_str}.md")
-    save_markdown(filtered_markdown, filtered_archive_path)
-    filtered_count = len(filtered_news) if filtered_news else 0
-    print(f"已生成过滤后新闻Markdown存档: {filtered_archive_path} ({filtered_count} 条)")
-    # 同时更新当前文件
-    save_markdown(filtered_markdown, 'output/filtered_news.md')
-    print(f"已更新当前过滤后新闻Markdown: output/filtered_news.md")
+    generate_news_markdown(filtered_news, 'filtered_news', filtered_title, date_str, '过滤后新闻')
 
 
 def main():
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+共享HTTP客户端
+为RSS收集、健康检查和飞书通知提供连接池复用、压缩传输以及统一的重试和超时策略
+"""
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import load_config
+
+DEFAULT_CONFIG = {
+    'connect_timeout_seconds': 5,
+    'read_timeout_seconds': 10,
+    # 连接池缓存的主机数
+    'pool_connections': 64,
+    # 每个主机保持的最大连接数
+    'pool_maxsize': 4,
+    # 每个主机单独的连接数上限，例如 {"rsshub.app": 8}
+    'host_pool_sizes': {},
+    'retry': {
+        'total': 2,
+        'backoff_factor': 0.5,
+        'status_forcelist': [429, 500, 502, 503, 504]
+    },
+    'user_agent': 'news-rss/1.0 (+https://github.com/hesievan/news-rss)'
+}
+
+
+class HttpClient:
+    """基于requests.Session的共享HTTP客户端"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化客户端
+        Args:
+            config: 客户端配置，缺省项使用DEFAULT_CONFIG
+        """
+        self.config = dict(DEFAULT_CONFIG)
+        self.config.update(config or {})
+        self.timeout = (self.config['connect_timeout_seconds'], self.config['read_timeout_seconds'])
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': self.config['user_agent'],
+            'Accept-Encoding': 'gzip, deflate'
+        })
+        retry = self._build_retry(self.config['retry'])
+        adapter = self._build_adapter(self.config['pool_maxsize'], retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # 为指定主机挂载独立大小的连接池
+        for host, pool_size in self.config['host_pool_sizes'].items():
+            host_adapter = self._build_adapter(pool_size, retry)
+            self.session.mount(f'http://{host}/', host_adapter)
+            self.session.mount(f'https://{host}/', host_adapter)
+
+    def _build_retry(self, retry_config: Dict[str, Any]) -> Retry:
+        """根据配置创建重试策略，只对幂等方法重试"""
+        return Retry(
+            total=retry_config.get('total', 2),
+            backoff_factor=retry_config.get('backoff_factor', 0.5),
+            status_forcelist=retry_config.get('status_forcelist', []),
+            raise_on_status=False
+        )
+
+    def _build_adapter(self, pool_size: int, retry: Retry) -> HTTPAdapter:
+        """创建连接池适配器，连接数达到上限时阻塞等待而不是新建连接"""
+        return HTTPAdapter(
+            pool_connections=self.config['pool_connections'],
+            pool_maxsize=pool_size,
+            max_retries=retry,
+            pool_block=True
+        )
+
+    def request(self, method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+        """
+        发送HTTP请求
+        Args:
+            method: 请求方法
+            url: 请求地址
+            timeout: 超时时间，数字或(连接超时, 读取超时)，默认使用配置
+        Returns:
+            requests.Response: 响应对象
+        """
+        return self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """发送GET请求"""
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """发送HEAD请求"""
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('HEAD', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """发送POST请求"""
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    获取进程内共享的HTTP客户端，首次调用时读取config/http-client.json创建
+    Returns:
+        HttpClient: 共享客户端
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                config = {}
+                if os.path.exists('config/http-client.json'):
+                    config = load_config('config/http-client.json')
+                _client = HttpClient(config)
+                logging.debug("已创建共享HTTP客户端")
+    return _client
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+新闻的内存倒排索引
+按tokenizer的切分结果为每条新闻的指定字段建立带位置的倒排表，新闻可以逐条加入（边收集边索引）。
+关键词按词匹配而不是按子串匹配，查询时只查倒排表，不再扫描原文：
+- 词查询：包含某个词的新闻
+- 短语查询：查询词切分后的各个词按相同的相对位置出现在同一字段中，单个关键词也按短语查询
+- 文档频率：包含某个词或短语的新闻数，用于BM25排序
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from tokenizer import Tokenizer, get_tokenizer
+from utils import strip_html
+
+DEFAULT_FIELDS = ('title', 'description')
+# BM25参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 短语的一次出现：(字段序号, 起始字符, 结束字符)
+Occurrence = Tuple[int, int, int]
+
+
+class InvertedIndex:
+    """带位置的倒排索引"""
+
+    def __init__(self, tokenizer: Optional[Tokenizer] = None, fields: Iterable[str] = DEFAULT_FIELDS):
+        """
+        Args:
+            tokenizer: 分词器，默认只使用config/dictionary.txt中的词
+            fields: 建立索引的字段
+        """
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.fields = tuple(fields)
+        self.documents: List[Dict[str, Any]] = []
+        # 词 -> {新闻序号: [(字段序号, 起始单元, 起始字符, 结束字符), ...]}
+        self.postings: Dict[str, Dict[int, List[Tuple[int, int, int, int]]]] = {}
+        # 每条新闻各字段的词数之和，用于BM25的长度归一化
+        self.lengths: List[int] = []
+        self._total_length = 0
+        # 查询词的切分结果
+        self._queries: Dict[str, List[Tuple[str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, item: Dict[str, Any]) -> int:
+        """
+        加入一条新闻
+        Args:
+            item: 新闻条目
+        Returns:
+            新闻在索引中的序号
+        """
+        doc_id = len(self.documents)
+        self.documents.append(item)
+        length = 0
+        # 很多源的content与description相同，相同的文本只切分一次
+        tokenized = {}
+        for field_index, field in enumerate(self.fields):
+            text = item.get(field) or ''
+            if field in ('description', 'content'):
+                text = strip_html(text)
+            tokens = tokenized.get(text)
+            if tokens is None:
+                tokens = tokenized[text] = self.tokenizer.tokenize(text)
+            for word, start, _, char_start, char_end in tokens:
+                self.postings.setdefault(word, {}).setdefault(doc_id, []).append(
+                    (field_index, start, char_start, char_end))
+            length += len(tokens)
+        self.lengths.append(length)
+        self._total_length += length
+        return doc_id
+
+    def extend(self, items: Iterable[Dict[str, Any]]):
+        """依次加入多条新闻"""
+        for item in items:
+            self.add(item)
+
+    def _query(self, text: str) -> List[Tuple[str, int]]:
+        tokens = self._queries.get(text)
+        if tokens is None:
+            tokens = self._queries[text] = self.tokenizer.query(text)
+        return tokens
+
+    def _field_indexes(self, fields: Optional[Iterable[str]]) -> Optional[Set[int]]:
+        if fields is None:
+            return None
+        return {self.fields.index(field) for field in fields if field in self.fields}
+
+    def term(self, word: str) -> Set[int]:
+        """
+        词查询
+        Args:
+            word: 切分后的词（小写）
+        Returns:
+            包含该词的新闻序号
+        """
+        return set(self.postings.get(word, ()))
+
+    def occurrences(self, text: str, fields: Optional[Iterable[str]] = None) -> Dict[int, List[Occurrence]]:
+        """
+        短语查询，返回每次出现的位置
+        Args:
+            text: 查询词，切分后的各个词须按相同的相对位置出现
+            fields: 只在这些字段中查找，默认为全部索引字段
+        Returns:
+            新闻序号 -> [(字段序号, 起始字符, 结束字符), ...]
+        """
+        tokens = self._query(text)
+        field_indexes = self._field_indexes(fields)
+        if not tokens or field_indexes == set():
+            return {}
+        postings = [self.postings.get(word) for word, _ in tokens]
+        if not all(postings):
+            return {}
+        # 从文档数最少的词开始求交集
+        candidates = set(min(postings, key=len))
+        for posting in postings:
+            candidates.intersection_update(posting)
+        found = {}
+        last_offset = max(offset for _, offset in tokens)
+        for doc_id in candidates:
+            positions = [{(field, start): (char_start, char_end)
+                          for field, start, char_start, char_end in posting[doc_id]} for posting in postings]
+            for field, start, char_start, char_end in postings[0][doc_id]:
+                if field_indexes is not None and field not in field_indexes:
+                    continue
+                if all((field, start + offset) in positions[index] for index, (_, offset) in enumerate(tokens)):
+                    # 短语的结束位置取相对位置最靠后的词的结束位置
+                    last = max(positions[index][(field, start + offset)][1]
+                               for index, (_, offset) in enumerate(tokens) if offset == last_offset)
+                    found.setdefault(doc_id, []).append((field, char_start, last))
+        return found
+
+    def phrase(self, text: str, fields: Optional[Iterable[str]] = None) -> Set[int]:
+        """
+        短语查询
+        Args:
+            text: 查询词
+            fields: 只在这些字段中查找，默认为全部索引字段
+        Returns:
+            包含该短语的新闻序号
+        """
+        tokens = self._query(text)
+        if len(tokens) == 1 and fields is None:
+            return self.term(tokens[0][0])
+        return set(self.occurrences(text, fields))
+
+    def document_frequency(self, text: str, fields: Optional[Iterable[str]] = None) -> int:
+        """包含某个词或短语的新闻数"""
+        return len(self.phrase(text, fields))
+
+    def search(self, query: str, limit: int = 20, fields: Optional[Iterable[str]] = None,
+               field_boosts: Optional[Dict[str, float]] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        按BM25排序检索，空白分隔的每个查询词按短语查询，全部查询词都须出现
+        Args:
+            query: 查询文本
+            limit: 最多返回的条数
+            fields: 只在这些字段中查找，默认为全部索引字段
+            field_boosts: 字段加权，出现在该字段中的一次按加权计入词频，默认为1
+        Returns:
+            按相关度从高到低排列的 (新闻, 得分) 列表
+        """
+        terms = query.split()
+        if not terms or not self.documents:
+            return []
+        boosts = [(field_boosts or {}).get(field, 1.0) for field in self.fields]
+        average_length = self._total_length / len(self.documents) or 1
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            found = self.occurrences(term, fields)
+            if not found:
+                return []
+            idf = math.log(1 + (len(self.documents) - len(found) + 0.5) / (len(found) + 0.5))
+            term_scores = {}
+            for doc_id, occurrences in found.items():
+                frequency = sum(boosts[field] for field, _, _ in occurrences)
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_id] / average_length)
+                term_scores[doc_id] = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items()
+                          if doc_id in term_scores}
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))[:limit]
+        return [(self.documents[doc_id], score) for doc_id, score in ranked]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+JSON序列化
+所有配置和数据文件的JSON读写都通过这里，安装了orjson时使用orjson，否则使用标准库json，两者的输出格式一致：
+- 默认格式：缩进2个空格、不转义非ASCII字符，与原来的 json.dump(..., ensure_ascii=False, indent=2) 相同，用于需要人工查看的文件
+- 紧凑格式（compact=True）：没有缩进和空格，用于只由程序读取的文件（JSON Lines、调度状态、快照等）
+
+可用 python benchmarks/bench_json_backend.py 对比两者读写新闻文件的耗时
+"""
+import json
+from typing import IO, Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibBackend:
+    """标准库json"""
+
+    name = 'json'
+
+    @staticmethod
+    def loads(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any, compact: bool = False) -> str:
+        if compact:
+            return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+class OrjsonBackend:
+    """orjson，解析和序列化都比标准库快数倍"""
+
+    name = 'orjson'
+
+    @staticmethod
+    def loads(data: Union[str, bytes]) -> Any:
+        # orjson.JSONDecodeError是json.JSONDecodeError（ValueError）的子类，调用方的异常处理不变
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any, compact: bool = False) -> str:
+        try:
+            return orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2).decode('utf-8')
+        except TypeError:
+            # orjson不支持的内容（如非字符串的键、超过64位的整数）交给标准库处理
+            return StdlibBackend.dumps(obj, compact)
+
+
+BACKENDS = {StdlibBackend.name: StdlibBackend}
+if orjson is not None:
+    BACKENDS[OrjsonBackend.name] = OrjsonBackend
+
+# 当前使用的实现
+backend = OrjsonBackend if orjson is not None else StdlibBackend
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    解析JSON文本
+    Args:
+        data: JSON文本
+    Returns:
+        解析结果
+    Raises:
+        ValueError: 格式错误
+    """
+    return backend.loads(data)
+
+
+def load(f: IO) -> Any:
+    """解析整个文件的内容"""
+    return backend.loads(f.read())
+
+
+def dumps(obj: Any, compact: bool = False) -> str:
+    """
+    序列化为JSON文本，不转义非ASCII字符
+    Args:
+        obj: 数据
+        compact: True时不缩进、不加空格
+    Returns:
+        JSON文本
+    """
+    return backend.dumps(obj, compact)
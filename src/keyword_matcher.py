@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+多关键词匹配
+将关键词编译成字典树，对每篇文本只扫描一遍，返回所有命中的关键词及位置：
+- 关键词较少时，字典树转成单个正则表达式，由re的C实现扫描
+- 关键词较多时，正则的分支会被逐个尝试，改用Aho-Corasick自动机，扫描耗时与关键词数量无关
+判断是否包含任一关键词时总是使用正则，命中第一个即返回
+
+匹配语义与原先的 `keyword.lower() in text.lower()` 一致：不区分大小写，中英文均按字符匹配，
+包括互相包含或首尾重叠的关键词（如"顺丰"与"顺丰快递"、"大模型"与"AI大模型"）。
+"""
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+# 单个命中：(起始位置, 结束位置, 关键词)，位置基于小写后的文本
+Hit = Tuple[int, int, str]
+
+# 不同的小写关键词达到该数量时使用Aho-Corasick自动机扫描
+AUTOMATON_MIN_PATTERNS = 80
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    将关键词构造成字典树并生成对应的正则表达式
+    同一位置上较长的关键词优先匹配，因此每次匹配得到该位置最长的关键词
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node):
+        terminal = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if terminal else body
+
+    return emit(trie)
+
+
+def _build_automaton(patterns: List[str]):
+    """
+    构造Aho-Corasick自动机
+    Returns:
+        (transitions, outputs)：transitions[状态]为字符到下一状态的映射，已合并失败链接上的转移，
+        不在其中的字符回到根状态重新查找；outputs[状态]为在该状态结束的所有关键词
+    """
+    goto = [{}]
+    outputs = [()]
+    for pattern in patterns:
+        state = 0
+        for char in pattern:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                next_state = len(goto)
+                goto.append({})
+                outputs.append(())
+                goto[state][char] = next_state
+            state = next_state
+        outputs[state] = (pattern,)
+
+    # 按广度优先顺序计算失败链接，并把失败状态的转移和输出合并进来
+    fail = [0] * len(goto)
+    transitions = [dict(goto[0])] + [None] * (len(goto) - 1)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        # 根状态的转移在扫描时单独查找，不复制到每个状态
+        inherited = transitions[fail[state]] if fail[state] else {}
+        transitions[state] = {**inherited, **goto[state]}
+        outputs[state] = outputs[state] + outputs[fail[state]]
+        for char, next_state in goto[state].items():
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(char, 0) if state else 0
+            queue.append(next_state)
+    return transitions, outputs
+
+
+def _resume_offset(pattern: str, prefixes) -> int:
+    """
+    匹配到pattern后，下一次扫描的起始偏移
+    即pattern内部最早可能开始另一个跨越其结尾的关键词的位置，不存在时为pattern的长度
+    """
+    for offset in range(1, len(pattern)):
+        if pattern[offset:] in prefixes:
+            return offset
+    return len(pattern)
+
+
+class KeywordMatcher:
+    """编译后的不区分大小写的多关键词匹配器"""
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        编译关键词
+        Args:
+            keywords: 关键词列表，保留原始大小写用于返回结果，空字符串被忽略
+        """
+        self.keywords = [keyword for keyword in keywords if keyword]
+        # 小写后的关键词 -> 原始关键词在列表中的序号（大小写不同的重复关键词共用一个模式）
+        self._indexes: Dict[str, List[int]] = {}
+        for index, keyword in enumerate(self.keywords):
+            self._indexes.setdefault(keyword.lower(), []).append(index)
+        patterns = sorted(self._indexes)
+
+        self._pattern = None
+        # Aho-Corasick自动机，关键词较少时为None
+        self._automaton = None
+        # 正则扫描时，匹配到某个关键词后其内部（含起始位置）出现的所有关键词及相对位置
+        self._implied: Dict[str, List[Tuple[int, str]]] = {}
+        # 正则扫描时，匹配到某个关键词后下一次扫描相对其起始位置的偏移
+        self._resume: Dict[str, int] = {}
+        if not patterns:
+            return
+        self._pattern = re.compile(_trie_pattern(patterns))
+        if len(patterns) >= AUTOMATON_MIN_PATTERNS:
+            self._automaton = _build_automaton(patterns)
+            return
+        pattern_set = set(patterns)
+        proper_prefixes = {pattern[:length] for pattern in patterns for length in range(1, len(pattern))}
+        for pattern in patterns:
+            self._implied[pattern] = [
+                (offset, pattern[offset:end])
+                for offset in range(len(pattern))
+                for end in range(offset + 1, len(pattern) + 1)
+                if pattern[offset:end] in pattern_set
+            ]
+            self._resume[pattern] = _resume_offset(pattern, proper_prefixes)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _scan(self, text: str):
+        """
+        扫描小写后的文本，逐个产生 (位置, 小写关键词)，同一命中可能产生多次，由调用方去重
+        """
+        text = text.lower()
+        if self._automaton is not None:
+            transitions, outputs = self._automaton
+            root = transitions[0]
+            state = 0
+            for position, char in enumerate(text):
+                next_state = transitions[state].get(char)
+                state = root.get(char, 0) if next_state is None else next_state
+                for pattern in outputs[state]:
+                    yield position + 1 - len(pattern), pattern
+            return
+        # 正则每次匹配取当前位置最长的关键词，其内部的关键词查表得到；
+        # 只有可能存在跨越匹配结尾的关键词时才回退到匹配内部继续扫描
+        position = 0
+        while True:
+            match = self._pattern.search(text, position)
+            if match is None:
+                return
+            start = match.start()
+            found = match.group()
+            for offset, pattern in self._implied[found]:
+                yield start + offset, pattern
+            position = start + self._resume[found]
+
+    def find_all(self, text: str) -> List[Hit]:
+        """
+        一次扫描返回文本中所有关键词的命中
+        Args:
+            text: 文本
+        Returns:
+            按位置排序的 (起始位置, 结束位置, 关键词) 列表，同一关键词大小写不同的写法各返回一次
+        """
+        if not text or self._pattern is None:
+            return []
+        hits = set()
+        for start, pattern in self._scan(text):
+            for index in self._indexes[pattern]:
+                hits.add((start, start + len(pattern), self.keywords[index]))
+        return sorted(hits)
+
+    def matches(self, text: str) -> List[str]:
+        """
+        返回文本中出现的关键词
+        Args:
+            text: 文本
+        Returns:
+            命中的关键词，按关键词配置中的顺序排列
+        """
+        if not text or self._pattern is None:
+            return []
+        found = set()
+        if self._automaton is not None:
+            # 只需要命中了哪些关键词时，记录到达过的输出状态即可，不逐个产生命中
+            transitions, outputs = self._automaton
+            root = transitions[0]
+            state = 0
+            reached = set()
+            for char in text.lower():
+                next_state = transitions[state].get(char)
+                state = root.get(char, 0) if next_state is None else next_state
+                if outputs[state]:
+                    reached.add(state)
+            patterns = {pattern for state in reached for pattern in outputs[state]}
+        else:
+            patterns = {pattern for _, pattern in self._scan(text)}
+        for pattern in patterns:
+            found.update(self._indexes[pattern])
+        return [self.keywords[index] for index in sorted(found)]
+
+    def contains(self, text: str) -> bool:
+        """
+        判断文本是否包含任一关键词，命中第一个即返回
+        Args:
+            text: 文本
+        Returns:
+            bool: 包含返回True
+        """
+        if not text or self._pattern is None:
+            return False
+        return self._pattern.search(text.lower()) is not None
+
+
+@lru_cache(maxsize=32)
+def _compile(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_keyword_matcher(keywords) -> KeywordMatcher:
+    """
+    获取关键词列表对应的匹配器，相同的关键词列表只编译一次
+    Args:
+        keywords: 关键词列表或已编译的匹配器
+    Returns:
+        KeywordMatcher: 匹配器
+    """
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+    return _compile(tuple(keywords or ()))
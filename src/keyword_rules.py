@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+关键词规则
+将config/keywords.yaml加载、校验并编译成匹配器和过滤执行计划，各阶段共用同一份编译结果。
+编译结果按配置文件和Schema文件内容的哈希持久化到cache/keyword_rules.pickle，两者都未变化时后续运行直接加载，
+既不重新解析YAML和校验Schema，也不重新编译匹配器
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from atomic_io import AtomicFile
+from inverted_index import InvertedIndex
+from rule_engine import RulePlan, RuleSyntaxError
+from tokenizer import get_tokenizer
+from utils import load_config
+
+DEFAULT_CONFIG_PATH = 'config/keywords.yaml'
+DEFAULT_SCHEMA_PATH = 'config/schema/keywords.schema.json'
+DEFAULT_CACHE_PATH = 'cache/keyword_rules.pickle'
+# 编译结果的格式版本，KeywordRules、RulePlan或KeywordMatcher的结构变化时递增，使旧的缓存失效
+RULES_FORMAT_VERSION = 3
+
+# 进程内已加载的规则：配置文件路径 -> KeywordRules
+_loaded: Dict[str, 'KeywordRules'] = {}
+_lock = threading.Lock()
+
+
+class KeywordRules:
+    """编译后的关键词规则"""
+
+    def __init__(self, config: Optional[Dict[str, Any]], config_hash: Optional[str] = None):
+        """
+        编译关键词配置
+        Args:
+            config: 关键词配置
+            config_hash: 配置文件和Schema文件内容的哈希，直接传入配置时为None
+        Raises:
+            RuleSyntaxError: rules中的表达式语法错误
+        """
+        self.config = config or {}
+        self.config_hash = config_hash
+        self.include_keywords = list(self.config.get('include_keywords', []))
+        self.exclude_keywords = list(self.config.get('exclude_keywords', []))
+        # 过滤使用的执行计划，包含include/exclude关键词和rules中的表达式规则
+        self.plan = RulePlan(self.include_keywords, self.exclude_keywords, self.config.get('rules'))
+        self.include = self.plan.include
+        self.exclude = self.plan.exclude
+        # substring：按子串匹配；token：分词后按词匹配，不会命中跨越词边界的位置
+        self.match_mode = self.config.get('match_mode', 'substring')
+
+    def __bool__(self) -> bool:
+        return bool(self.config)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取原始配置项，便于替代配置字典使用"""
+        return self.config.get(key, default)
+
+    def create_index(self, fields: Optional[Iterable[str]] = None) -> InvertedIndex:
+        """
+        创建空的倒排索引，分词词典包含全部关键词
+        Args:
+            fields: 建立索引的字段，默认为过滤用到的字段
+        Returns:
+            InvertedIndex: 倒排索引
+        """
+        return InvertedIndex(get_tokenizer(self.plan.vocabulary), fields or self.plan.fields)
+
+    def select(self, news_list: List[Dict[str, Any]], index: Optional[InvertedIndex] = None) -> List[int]:
+        """
+        按match_mode筛选新闻
+        Args:
+            news_list: 新闻列表
+            index: 按词匹配时使用的、按顺序加入了news_list全部新闻的倒排索引，为None时临时建立
+        Returns:
+            保留的新闻在news_list中的位置
+        """
+        if self.match_mode != 'token':
+            return [position for position, item in enumerate(news_list) if self.plan.keep(item)]
+        if index is None:
+            index = self.create_index()
+            index.extend(news_list)
+        return self.plan.select(index)
+
+
+def file_hash(path: str) -> Optional[str]:
+    """
+    计算配置文件内容的SHA-256摘要
+    Args:
+        path: 文件路径
+    Returns:
+        摘要，文件不存在时返回None
+    """
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def rules_hash(config_path: str, schema_path: str) -> Optional[str]:
+    """
+    计算配置文件和Schema文件内容的组合摘要，Schema变化时配置需要重新校验，编译结果也随之失效
+    Args:
+        config_path: 关键词配置文件
+        schema_path: JSON Schema文件
+    Returns:
+        摘要，配置文件不存在时返回None
+    """
+    config_hash = file_hash(config_path)
+    if config_hash is None:
+        return None
+    schema_hash = file_hash(schema_path) or ''
+    return hashlib.sha256(f'{config_hash}:{schema_hash}'.encode('ascii')).hexdigest()
+
+
+def _read_cache(cache_path: str, config_hash: str) -> Optional[KeywordRules]:
+    """读取持久化的编译结果，版本或配置哈希不一致时返回None"""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        logging.warning(f"读取关键词规则缓存失败，将重新编译: {e}")
+        return None
+    if (not isinstance(payload, dict) or payload.get('version') != RULES_FORMAT_VERSION
+            or payload.get('config_hash') != config_hash):
+        return None
+    return payload.get('rules')
+
+
+def _write_cache(cache_path: str, rules: KeywordRules):
+    """持久化编译结果，先写临时文件再替换，避免并发读取到不完整的内容"""
+    payload = {'version': RULES_FORMAT_VERSION, 'config_hash': rules.config_hash, 'rules': rules}
+    try:
+        with AtomicFile(cache_path, 'wb', None, checksum=False, skip_unchanged=False) as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        logging.warning(f"保存关键词规则缓存失败: {e}")
+
+
+def load_keyword_rules(config_path: str = DEFAULT_CONFIG_PATH, schema_path: str = DEFAULT_SCHEMA_PATH,
+                       cache_path: str = DEFAULT_CACHE_PATH) -> KeywordRules:
+    """
+    加载编译后的关键词规则
+    依次查找进程内已加载的规则和持久化的编译结果，配置文件或Schema文件内容变化时才重新加载、校验和编译
+    Args:
+        config_path: 关键词配置文件
+        schema_path: JSON Schema文件
+        cache_path: 编译结果缓存文件
+    Returns:
+        KeywordRules: 关键词规则，配置不存在或校验失败时为空规则
+    """
+    config_hash = rules_hash(config_path, schema_path)
+    if config_hash is None:
+        logging.error(f"配置文件不存在: {config_path}")
+        return KeywordRules({})
+    with _lock:
+        rules = _loaded.get(config_path)
+        if rules is not None and rules.config_hash == config_hash:
+            return rules
+        rules = _read_cache(cache_path, config_hash)
+        if rules is None:
+            try:
+                rules = KeywordRules(load_config(config_path, schema_path), config_hash)
+            except RuleSyntaxError as e:
+                logging.error(f"关键词规则解析失败: {e}")
+                rules = KeywordRules({}, config_hash)
+            if rules:
+                _write_cache(cache_path, rules)
+                logging.info(f"已编译关键词规则: {len(rules.include_keywords)} 个包含关键词, "
+                             f"{len(rules.exclude_keywords)} 个排除关键词, {len(rules.plan.rules)} 条表达式规则")
+        _loaded[config_path] = rules
+        return rules
+
+
+def get_keyword_rules(keywords_config=None) -> KeywordRules:
+    """
+    将各阶段接受的关键词参数统一为KeywordRules
+    Args:
+        keywords_config: None（读取config/keywords.yaml）、关键词配置字典或KeywordRules
+    Returns:
+        KeywordRules: 关键词规则
+    """
+    if keywords_config is None:
+        return load_keyword_rules()
+    if isinstance(keywords_config, KeywordRules):
+        return keywords_config
+    return KeywordRules(keywords_config)
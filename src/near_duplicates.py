@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+跨来源近似重复新闻聚类
+同一条通稿会经由多个源转载，标题只有标点、空格或个别字词的差异。对标题做字符n-gram分片，
+计算MinHash签名，按LSH分段索引，每条新闻只需查找若干个分段键即可找到候选簇，再用签名估算的
+相似度确认。每个簇保留一条代表新闻，其余来源记录在代表新闻的alternate_sources中。
+
+簇的签名和分段键持久化到SQLite（cache/near_duplicates.db），后续运行中转载的旧新闻同样能在
+每条O(1)次查找内归入已有的簇。
+"""
+import argparse
+import hashlib
+import html
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from date_parser import item_timestamp
+from news_io import find_news_file, load_news, save_news
+from seen_index import entry_key
+from utils import load_config
+
+DEFAULT_CONFIG_PATH = 'config/dedup.json'
+DEFAULT_CONFIG = {
+    'enabled': True,
+    'store_path': 'cache/near_duplicates.db',
+    'shingle_size': 3,
+    # 签名长度为 bands * rows，相似度约为 (1/bands)^(1/rows) 以上的新闻大概率成为候选
+    'bands': 20,
+    'rows': 3,
+    # 候选与簇的签名相似度（估算的Jaccard系数）达到该值才归为同一簇
+    'threshold': 0.6,
+    # 规范化后的标题短于该长度时，补充描述的开头参与分片，避免短标题之间误合并
+    'min_title_chars': 12,
+    'description_chars': 100,
+    'retention_days': 14
+}
+
+# 哈希取模用的梅森素数
+_PRIME = (1 << 61) - 1
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_NON_WORD_RE = re.compile(r'[\W_]+')
+
+
+def load_dedup_config(config_path: str = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
+    """加载去重配置，缺省项使用DEFAULT_CONFIG"""
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(config_path):
+        config.update(load_config(config_path) or {})
+    return config
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化文本：去除HTML标签和实体，转为小写，删除空白和标点
+    Args:
+        text: 原始文本
+    Returns:
+        规范化后的文本
+    """
+    text = html.unescape(_HTML_TAG_RE.sub(' ', text or ''))
+    return _NON_WORD_RE.sub('', text.lower())
+
+
+def shingles(item: Dict[str, Any], config: Dict[str, Any]) -> Set[str]:
+    """
+    计算新闻的字符n-gram分片
+    以标题为主：各来源的描述长短和写法差异很大，加入描述会明显拉低转载之间的相似度
+    Args:
+        item: 新闻条目
+        config: 去重配置
+    Returns:
+        分片集合
+    """
+    text = normalize_text(item.get('title', ''))
+    if len(text) < config['min_title_chars']:
+        text += normalize_text(item.get('description', ''))[:config['description_chars']]
+    size = config['shingle_size']
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """MinHash签名与LSH分段键的计算"""
+
+    def __init__(self, bands: int, rows: int):
+        """
+        生成哈希函数参数，由种子确定，保证各次运行的签名可以互相比较
+        Args:
+            bands: LSH分段数
+            rows: 每段的签名行数
+        """
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        self.params = []
+        for index in range(self.num_perm):
+            digest = hashlib.blake2b(f'minhash-{index}'.encode('ascii'), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], 'little') % (_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], 'little') % _PRIME
+            self.params.append((a, b))
+
+    def signature(self, shingle_set: Iterable[str]) -> Tuple[int, ...]:
+        """
+        计算MinHash签名
+        Args:
+            shingle_set: 分片集合
+        Returns:
+            长度为num_perm的签名，分片为空时返回空元组
+        """
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set]
+        if not hashes:
+            return ()
+        return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in self.params)
+
+    def band_keys(self, signature: Sequence[int]) -> List[int]:
+        """
+        计算签名的LSH分段键，两个签名在任一分段上完全相同即成为候选
+        Returns:
+            每个分段一个64位有符号整数（可直接存入SQLite）
+        """
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(repr((band, rows)).encode('ascii'), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+
+
+def similarity(left: Sequence[int], right: Sequence[int]) -> float:
+    """由两个MinHash签名估算Jaccard相似度"""
+    if not left or len(left) != len(right):
+        return 0.0
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+class FingerprintStore:
+    """基于SQLite的簇签名与LSH分段索引"""
+
+    def __init__(self, db_path: str = DEFAULT_CONFIG['store_path']):
+        """
+        打开（必要时创建）指纹库
+        Args:
+            db_path: 数据库文件路径
+        """
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS clusters (
+                cluster_id INTEGER PRIMARY KEY,
+                representative_key TEXT NOT NULL,
+                source TEXT,
+                signature BLOB NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS bands (
+                band_key INTEGER NOT NULL,
+                cluster_id INTEGER NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_bands_key ON bands (band_key)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_bands_cluster ON bands (cluster_id)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_clusters_last_seen ON clusters (last_seen)')
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def candidates(self, band_keys: List[int]) -> List[Tuple[int, str, Tuple[int, ...], float]]:
+        """
+        查找与分段键有交集的簇
+        Returns:
+            (簇ID, 代表新闻标识, 代表新闻来源, 签名, 首次出现时间) 列表
+        """
+        placeholders = ','.join('?' * len(band_keys))
+        rows = self.conn.execute(
+            'SELECT cluster_id, representative_key, source, signature, first_seen FROM clusters '
+            f'WHERE cluster_id IN (SELECT cluster_id FROM bands WHERE band_key IN ({placeholders}))',
+            band_keys
+        ).fetchall()
+        return [(cluster_id, key, source, tuple(array('Q', blob)), first_seen)
+                for cluster_id, key, source, blob, first_seen in rows]
+
+    def add(self, item: Dict[str, Any], signature: Sequence[int], band_keys: List[int], now: float) -> int:
+        """
+        以新闻为代表新建簇
+        Returns:
+            簇ID
+        """
+        cursor = self.conn.execute(
+            'INSERT INTO clusters (representative_key, source, signature, first_seen, last_seen) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (entry_key(item), item.get('source', ''), array('Q', signature).tobytes(), now, now)
+        )
+        cluster_id = cursor.lastrowid
+        self.conn.executemany('INSERT INTO bands (band_key, cluster_id) VALUES (?, ?)',
+                              [(key, cluster_id) for key in band_keys])
+        return cluster_id
+
+    def touch(self, cluster_id: int, now: float):
+        """更新簇的最后出现时间"""
+        self.conn.execute('UPDATE clusters SET last_seen = ? WHERE cluster_id = ?', (now, cluster_id))
+
+    def commit(self):
+        self.conn.commit()
+
+    def prune(self, retention_days: int, now: float = None) -> int:
+        """
+        清理长时间未再出现的簇
+        Args:
+            retention_days: 保留天数
+            now: 当前时间戳，默认为time.time()
+        Returns:
+            删除的簇数
+        """
+        if now is None:
+            now = time.time()
+        cutoff = now - retention_days * 86400
+        with self.conn:
+            self.conn.execute(
+                'DELETE FROM bands WHERE cluster_id IN (SELECT cluster_id FROM clusters WHERE last_seen < ?)',
+                (cutoff,)
+            )
+            cursor = self.conn.execute('DELETE FROM clusters WHERE last_seen < ?', (cutoff,))
+        if cursor.rowcount:
+            logging.info(f"已从近似重复指纹库中清理 {cursor.rowcount} 个过期簇")
+        return cursor.rowcount
+
+
+def _published_order(item: Dict[str, Any]) -> float:
+    """代表新闻的排序键：发布时间越早越优先，无法解析的排在最后"""
+    timestamp = item_timestamp(item)
+    return float('inf') if timestamp is None else timestamp
+
+
+def cluster_news(news_list: List[Dict[str, Any]], store: FingerprintStore, hasher: MinHasher,
+                 config: Dict[str, Any], now: float = None) -> List[Dict[str, Any]]:
+    """
+    将新闻归入近似重复簇，同时更新指纹库
+    只合并不同来源的新闻：同一来源标题相近的多条新闻通常是套用模板的不同报道
+    Args:
+        news_list: 新闻列表
+        store: 指纹库
+        hasher: MinHash计算器
+        config: 去重配置
+        now: 当前时间戳，默认为time.time()
+    Returns:
+        按首个成员的顺序排列的簇，每项包含members（新闻序号）、sources、representative_key和is_new（本次运行新建）
+    """
+    if now is None:
+        now = time.time()
+    threshold = config['threshold']
+    clusters: Dict[int, Dict[str, Any]] = {}
+    for index, item in enumerate(news_list):
+        signature = hasher.signature(shingles(item, config))
+        if not signature:
+            # 没有可比较的文本，单独成簇且不写入指纹库
+            clusters[-index - 1] = {'members': [index], 'sources': {item.get('source', '')},
+                                    'representative_key': None, 'is_new': True}
+            continue
+        band_keys = hasher.band_keys(signature)
+        source = item.get('source', '')
+        key = entry_key(item)
+        best, best_score = None, threshold
+        for candidate in store.candidates(band_keys):
+            cluster = clusters.get(candidate[0])
+            sources = cluster['sources'] if cluster else {candidate[2]}
+            # 同一条新闻再次出现时归入它自己的簇
+            if source in sources and candidate[1] != key:
+                continue
+            score = similarity(signature, candidate[3])
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is None:
+            cluster_id = store.add(item, signature, band_keys, now)
+            clusters[cluster_id] = {'members': [], 'sources': set(), 'representative_key': key, 'is_new': True}
+        else:
+            cluster_id, representative_key, stored_source, _, first_seen = best
+            if cluster_id not in clusters:
+                store.touch(cluster_id, now)
+                clusters[cluster_id] = {'members': [], 'sources': {stored_source},
+                                        'representative_key': representative_key, 'is_new': first_seen >= now}
+        clusters[cluster_id]['members'].append(index)
+        clusters[cluster_id]['sources'].add(source)
+    store.commit()
+    return sorted(clusters.values(), key=lambda cluster: cluster['members'][0])
+
+
+def dedupe_news(news_list: List[Dict[str, Any]], config: Optional[Dict[str, Any]] = None,
+                drop_seen: bool = False) -> List[Dict[str, Any]]:
+    """
+    合并跨来源的近似重复新闻，每个簇保留一条代表新闻
+    代表新闻优先为簇首次出现时的那条，不在本批中时取发布时间最早的一条；
+    其余成员的来源和链接记录在代表新闻的alternate_sources中
+    Args:
+        news_list: 新闻列表
+        config: 去重配置，默认读取config/dedup.json
+        drop_seen: 是否丢弃以前的运行中已输出过的新闻的转载（增量模式）
+    Returns:
+        去重后的新闻，保持代表新闻的原顺序
+    """
+    config = config or load_dedup_config()
+    if not news_list:
+        return []
+    hasher = MinHasher(config['bands'], config['rows'])
+    with FingerprintStore(config['store_path']) as store:
+        clusters = cluster_news(news_list, store, hasher, config)
+        store.prune(config['retention_days'])
+
+    kept = []
+    dropped = 0
+    for cluster in clusters:
+        members = cluster['members']
+        keys = [entry_key(news_list[index]) for index in members]
+        if cluster['representative_key'] in keys:
+            representative = members[keys.index(cluster['representative_key'])]
+        elif drop_seen and not cluster['is_new']:
+            # 簇在以前的运行中已输出过代表新闻，本批只有它的转载
+            dropped += len(members)
+            continue
+        else:
+            representative = min(members, key=lambda index: (_published_order(news_list[index]), index))
+        item = news_list[representative]
+        alternates = []
+        for index in members:
+            other = news_list[index]
+            source = {'source': other.get('source', ''), 'link': other.get('link', '')}
+            if index != representative and source not in alternates \
+                    and (source['source'], source['link']) != (item.get('source', ''), item.get('link', '')):
+                alternates.append(source)
+        if alternates:
+            item = item.copy()
+            item['alternate_sources'] = alternates
+        kept.append((representative, item))
+    kept.sort(key=lambda pair: pair[0])
+    logging.info(f"近似重复去重: {len(news_list)} 条新闻归为 {len(clusters)} 个簇，"
+                 f"保留 {len(kept)} 条，丢弃已输出过的转载 {dropped} 条")
+    return [item for _, item in kept]
+
+
+def main(argv=None):
+    """对filtered_news去重"""
+    parser = argparse.ArgumentParser(description='合并跨来源的近似重复新闻')
+    parser.add_argument('--input', default=None, help='新闻文件（JSON或JSON Lines），默认为output/filtered_news.jsonl')
+    parser.add_argument('--output', default=None, help='输出文件，默认覆盖输入文件')
+    parser.add_argument('--drop-seen', action='store_true', help='丢弃以前的运行中已输出过的新闻的转载')
+    args = parser.parse_args(argv)
+
+    input_path = args.input or find_news_file('output/filtered_news')
+    if not os.path.exists(input_path):
+        logging.error(f"新闻文件不存在: {input_path}")
+        sys.exit(1)
+    news_list = load_news(input_path)
+    deduped = dedupe_news(news_list, drop_seen=args.drop_seen)
+    if not save_news(deduped, args.output or input_path):
+        sys.exit(1)
+    print(f"去重前 {len(news_list)} 条，去重后 {len(deduped)} 条")
+
+
+if __name__ == "__main__":
+    main()
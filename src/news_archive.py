@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+可检索的新闻存档
+每次运行收集到的新闻按条目标识写入SQLite（output/news_archive.db），重复出现的新闻只更新最后出现时间，
+标题和描述建立FTS5全文索引。SQLite自带的分词器把连续的中文当作一个词，因此索引前先把中文切分为
+相邻两字（bigram），查询词按同样方式切分后作为短语查询，中英文混合的关键词都能命中。
+
+用法:
+    python src/news_archive.py search 芯片 --source 36氪 --since 2025-07-01 --limit 20
+    python src/news_archive.py import output/archive     # 导入已有的Markdown/JSON存档
+    python src/news_archive.py stats
+"""
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import json_backend
+from date_parser import format_timestamp, item_timestamp, parse_timestamp
+from seen_index import entry_key
+from tokenizer import CJK_CHARS
+from url_dedup import UrlCanonicalizer
+from utils import strip_html
+
+DEFAULT_DB_PATH = 'output/news_archive.db'
+# 描述去除HTML后最多保存的字符数
+MAX_DESCRIPTION_CHARS = 1000
+
+_TOKEN_RE = re.compile(f'[{CJK_CHARS}]+|[^\\W_{CJK_CHARS}]+')
+_CJK_RE = re.compile(f'[{CJK_CHARS}]')
+
+
+def cjk_tokens(text: str) -> List[str]:
+    """
+    切分索引用的词：中日韩文字切分为相邻两字，单独一个字时保留该字，其他文字按单词切分并转为小写
+    Args:
+        text: 文本
+    Returns:
+        词列表
+    """
+    tokens = []
+    for run in _TOKEN_RE.findall(text or ''):
+        if _CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run.lower())
+    return tokens
+
+
+def fts_query(query: str) -> str:
+    """
+    将查询转换为FTS5表达式：空白分隔的每个关键词切分后作为一个短语，关键词之间为AND
+    单个中文字符按前缀查找
+    Args:
+        query: 查询文本
+    Returns:
+        FTS5查询表达式，没有可查询的词时为空字符串
+    """
+    phrases = []
+    for term in query.split():
+        tokens = cjk_tokens(term)
+        if not tokens:
+            continue
+        if len(tokens) == 1 and len(tokens[0]) == 1 and _CJK_RE.match(tokens[0]):
+            phrases.append(f'"{tokens[0]}"*')
+        else:
+            phrases.append('"' + ' '.join(tokens) + '"')
+    return ' AND '.join(phrases)
+
+
+class NewsArchive:
+    """基于SQLite FTS5的新闻存档"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        打开（必要时创建）存档数据库
+        Args:
+            db_path: 数据库文件路径
+        """
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS news (
+                id INTEGER PRIMARY KEY,
+                entry_key TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                link TEXT,
+                description TEXT,
+                source TEXT,
+                category TEXT,
+                published TEXT,
+                published_ts INTEGER,
+                filtered INTEGER NOT NULL DEFAULT 0,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_news_source ON news (source);
+            CREATE INDEX IF NOT EXISTS idx_news_category ON news (category);
+            CREATE INDEX IF NOT EXISTS idx_news_published_ts ON news (published_ts);
+            CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(title, description, tokenize='unicode61');
+        ''')
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def upsert(self, items: Iterable[Dict[str, Any]], filtered: bool = False, now: float = None) -> Dict[str, int]:
+        """
+        写入一批新闻，已存在的新闻更新内容和最后出现时间，标题或描述变化时重建索引
+        Args:
+            items: 新闻条目
+            filtered: 这批新闻是否为过滤后保留的新闻，标记后不会因再次作为原始新闻写入而清除
+            now: 当前时间戳，默认为time.time()
+        Returns:
+            包含inserted、updated的计数
+        """
+        if now is None:
+            now = time.time()
+        counts = {'inserted': 0, 'updated': 0}
+        canonicalizer = UrlCanonicalizer()
+        cursor = self.conn.cursor()
+        with self.conn:
+            for item in items:
+                # 按规范化链接识别同一条新闻，导入的Markdown存档中没有guid也能与收集的新闻对应
+                link = canonicalizer.canonical(item.get('link', ''))
+                key = 'url:' + link if link else entry_key(item)
+                title = strip_html(item.get('title', ''))
+                description = strip_html(item.get('description', ''))[:MAX_DESCRIPTION_CHARS]
+                values = (title, item.get('link', ''), description, item.get('source', ''),
+                          item.get('category', ''), item.get('published', ''), item_timestamp(item))
+                row = cursor.execute('SELECT id, title, description FROM news WHERE entry_key = ?',
+                                     (key,)).fetchone()
+                if row is None:
+                    cursor.execute(
+                        'INSERT INTO news (entry_key, title, link, description, source, category, published, '
+                        'published_ts, filtered, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (key,) + values + (int(filtered), now, now)
+                    )
+                    news_id = cursor.lastrowid
+                    counts['inserted'] += 1
+                else:
+                    # 导入的Markdown存档只有部分字段，空字段不覆盖已有的内容
+                    news_id = row['id']
+                    cursor.execute(
+                        'UPDATE news SET title = COALESCE(NULLIF(?, \'\'), title), '
+                        'link = COALESCE(NULLIF(?, \'\'), link), '
+                        'description = COALESCE(NULLIF(?, \'\'), description), '
+                        'source = COALESCE(NULLIF(?, \'\'), source), '
+                        'category = COALESCE(NULLIF(?, \'\'), category), '
+                        'published = COALESCE(NULLIF(?, \'\'), published), '
+                        'published_ts = COALESCE(?, published_ts), '
+                        'filtered = MAX(filtered, ?), last_seen = ? WHERE id = ?',
+                        values + (int(filtered), now, news_id)
+                    )
+                    counts['updated'] += 1
+                    title = title or row['title']
+                    description = description or row['description']
+                    if (row['title'], row['description']) == (title, description):
+                        continue
+                    cursor.execute('DELETE FROM news_fts WHERE rowid = ?', (news_id,))
+                cursor.execute('INSERT INTO news_fts (rowid, title, description) VALUES (?, ?, ?)',
+                               (news_id, ' '.join(cjk_tokens(title)), ' '.join(cjk_tokens(description))))
+        return counts
+
+    def search(self, query: str = '', source: Optional[str] = None, category: Optional[str] = None,
+               since: Optional[int] = None, until: Optional[int] = None, filtered_only: bool = False,
+               order: str = 'relevance', limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        检索存档
+        Args:
+            query: 关键词，空白分隔的多个关键词需同时出现在标题或描述中，为空时只按其他条件筛选
+            source: 来源名称
+            category: 分类
+            since: 发布时间不早于该UTC时间戳
+            until: 发布时间早于该UTC时间戳
+            filtered_only: 只返回曾被关键词规则保留的新闻
+            order: relevance（按匹配度，无关键词时按发布时间）或 recent（按发布时间倒序）
+            limit: 最多返回的条数
+        Returns:
+            新闻列表，字段与收集的新闻相同，另含first_seen、last_seen和filtered
+        """
+        conditions, params = [], []
+        match = fts_query(query or '')
+        if query and not match:
+            return []
+        if match and order != 'relevance':
+            conditions.append('news.id IN (SELECT rowid FROM news_fts WHERE news_fts MATCH ?)')
+            params.append(match)
+        if source:
+            conditions.append('news.source = ?')
+            params.append(source)
+        if category:
+            conditions.append('news.category = ?')
+            params.append(category)
+        if since is not None:
+            conditions.append('news.published_ts >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('news.published_ts < ?')
+            params.append(until)
+        if filtered_only:
+            conditions.append('news.filtered = 1')
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        if match and order == 'relevance':
+            sql = ('SELECT news.* FROM news JOIN (SELECT rowid, bm25(news_fts, 3.0, 1.0) AS rank FROM news_fts '
+                   'WHERE news_fts MATCH ?) AS hits ON hits.rowid = news.id' + where +
+                   ' ORDER BY hits.rank, news.published_ts DESC LIMIT ?')
+            params = [match] + params
+        else:
+            sql = f'SELECT news.* FROM news{where} ORDER BY news.published_ts IS NULL, news.published_ts DESC LIMIT ?'
+        rows = self.conn.execute(sql, params + [limit]).fetchall()
+        return [{key: row[key] for key in row.keys() if key != 'id'} for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """返回存档的条数、来源数和时间范围"""
+        row = self.conn.execute(
+            'SELECT COUNT(*), SUM(filtered), COUNT(DISTINCT source), MIN(published_ts), MAX(published_ts) FROM news'
+        ).fetchone()
+        return {'total': row[0], 'filtered': row[1] or 0, 'sources': row[2],
+                'earliest': format_timestamp(row[3]), 'latest': format_timestamp(row[4])}
+
+
+def archive_run(raw_news: List[Dict[str, Any]], filtered_news: List[Dict[str, Any]],
+                db_path: str = DEFAULT_DB_PATH) -> Dict[str, int]:
+    """
+    将一次运行的原始新闻和过滤后的新闻写入存档
+    Args:
+        raw_news: 原始新闻
+        filtered_news: 过滤后的新闻
+        db_path: 数据库文件路径
+    Returns:
+        原始新闻的inserted、updated计数
+    """
+    with NewsArchive(db_path) as archive:
+        counts = archive.upsert(raw_news or [])
+        archive.upsert(filtered_news or [], filtered=True)
+    logging.info(f"已写入新闻存档 {db_path}: 新增 {counts['inserted']} 条，更新 {counts['updated']} 条")
+    return counts
+
+
+def _timestamp_arg(value: str) -> int:
+    """命令行中的日期参数，支持date_parser能解析的格式"""
+    timestamp = parse_timestamp(value)
+    if timestamp is None:
+        raise argparse.ArgumentTypeError(f"无法解析的日期: {value}")
+    return timestamp
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='检索新闻存档')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='存档数据库')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help='检索新闻')
+    search.add_argument('query', nargs='*', help='关键词，多个关键词需同时出现')
+    search.add_argument('--source', help='来源名称')
+    search.add_argument('--category', help='分类')
+    search.add_argument('--since', type=_timestamp_arg, help='发布时间不早于，如 2025-07-01')
+    search.add_argument('--until', type=_timestamp_arg, help='发布时间早于，如 2025-08-01')
+    search.add_argument('--filtered', action='store_true', help='只检索曾被关键词规则保留的新闻')
+    search.add_argument('--order', choices=['relevance', 'recent'], default='relevance', help='排序方式')
+    search.add_argument('--limit', type=int, default=20, help='最多返回的条数')
+    search.add_argument('--json', action='store_true', help='以JSON输出')
+
+    importer = commands.add_parser('import', help='导入Markdown/JSON存档')
+    importer.add_argument('archive_dir', nargs='?', default='output/archive', help='存档目录')
+
+    commands.add_parser('stats', help='存档统计')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+    with NewsArchive(args.db) as archive:
+        if args.command == 'search':
+            results = archive.search(' '.join(args.query), args.source, args.category, args.since, args.until,
+                                     args.filtered, args.order, args.limit)
+            if args.json:
+                print(json_backend.dumps(results))
+                return
+            for item in results:
+                published = format_timestamp(item['published_ts'], default=item['published'] or '未知时间')
+                print(f"{published}  [{item['source']}] {item['title']}\n    {item['link']}")
+            print(f"共 {len(results)} 条")
+        elif args.command == 'import':
+            from backfill import DEFAULT_PATTERNS, archive_files, iter_archive_items
+            paths = archive_files(args.archive_dir, DEFAULT_PATTERNS + ('filtered_news_*.md',))
+            counts = {'inserted': 0, 'updated': 0}
+            for path in paths:
+                result = archive.upsert(iter_archive_items([path]),
+                                        filtered=os.path.basename(path).startswith('filtered_news_'))
+                counts = {key: counts[key] + result[key] for key in counts}
+            print(f"已导入 {len(paths)} 个存档：新增 {counts['inserted']} 条，更新 {counts['updated']} 条")
+        else:
+            for key, value in archive.stats().items():
+                print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
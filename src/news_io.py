@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+新闻列表文件的读写
+raw_news、filtered_news等新闻列表支持三种格式，由扩展名区分，写入时的格式由config/collector.json中的news_format选择：
+- json（.json）：整个列表一个JSON数组，读取时须整体加载
+- jsonl（.jsonl）：每行一条新闻的JSON Lines，逐条写入、逐条读取，内存占用不随新闻数量增长
+- jsonl.gz（.jsonl.gz）：gzip压缩的JSON Lines
+读取时先找配置格式的文件，不存在时依次尝试其他格式，兼容以前生成的JSON文件
+读取的每条新闻转为NewsItem（src/news_item.py），写入时再转回dict
+"""
+import gzip
+import io
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import json_backend
+from atomic_io import AtomicFile
+from news_item import NewsItem, to_dict
+from utils import load_config
+
+NEWS_FORMATS = {'json': '.json', 'jsonl': '.jsonl', 'jsonl.gz': '.jsonl.gz'}
+DEFAULT_NEWS_FORMAT = 'jsonl'
+
+
+@lru_cache(maxsize=1)
+def get_news_format() -> str:
+    """返回config/collector.json中配置的新闻文件格式"""
+    config = load_config('config/collector.json') if os.path.exists('config/collector.json') else {}
+    news_format = config.get('news_format', DEFAULT_NEWS_FORMAT)
+    if news_format not in NEWS_FORMATS:
+        logging.warning(f"未知的新闻文件格式 {news_format}，使用 {DEFAULT_NEWS_FORMAT}")
+        return DEFAULT_NEWS_FORMAT
+    return news_format
+
+
+def file_format(path: str) -> str:
+    """根据扩展名判断文件格式，无法识别时按json处理"""
+    if path.endswith('.jsonl.gz'):
+        return 'jsonl.gz'
+    if path.endswith('.jsonl'):
+        return 'jsonl'
+    return 'json'
+
+
+def news_path(name: str, news_format: Optional[str] = None) -> str:
+    """
+    新闻文件的路径
+    Args:
+        name: 不含扩展名的路径，如 output/raw_news
+        news_format: 文件格式，默认为配置的格式
+    Returns:
+        带扩展名的路径
+    """
+    return name + NEWS_FORMATS[news_format or get_news_format()]
+
+
+def find_news_file(name: str) -> str:
+    """
+    查找已有的新闻文件，优先使用配置的格式
+    Args:
+        name: 不含扩展名的路径，如 output/raw_news
+    Returns:
+        存在的文件路径，都不存在时为配置格式的路径
+    """
+    preferred = news_path(name)
+    if os.path.exists(preferred):
+        return preferred
+    for news_format in NEWS_FORMATS:
+        path = news_path(name, news_format)
+        if os.path.exists(path):
+            return path
+    return preferred
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def iter_news(path: str) -> Iterator[NewsItem]:
+    """
+    逐条读取新闻文件
+    JSON Lines中无法解析的行（如写入中断留下的不完整的最后一行）记录警告后跳过
+    Args:
+        path: 文件路径
+    Yields:
+        新闻条目
+    Raises:
+        OSError: 文件无法读取
+        ValueError: JSON数组格式错误
+    """
+    with _open(path, 'r') as f:
+        if file_format(path) == 'json':
+            yield from map(NewsItem, json_backend.load(f))
+            return
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json_backend.loads(line)
+            except ValueError:
+                logging.warning(f"跳过无法解析的记录 {path}:{line_number}")
+                continue
+            yield NewsItem(data)
+
+
+def load_news(path: str) -> List[NewsItem]:
+    """
+    读取整个新闻文件
+    Args:
+        path: 文件路径
+    Returns:
+        新闻列表，文件不存在或格式错误时为空列表
+    """
+    try:
+        return list(iter_news(path))
+    except (OSError, ValueError) as e:
+        logging.error(f"读取新闻文件失败 {path}: {e}")
+        return []
+
+
+def count_news(path: str) -> int:
+    """
+    统计新闻文件中的条数，JSON Lines只数行数，不解析内容
+    Args:
+        path: 文件路径
+    Returns:
+        条数，文件无法读取时为0
+    """
+    try:
+        if file_format(path) == 'json':
+            return len(load_news(path))
+        with _open(path, 'r') as f:
+            return sum(1 for line in f if line.strip())
+    except OSError:
+        return 0
+
+
+class NewsWriter:
+    """逐条写入新闻文件，写入临时文件，关闭时才替换目标文件（见atomic_io）"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 文件路径，格式由扩展名决定
+        """
+        self.path = path
+        self.format = file_format(path)
+        self.count = 0
+        self._atomic = AtomicFile(path, 'wb' if path.endswith('.gz') else 'w')
+        if path.endswith('.gz'):
+            # gzip头中的文件名使用目标文件名、时间固定为0，内容相同的文件字节也相同
+            gzip_file = gzip.GzipFile(os.path.basename(path), 'wb', fileobj=self._atomic.file, mtime=0)
+            self._file = io.TextIOWrapper(gzip_file, encoding='utf-8')
+        else:
+            self._file = self._atomic.file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, item: Dict[str, Any]):
+        """写入一条新闻"""
+        item = to_dict(item)
+        if self.format == 'json':
+            # 与整个列表缩进序列化的输出相同
+            prefix = '[\n' if self.count == 0 else ',\n'
+            self._file.write(prefix + '  ' + json_backend.dumps(item).replace('\n', '\n  '))
+        else:
+            self._file.write(json_backend.dumps(item, compact=True) + '\n')
+        self.count += 1
+
+    def close(self):
+        """结束写入并替换目标文件"""
+        if self._file.closed:
+            return
+        if self.format == 'json':
+            self._file.write('\n]' if self.count else '[]')
+        if self._file is not self._atomic.file:
+            # 关闭gzip流只写入结尾，不关闭底层的临时文件
+            self._file.close()
+        self._atomic.commit()
+
+    def discard(self):
+        """放弃写入，目标文件保持不变"""
+        if not self._file.closed and self._file is not self._atomic.file:
+            self._file.close()
+        self._atomic.discard()
+
+
+def save_news(news: Iterable[Dict[str, Any]], path: str) -> bool:
+    """
+    逐条写入新闻文件，news可以是生成器
+    Args:
+        news: 新闻条目
+        path: 文件路径，格式由扩展名决定
+    Returns:
+        bool: 写入成功返回True
+    """
+    try:
+        with NewsWriter(path) as writer:
+            for item in news:
+                writer.write(item)
+        return True
+    except Exception as e:
+        logging.error(f"保存新闻文件失败 {path}: {e}")
+        return False
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+新闻条目
+每条新闻原来是一个带8~10个字符串键的dict，同一个源的source、category和同一次收集的collected_at
+在每条新闻中各有一份。NewsItem用__slots__保存固定字段，没有每个实例的__dict__：
+- source、category驻留（sys.intern），同名的来源和分类只保存一份
+- collected_at保存为整数时间戳collected_ts，读取该键或序列化时才格式化为字符串
+- content与description相同时共用同一个字符串对象
+- 其他字段（categories、alternate_sources等）保存在extra中
+
+NewsItem实现了dict的读写接口（item['title']、item.get、'published_ts' in item、setdefault、copy），
+原来按dict处理新闻的代码不需要修改，只在写入文件时通过to_dict转为dict
+"""
+import sys
+import time
+from collections.abc import MutableMapping
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
+
+COLLECTED_AT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 序列化时的字段顺序，与收集时生成的顺序一致
+FIELDS = ('title', 'link', 'guid', 'description', 'published', 'published_ts',
+          'source', 'category', 'collected_at', 'content')
+# 直接保存在同名slot中的字段
+_SLOT_FIELDS = frozenset(FIELDS) - {'collected_at'}
+_INTERNED_FIELDS = frozenset(('source', 'category'))
+
+
+@lru_cache(maxsize=256)
+def format_collected_at(timestamp: int) -> str:
+    """将收集时间戳格式化为本地时间字符串"""
+    return datetime.fromtimestamp(timestamp).strftime(COLLECTED_AT_FORMAT)
+
+
+@lru_cache(maxsize=256)
+def parse_collected_at(value: str) -> Optional[int]:
+    """解析本地时间格式的收集时间，格式不符时返回None"""
+    try:
+        return int(time.mktime(time.strptime(value, COLLECTED_AT_FORMAT)))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class NewsItem(MutableMapping):
+    """新闻条目，未设置的slot即不存在的键"""
+
+    __slots__ = ('title', 'link', 'guid', 'description', 'published', 'published_ts',
+                 'source', 'category', 'collected_ts', 'content', 'extra')
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **fields):
+        """
+        Args:
+            data: 新闻字典，如从文件读取的一条新闻
+            fields: 其他字段，与data中的同名字段冲突时优先
+        """
+        if data:
+            for key, value in data.items():
+                self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'NewsItem':
+        """由新闻字典创建，已经是NewsItem时原样返回"""
+        if isinstance(data, cls):
+            return data
+        return cls(data)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _SLOT_FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if key == 'collected_at':
+            timestamp = getattr(self, 'collected_ts', None)
+            if timestamp is not None:
+                return format_collected_at(timestamp)
+        extra = getattr(self, 'extra', None)
+        if extra is None or key not in extra:
+            raise KeyError(key)
+        return extra[key]
+
+    def __setitem__(self, key: str, value: Any):
+        if key in _SLOT_FIELDS:
+            if key in _INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            elif key == 'content' and value == getattr(self, 'description', None):
+                value = self.description
+            setattr(self, key, value)
+            return
+        if key == 'collected_at':
+            timestamp = parse_collected_at(value) if isinstance(value, str) else None
+            if timestamp is not None:
+                self.collected_ts = timestamp
+                if getattr(self, 'extra', None):
+                    self.extra.pop(key, None)
+                return
+        extra = getattr(self, 'extra', None)
+        if extra is None:
+            extra = self.extra = {}
+        extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in _SLOT_FIELDS and hasattr(self, key):
+            delattr(self, key)
+            return
+        if key == 'collected_at' and hasattr(self, 'collected_ts'):
+            del self.collected_ts
+            return
+        extra = getattr(self, 'extra', None)
+        if extra is None or key not in extra:
+            raise KeyError(key)
+        del extra[key]
+
+    def __contains__(self, key) -> bool:
+        if key in _SLOT_FIELDS:
+            return hasattr(self, key)
+        if key == 'collected_at' and hasattr(self, 'collected_ts'):
+            return True
+        extra = getattr(self, 'extra', None)
+        return extra is not None and key in extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in FIELDS:
+            if key in self:
+                yield key
+        extra = getattr(self, 'extra', None)
+        if extra:
+            yield from (key for key in extra if key not in FIELDS)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'NewsItem({self.to_dict()!r})'
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # 固定字段直接读取slot，不经过KeyError
+        if key in _SLOT_FIELDS:
+            return getattr(self, key, default)
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def copy(self) -> 'NewsItem':
+        """浅拷贝，extra字典单独复制，修改副本的字段不影响原条目"""
+        item = NewsItem.__new__(NewsItem)
+        for slot in NewsItem.__slots__:
+            if hasattr(self, slot):
+                setattr(item, slot, getattr(self, slot))
+        if getattr(self, 'extra', None) is not None:
+            item.extra = dict(self.extra)
+        return item
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转为用于序列化的dict，字段顺序与收集时一致"""
+        return {key: self[key] for key in self}
+
+
+def to_dict(item: Dict[str, Any]) -> Dict[str, Any]:
+    """NewsItem转为dict，其他新闻字典原样返回"""
+    return item.to_dict() if isinstance(item, NewsItem) else item
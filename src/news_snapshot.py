@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+按列存储的新闻快照
+JSON/JSON Lines按行保存，统计"每个来源每天多少条"也要解析每条新闻的全部字段。快照把一次收集的新闻按列保存：
+- source、category、status：字典编码，文件头保存取值列表，每行只保存uint32编号
+- published_ts、collected_ts：int64整数列
+- title、link等文本：每行的UTF-8字节长度保存在uint32长度列中，内容依次拼接；content与description相同时不重复保存
+- extra：其余字段（categories、alternate_sources等）序列化为JSON文本
+
+文件结构为 魔数 + 文件头长度 + JSON文件头（行数、各列的类型、位置和字典）+ 按8字节对齐的各列数据。
+读取时用mmap映射文件，只读取用到的列，统计来源和日期时不会读取标题、正文等文本列。
+
+用法:
+    python src/news_snapshot.py write output/raw_news.jsonl output/snapshots/raw_news.col
+    python src/news_snapshot.py count --by source day --since 2025-07-01
+    python src/news_snapshot.py info output/snapshots/news_20250725_120000.col
+"""
+import argparse
+import glob
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import json_backend
+from atomic_io import AtomicFile
+from date_parser import DEFAULT_TZ, format_timestamp, item_timestamp, parse_timestamp
+from news_io import iter_news
+from news_item import FIELDS, NewsItem, parse_collected_at
+from seen_index import STATUS_NEW, STATUS_SEEN
+
+MAGIC = b'NEWSCOL1'
+FORMAT_VERSION = 1
+DEFAULT_SNAPSHOT_DIR = 'output/snapshots'
+SNAPSHOT_PATTERN = 'news_*.col'
+
+DICTIONARY_COLUMNS = ('source', 'category', 'status')
+INTEGER_COLUMNS = ('published_ts', 'collected_ts')
+TEXT_COLUMNS = ('title', 'link', 'guid', 'description', 'published', 'content', 'extra')
+# 可用于分组统计的键：字典编码列和按DEFAULT_TZ计算的发布日期
+GROUP_KEYS = DICTIONARY_COLUMNS + ('day',)
+
+# 空值：整数列为int64最小值，文本列长度为uint32最大值
+NULL_INTEGER = -2 ** 63
+NULL_LENGTH = 0xFFFFFFFF
+# content与description相同（很多源如此）时只记录该长度，不重复保存内容
+SAME_AS_DESCRIPTION = 0xFFFFFFFE
+_ALIGNMENT = 8
+_HEADER_LENGTH = struct.Struct('<I')
+
+
+def _native(values: array) -> bytes:
+    """数组按小端字节序输出"""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _encode_columns(news: Iterable[Dict[str, Any]],
+                    statuses: Optional[Iterable[str]]) -> Tuple[int, Dict[str, dict], List[bytes]]:
+    """按列编码，返回行数、各列的描述和数据块"""
+    dictionaries = {name: {} for name in DICTIONARY_COLUMNS}
+    codes = {name: array('I') for name in DICTIONARY_COLUMNS}
+    integers = {name: array('q') for name in INTEGER_COLUMNS}
+    lengths = {name: array('I') for name in TEXT_COLUMNS}
+    texts = {name: [] for name in TEXT_COLUMNS}
+    status_iter = iter(statuses) if statuses is not None else None
+    rows = 0
+    for item in news:
+        values = {'source': item.get('source'), 'category': item.get('category'),
+                  'status': next(status_iter) if status_iter is not None else None}
+        for name, value in values.items():
+            dictionary = dictionaries[name]
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+            codes[name].append(code)
+        timestamp = item_timestamp(item)
+        collected = getattr(item, 'collected_ts', None)
+        if collected is None and item.get('collected_at'):
+            collected = parse_collected_at(item['collected_at'])
+        for name, value in (('published_ts', timestamp), ('collected_ts', collected)):
+            integers[name].append(NULL_INTEGER if value is None else value)
+        extra = {key: item[key] for key in item if key not in FIELDS}
+        for name in TEXT_COLUMNS:
+            if name == 'extra':
+                value = json_backend.dumps(extra, compact=True) if extra else None
+            else:
+                value = item.get(name)
+            if value is None:
+                lengths[name].append(NULL_LENGTH)
+                continue
+            if name == 'content' and value == item.get('description'):
+                lengths[name].append(SAME_AS_DESCRIPTION)
+                continue
+            data = str(value).encode('utf-8')
+            lengths[name].append(len(data))
+            texts[name].append(data)
+        rows += 1
+
+    columns = {}
+    blocks = []
+    for name in DICTIONARY_COLUMNS:
+        columns[name] = {'type': 'dictionary', 'dictionary': list(dictionaries[name]), 'blocks': [len(blocks)]}
+        blocks.append(_native(codes[name]))
+    for name in INTEGER_COLUMNS:
+        columns[name] = {'type': 'integer', 'blocks': [len(blocks)]}
+        blocks.append(_native(integers[name]))
+    for name in TEXT_COLUMNS:
+        columns[name] = {'type': 'text', 'blocks': [len(blocks), len(blocks) + 1]}
+        blocks.append(_native(lengths[name]))
+        blocks.append(b''.join(texts[name]))
+    return rows, columns, blocks
+
+
+def write_snapshot(news: Iterable[Dict[str, Any]], path: str,
+                   statuses: Optional[Iterable[str]] = None) -> int:
+    """
+    写入快照
+    Args:
+        news: 新闻条目
+        path: 快照文件路径
+        statuses: 与news一一对应的条目状态（new/changed/seen），未知时为None
+    Returns:
+        写入的行数
+    """
+    rows, columns, blocks = _encode_columns(news, statuses)
+    # 文件头中的位置依赖文件头自身的长度，先按占位计算一次，再按实际长度重新计算
+    header = b''
+    while True:
+        offset = len(MAGIC) + _HEADER_LENGTH.size + len(header)
+        positions = []
+        for block in blocks:
+            offset += -offset % _ALIGNMENT
+            positions.append([offset, len(block)])
+            offset += len(block)
+        described = {name: dict(column, blocks=[positions[index] for index in column['blocks']])
+                     for name, column in columns.items()}
+        encoded = json_backend.dumps({'version': FORMAT_VERSION, 'rows': rows, 'columns': described},
+                                     compact=True).encode('utf-8')
+        if len(encoded) == len(header):
+            break
+        header = encoded
+    header = encoded
+    with AtomicFile(path, 'wb', None) as f:
+        f.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+        for block, (position, _) in zip(blocks, positions):
+            f.write(b'\0' * (position - f.tell()))
+            f.write(block)
+    return rows
+
+
+class NewsSnapshot:
+    """只读的快照，按需读取各列"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 快照文件路径
+        Raises:
+            ValueError: 文件不是快照或版本不支持
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            prefix = len(MAGIC) + _HEADER_LENGTH.size
+            if self._map[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"不是新闻快照文件: {path}")
+            header_length, = _HEADER_LENGTH.unpack(self._map[len(MAGIC):prefix])
+            header = json_backend.loads(self._map[prefix:prefix + header_length])
+            if header.get('version') != FORMAT_VERSION:
+                raise ValueError(f"不支持的快照版本 {header.get('version')}: {path}")
+        except Exception:
+            self.close()
+            raise
+        self.rows = header['rows']
+        self.columns = header['columns']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def close(self):
+        """关闭映射和文件"""
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _block(self, name: str, index: int = 0) -> memoryview:
+        offset, length = self.columns[name]['blocks'][index]
+        return memoryview(self._map)[offset:offset + length]
+
+    def _array(self, name: str, typecode: str, index: int = 0) -> array:
+        values = array(typecode)
+        with self._block(name, index) as block:
+            values.frombytes(block)
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values
+
+    def codes(self, name: str) -> Tuple[array, List[Any]]:
+        """
+        读取字典编码列
+        Returns:
+            (每行的编号, 取值列表)
+        """
+        return self._array(name, 'I'), self.columns[name]['dictionary']
+
+    def integers(self, name: str) -> List[Optional[int]]:
+        """读取整数列，空值为None"""
+        return [None if value == NULL_INTEGER else value for value in self._array(name, 'q')]
+
+    def texts(self, name: str) -> List[Optional[str]]:
+        """读取文本列，空值为None"""
+        result = []
+        offset = 0
+        descriptions = None
+        with self._block(name, 1) as data:
+            for row, length in enumerate(self._array(name, 'I')):
+                if length == NULL_LENGTH:
+                    result.append(None)
+                    continue
+                if length == SAME_AS_DESCRIPTION:
+                    if descriptions is None:
+                        descriptions = self.texts('description')
+                    result.append(descriptions[row])
+                    continue
+                result.append(str(data[offset:offset + length], 'utf-8'))
+                offset += length
+        return result
+
+    def column(self, name: str) -> List[Any]:
+        """
+        读取一列的全部值
+        Args:
+            name: 列名
+        Returns:
+            每行的值，字典编码列已解码
+        """
+        column_type = self.columns[name]['type']
+        if column_type == 'dictionary':
+            codes, dictionary = self.codes(name)
+            return [dictionary[code] for code in codes]
+        if column_type == 'integer':
+            return self.integers(name)
+        return self.texts(name)
+
+    def iter_news(self) -> Iterator[NewsItem]:
+        """
+        按行还原新闻，需要读取全部列
+        Yields:
+            新闻条目，字段与写入时相同（published_ts总是存在）
+        """
+        columns = {name: self.column(name) for name in DICTIONARY_COLUMNS + INTEGER_COLUMNS + TEXT_COLUMNS
+                   if name != 'status'}
+        for row in range(self.rows):
+            item = NewsItem()
+            for name in FIELDS:
+                if name == 'collected_at':
+                    if columns['collected_ts'][row] is not None:
+                        item.collected_ts = columns['collected_ts'][row]
+                    continue
+                value = columns[name][row]
+                if value is not None or name == 'published_ts':
+                    item[name] = value
+            if columns['extra'][row] is not None:
+                for key, value in json_backend.loads(columns['extra'][row]).items():
+                    item[key] = value
+            yield item
+
+
+def snapshot_files(snapshot_dir: str = DEFAULT_SNAPSHOT_DIR) -> List[str]:
+    """按文件名（即收集时间）排序的快照文件"""
+    return sorted(glob.glob(os.path.join(snapshot_dir, SNAPSHOT_PATTERN)), key=os.path.basename)
+
+
+def count_by(paths: Iterable[str], keys: Sequence[str] = ('source', 'day'),
+             statuses: Optional[Iterable[str]] = (STATUS_NEW,), since: Optional[int] = None,
+             until: Optional[int] = None) -> Counter:
+    """
+    按列分组计数，只读取分组、状态和时间筛选需要的列
+    Args:
+        paths: 快照文件路径
+        keys: 分组键，可以是source、category、status、day（发布日期，UTC+8）
+        statuses: 只统计这些状态的行，默认只统计首次收集的新闻，使每条新闻在多个快照中只计一次；
+                  None表示不按状态筛选
+        since: 发布时间不早于（UTC时间戳）
+        until: 发布时间早于（UTC时间戳）
+    Returns:
+        Counter: 分组键的取值元组 -> 条数，没有发布时间的新闻日期为None
+    """
+    unknown = [key for key in keys if key not in GROUP_KEYS]
+    if unknown:
+        raise ValueError(f"不支持的分组键: {', '.join(unknown)}")
+    statuses = None if statuses is None else set(statuses)
+    offset = int(DEFAULT_TZ.utcoffset(None).total_seconds())
+    result = Counter()
+    for path in paths:
+        with NewsSnapshot(path) as snapshot:
+            timestamps = None
+            if 'day' in keys or since is not None or until is not None:
+                timestamps = snapshot._array('published_ts', 'q')
+            # 先按编号（日期为天序号）计数，每个分组只解码一次
+            groups = []
+            decoders = []
+            for key in keys:
+                if key == 'day':
+                    groups.append([None if value == NULL_INTEGER else (value + offset) // 86400
+                                   for value in timestamps])
+                    decoders.append(lambda day: None if day is None
+                                    else format_timestamp(day * 86400 - offset, '%Y-%m-%d'))
+                else:
+                    codes, dictionary = snapshot.codes(key)
+                    groups.append(codes)
+                    decoders.append(dictionary.__getitem__)
+            selected = range(snapshot.rows)
+            if statuses is not None:
+                codes, dictionary = snapshot.codes('status')
+                # 没有状态的行（由新闻文件转换的快照）总是统计
+                wanted = {code for code, status in enumerate(dictionary) if status is None or status in statuses}
+                if len(wanted) < len(dictionary):
+                    selected = [row for row in selected if codes[row] in wanted]
+            if since is not None or until is not None:
+                selected = [row for row in selected if timestamps[row] != NULL_INTEGER
+                            and (since is None or timestamps[row] >= since)
+                            and (until is None or timestamps[row] < until)]
+            counts = Counter(zip(*[[group[row] for row in selected] for group in groups]))
+            for key, count in counts.items():
+                result[tuple(decode(value) for decode, value in zip(decoders, key))] += count
+    return result
+
+
+def write_run_snapshot(entry_states: List[Tuple[Dict[str, Any], str]], snapshot_config: Dict[str, Any],
+                       run_time: Optional[datetime] = None) -> Optional[str]:
+    """
+    写入一次收集的快照
+    Args:
+        entry_states: 已收集条目索引返回的 (新闻, 状态) 列表
+        snapshot_config: collector.json中的snapshot配置
+        run_time: 本次运行的时间，用于文件名
+    Returns:
+        快照文件路径，没有需要写入的新闻或写入失败时为None
+    """
+    if not snapshot_config.get('include_seen', False):
+        entry_states = [(item, status) for item, status in entry_states if status != STATUS_SEEN]
+    if not entry_states:
+        return None
+    run_time = run_time or datetime.now()
+    path = os.path.join(snapshot_config.get('dir', DEFAULT_SNAPSHOT_DIR),
+                        f"news_{run_time.strftime('%Y%m%d_%H%M%S')}.col")
+    try:
+        rows = write_snapshot((item for item, _ in entry_states), path,
+                              (status for _, status in entry_states))
+    except OSError as e:
+        logging.error(f"写入新闻快照失败 {path}: {e}")
+        return None
+    logging.info(f"已写入新闻快照 {path}: {rows} 条")
+    return path
+
+
+def _timestamp_arg(value: str) -> int:
+    """命令行中的日期参数，支持date_parser能解析的格式"""
+    timestamp = parse_timestamp(value)
+    if timestamp is None:
+        raise argparse.ArgumentTypeError(f"无法解析的日期: {value}")
+    return timestamp
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='按列存储的新闻快照')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    writer = commands.add_parser('write', help='将新闻文件转换为快照')
+    writer.add_argument('input', help='新闻文件（JSON或JSON Lines）')
+    writer.add_argument('output', help='快照文件路径')
+
+    count = commands.add_parser('count', help='分组计数')
+    count.add_argument('paths', nargs='*', help=f'快照文件，默认为{DEFAULT_SNAPSHOT_DIR}中的全部快照')
+    count.add_argument('--by', nargs='+', choices=GROUP_KEYS, default=['source', 'day'], help='分组键')
+    count.add_argument('--all-statuses', action='store_true', help='统计全部行，默认只统计首次收集的新闻')
+    count.add_argument('--since', type=_timestamp_arg, help='发布时间不早于，如 2025-07-01')
+    count.add_argument('--until', type=_timestamp_arg, help='发布时间早于，如 2025-08-01')
+
+    info = commands.add_parser('info', help='快照的行数和各列大小')
+    info.add_argument('path', help='快照文件')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+    if args.command == 'write':
+        if not os.path.exists(args.input):
+            print(f"新闻文件不存在: {args.input}")
+            sys.exit(1)
+        rows = write_snapshot(iter_news(args.input), args.output)
+        print(f"已写入 {rows} 条新闻到 {args.output}")
+    elif args.command == 'count':
+        paths = args.paths or snapshot_files()
+        counts = count_by(paths, args.by, None if args.all_statuses else (STATUS_NEW,), args.since, args.until)
+        for key, count in sorted(counts.items(), key=lambda pair: (-pair[1], [str(value) for value in pair[0]])):
+            print(f"{count:>8}  {'  '.join('-' if value is None else str(value) for value in key)}")
+        print(f"共 {len(paths)} 个快照，{sum(counts.values())} 条")
+    else:
+        with NewsSnapshot(args.path) as snapshot:
+            print(f"{args.path}: {len(snapshot)} 条")
+            for name, column in snapshot.columns.items():
+                size = sum(length for _, length in column['blocks'])
+                detail = f"，{len(column['dictionary'])} 个取值" if column['type'] == 'dictionary' else ''
+                print(f"  {name:<14}{column['type']:<12}{size / 1024:>10.1f} KB{detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,9 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from feishu_notifier import FeishuNotifier
+from keyword_rules import load_keyword_rules
+from news_io import count_news, find_news_file, load_news
+from relevance import RelevanceScorer
 from utils import load_json_config
 
 
@@ -33,19 +36,20 @@ def create_notification_summary():
     """创建通知摘要"""
     try:
         # 加载筛选后的新闻
-        filtered_news = load_json_config("output/filtered_news.json")
-        raw_news = load_json_config("output/raw_news.json")
+        filtered_news = load_news(find_news_file("output/filtered_news"))
         if not filtered_news:
             return None
         # 收集统计信息
         sources = list(set(item.get('source', '未知') for item in filtered_news))
-        keywords = load_json_config("config/keywords.json")
+        # 与过滤阶段共用config/keywords.yaml的编译结果
+        keyword_rules = load_keyword_rules()
         summary = {
             'date': datetime.now().strftime('%Y-%m-%d'),
-            'total_collected': len(raw_news) if raw_news else 0,
+            # 原始新闻只需要条数，不整体读取
+            'total_collected': count_news(find_news_file("output/raw_news")),
             'filtered_count': len(filtered_news),
             'sources': sources,
-            'keywords': keywords.get('include_keywords', [])
+            'keywords': keyword_rules.include_keywords
         }
         return summary
     except Exception as e:
@@ -53,41 +57,61 @@ def create_notification_summary():
         return None
 
 
-def main():
-    """主函数"""
-    print("开始发送飞书通知...")
+def send_notification(filtered_news=None, keywords_config=None):
+    """发送飞书通知
+
+    Args:
+        filtered_news (list, optional): 筛选后的新闻，默认读取output/filtered_news.jsonl
+        keywords_config (dict | KeywordRules, optional): 相关度评分使用的关键词规则，
+            默认读取config/keywords.yaml
+
+    Returns:
+        bool: 发送成功或按配置跳过时返回True
+    """
     # 加载配置
     config = load_feishu_config()
     # 检查是否启用通知
     if not should_send_notification(config):
         print("飞书通知已禁用，跳过发送")
-        return
+        return True
     # 检查webhook配置
     webhook_url = config.get('webhook_url') or os.getenv('FEISHU_WEBHOOK_URL')
     if not webhook_url:
         print("错误: 未配置飞书webhook地址")
         print("请在 config/feishu.json 中设置 webhook_url 或设置 "
               "FEISHU_WEBHOOK_URL 环境变量")
-        return
-    try:
-        # 设置环境变量
-        os.environ['FEISHU_WEBHOOK_URL'] = webhook_url
-        
-        # 创建通知器
-        notifier = FeishuNotifier()
-        # 检查是否有筛选后的新闻
-        if not os.path.exists("output/filtered_news.json"):
+        return True
+    # 设置环境变量
+    os.environ['FEISHU_WEBHOOK_URL'] = webhook_url
+    
+    # 创建通知器
+    notifier = FeishuNotifier()
+    # 检查是否有筛选后的新闻
+    if filtered_news is None:
+        filtered_news_path = find_news_file("output/filtered_news")
+        if not os.path.exists(filtered_news_path):
             print("未找到筛选后的新闻文件，跳过通知")
-            return
-        # 发送通知
-        success = notifier.notify_filtered_news("output/filtered_news.json")
-        if success:
-            print("飞书通知发送成功")
-        else:
-            print("飞书通知发送失败")
-            logging.warning(
-                "飞书卡片消息发送失败，尝试发送文本消息"
-            )
+            return True
+        filtered_news = load_news(filtered_news_path)
+    # 发送通知，卡片中只展示相关度最高的max_news_per_message条
+    max_news = config.get('notification_settings', {}).get('max_news_per_message', 10)
+    success = notifier.notify_news(filtered_news, max_news=max_news,
+                                   scorer=RelevanceScorer(keywords_config))
+    if success:
+        print("飞书通知发送成功")
+    else:
+        print("飞书通知发送失败")
+        logging.warning(
+            "飞书卡片消息发送失败，尝试发送文本消息"
+        )
+    return success
+
+
+def main():
+    """主函数"""
+    print("开始发送飞书通知...")
+    try:
+        send_notification()
     except Exception as e:
         print(f"发送飞书通知时出错: {e}")
         sys.exit(1)
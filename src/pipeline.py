@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+单进程流水线
+在同一进程内依次执行 收集 → 过滤 → 去重 → Markdown → 存档 → GitHub Pages → 通知，
+各阶段之间直接传递内存中的数据，JSON文件只作为可选的检查点
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from atomic_io import verify_checksum
+from news_io import find_news_file, load_news, news_path, save_news
+from utils import save_json_data
+
+STAGES = ['collect', 'filter', 'dedupe', 'markdown', 'archive', 'pages', 'notify']
+STAGE_NAMES = {
+    'collect': '收集RSS内容',
+    'filter': '过滤新闻',
+    'dedupe': '合并近似重复新闻',
+    'markdown': '生成Markdown文件',
+    'archive': '写入新闻存档',
+    'pages': '生成GitHub Pages',
+    'notify': '发送飞书通知'
+}
+# 各阶段的检查点文件（不含扩展名，格式由config/collector.json中的news_format决定）
+RAW_CHECKPOINT = 'output/raw_news'
+FILTERED_CHECKPOINT = 'output/filtered_news'
+SUMMARY_FILE = 'output/summary.json'
+
+
+class PipelineError(Exception):
+    """流水线阶段执行失败"""
+
+
+def run_collect(context, args):
+    """收集阶段"""
+    from collect_rss import collect_rss_feeds
+    context['raw_news'] = collect_rss_feeds(max_workers=args.workers, incremental=args.incremental)
+    if not context['raw_news'] and not args.incremental:
+        raise PipelineError("未收集到任何新闻")
+    if args.checkpoint:
+        save_news(context['raw_news'], news_path(RAW_CHECKPOINT))
+    print(f"收集到 {len(context['raw_news'])} 条新闻")
+
+
+def run_filter(context, args):
+    """过滤阶段"""
+    from filter_news import build_summary, filter_news_items
+    rules = keyword_rules(context)
+    index = news_index(context) if rules.match_mode == 'token' else None
+    context['filtered_news'] = filter_news_items(require(context, 'raw_news', RAW_CHECKPOINT), rules, index)
+    if args.checkpoint:
+        save_news(context['filtered_news'], news_path(FILTERED_CHECKPOINT))
+        save_json_data(build_summary(context['filtered_news']), SUMMARY_FILE)
+    print(f"已过滤 {len(context['filtered_news'])} 条新闻")
+
+
+def run_dedupe(context, args):
+    """去重阶段，合并跨来源转载的同一条新闻"""
+    from near_duplicates import dedupe_news, load_dedup_config
+    config = load_dedup_config()
+    if not config.get('enabled', True):
+        print("近似重复去重未启用，跳过")
+        return
+    filtered_news = require(context, 'filtered_news', FILTERED_CHECKPOINT)
+    context['filtered_news'] = dedupe_news(filtered_news, config, drop_seen=args.incremental)
+    if args.checkpoint:
+        from filter_news import build_summary
+        save_news(context['filtered_news'], news_path(FILTERED_CHECKPOINT))
+        save_json_data(build_summary(context['filtered_news']), SUMMARY_FILE)
+    print(f"去重后保留 {len(context['filtered_news'])} 条新闻（原 {len(filtered_news)} 条）")
+
+
+def run_markdown(context, args):
+    """Markdown阶段"""
+    from generate_markdown import generate_all_markdown
+    generate_all_markdown(require(context, 'raw_news', RAW_CHECKPOINT),
+                          require(context, 'filtered_news', FILTERED_CHECKPOINT))
+
+
+def run_archive(context, args):
+    """存档阶段，写入可检索的新闻存档"""
+    from news_archive import archive_run
+    archive_run(require(context, 'raw_news', RAW_CHECKPOINT),
+                require(context, 'filtered_news', FILTERED_CHECKPOINT))
+
+
+def run_pages(context, args):
+    """GitHub Pages阶段"""
+    from generate_github_pages import generate_pages
+    if not generate_pages(require(context, 'filtered_news', FILTERED_CHECKPOINT), keyword_rules(context)):
+        raise PipelineError("GitHub Pages生成失败")
+
+
+def run_notify(context, args):
+    """通知阶段，发送失败不影响流水线结果"""
+    from notify import send_notification
+    filtered_news = require(context, 'filtered_news', FILTERED_CHECKPOINT)
+    try:
+        send_notification(filtered_news, keyword_rules(context))
+    except Exception as e:
+        logging.warning(f"发送飞书通知失败: {str(e)}")
+
+
+STAGE_RUNNERS = {
+    'collect': run_collect,
+    'filter': run_filter,
+    'dedupe': run_dedupe,
+    'markdown': run_markdown,
+    'archive': run_archive,
+    'pages': run_pages,
+    'notify': run_notify
+}
+
+
+def require(context, key, checkpoint_path):
+    """
+    获取前一阶段的数据，当前进程中没有时从检查点文件恢复
+    Args:
+        context: 阶段间共享的数据
+        key: 数据名称
+        checkpoint_path: 不含扩展名的检查点文件路径
+    Returns:
+        list: 数据
+    """
+    if context.get(key) is None:
+        checkpoint_path = find_news_file(checkpoint_path)
+        if not os.path.exists(checkpoint_path):
+            raise PipelineError(f"缺少前一阶段的数据，且检查点文件不存在: {checkpoint_path}")
+        if verify_checksum(checkpoint_path) is False:
+            raise PipelineError(f"检查点文件与校验和不一致，可能已损坏: {checkpoint_path}")
+        logging.info(f"从检查点恢复 {key}: {checkpoint_path}")
+        context[key] = load_news(checkpoint_path)
+    return context[key]
+
+
+def keyword_rules(context):
+    """获取各阶段共用的编译后的关键词规则"""
+    if 'keyword_rules' not in context:
+        from keyword_rules import load_keyword_rules
+        context['keyword_rules'] = load_keyword_rules()
+    return context['keyword_rules']
+
+
+def news_index(context):
+    """获取原始新闻的倒排索引，第一次使用时逐条加入原始新闻建立"""
+    if 'news_index' not in context:
+        index = keyword_rules(context).create_index()
+        index.extend(require(context, 'raw_news', RAW_CHECKPOINT))
+        logging.info(f"已建立 {len(index)} 条新闻的倒排索引，共 {len(index.postings)} 个词")
+        context['news_index'] = index
+    return context['news_index']
+
+
+def select_stages(only=None, skip=None, resume_from=None):
+    """
+    根据命令行参数确定要执行的阶段
+    Args:
+        only: 只执行这些阶段
+        skip: 跳过这些阶段
+        resume_from: 从该阶段开始执行
+    Returns:
+        list: 按执行顺序排列的阶段
+    """
+    stages = list(STAGES)
+    if resume_from:
+        stages = stages[STAGES.index(resume_from):]
+    if only:
+        stages = [stage for stage in stages if stage in only]
+    if skip:
+        stages = [stage for stage in stages if stage not in skip]
+    return stages
+
+
+def run_pipeline(stages, args):
+    """
+    依次执行各阶段
+    Args:
+        stages: 要执行的阶段
+        args: 命令行参数
+    Returns:
+        bool: 全部阶段成功返回True
+    """
+    context = {}
+    for stage in stages:
+        print(f"\n{'='*50}")
+        print(f"正在执行: {STAGE_NAMES[stage]}")
+        print('='*50)
+        started = time.perf_counter()
+        try:
+            STAGE_RUNNERS[stage](context, args)
+        except PipelineError as e:
+            print(f"错误: {e}")
+            print(f"可修复后使用 --from {stage} 从该阶段继续")
+            return False
+        logging.info(f"{STAGE_NAMES[stage]}完成，耗时 {time.perf_counter() - started:.2f} 秒")
+    return True
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='在单个进程内运行RSS收集与筛选流水线')
+    parser.add_argument('--only', nargs='+', choices=STAGES, help='只执行指定阶段')
+    parser.add_argument('--skip', nargs='+', choices=STAGES, default=[], help='跳过指定阶段')
+    parser.add_argument('--from', dest='resume_from', choices=STAGES,
+                        help='从指定阶段继续，之前阶段的数据从检查点文件恢复')
+    parser.add_argument('--checkpoint', action='store_true',
+                        help='将raw_news/filtered_news/summary保存为JSON检查点')
+    parser.add_argument('--workers', type=int, default=None, help='并发收集的线程数')
+    parser.add_argument('--incremental', action='store_true', default=None,
+                        help='只处理新增或内容有变化的新闻')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+    if args.incremental is None:
+        from collect_rss import load_collector_config
+        args.incremental = load_collector_config().get('incremental', False)
+    os.makedirs('output', exist_ok=True)
+    stages = select_stages(args.only, args.skip, args.resume_from)
+    print(f"开始RSS内容收集与筛选，执行阶段: {' → '.join(stages)}")
+    if not run_pipeline(stages, args):
+        sys.exit(1)
+    print("\n" + "="*50)
+    print("执行完成！")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+新闻相关度评分与Top-K选取
+相关度 = (1 + 关键词得分) × 时间衰减 × 来源权重：
+- 关键词得分：每个命中的include关键词计一次，权重为keyword_weights中的值，
+  乘以它出现的字段中最高的字段加权（标题 > 描述 > 正文）；与过滤一样按match_mode判断是否命中，
+  按词匹配（token）时在倒排索引上查找，不会因子串命中（如meta命中metabolism）而加分
+- 时间衰减：每经过half_life_hours小时减半
+- 来源权重：source_weights中的值，未配置的来源为default_source_weight
+飞书通知和GitHub Pages首页只需要最相关的K条，用容量为K的堆选取，不对全部新闻排序
+"""
+import heapq
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from date_parser import item_timestamp
+from keyword_rules import get_keyword_rules
+
+DEFAULT_SCORING = {
+    'default_keyword_weight': 1.0,
+    'keyword_weights': {},
+    'field_boosts': {'title': 3.0, 'description': 1.5, 'content': 1.0},
+    'half_life_hours': 24,
+    'default_source_weight': 1.0,
+    'source_weights': {},
+    # GitHub Pages首页"最相关"栏目的条数
+    'pages_top_k': 10
+}
+
+
+class RelevanceScorer:
+    """基于关键词规则中scoring配置的相关度评分"""
+
+    def __init__(self, keywords_config=None, now: Optional[float] = None):
+        """
+        Args:
+            keywords_config: None（读取config/keywords.yaml）、关键词配置字典或KeywordRules
+            now: 计算时间衰减的当前时间戳，默认为time.time()
+        """
+        rules = get_keyword_rules(keywords_config)
+        self.rules = rules
+        self.config = {**DEFAULT_SCORING, **(rules.get('scoring') or {})}
+        self.matcher = rules.include
+        self.token_mode = rules.match_mode == 'token'
+        self.keyword_weights = self.config['keyword_weights'] or {}
+        self.source_weights = self.config['source_weights'] or {}
+        # 按加权从高到低扫描字段，关键词取第一次出现的字段的加权
+        self.field_boosts = sorted(self.config['field_boosts'].items(), key=lambda pair: -pair[1])
+        self.half_life = self.config['half_life_hours'] * 3600
+        self.now = time.time() if now is None else now
+
+    def token_boosts(self, news_list: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """
+        按词匹配时，在倒排索引上查找每条新闻命中的关键词
+        Args:
+            news_list: 新闻列表
+        Returns:
+            与news_list一一对应的 {命中的关键词: 所在字段中最高的字段加权}
+        """
+        boosts = [{} for _ in news_list]
+        if not self.matcher.keywords or not news_list:
+            return boosts
+        field_boosts = dict(self.field_boosts)
+        index = self.rules.create_index(list(field_boosts))
+        index.extend(news_list)
+        for keyword in self.matcher.keywords:
+            for doc_id, occurrences in index.occurrences(keyword).items():
+                boosts[doc_id][keyword] = max(field_boosts[index.fields[field]] for field, _, _ in occurrences)
+        return boosts
+
+    def keyword_score(self, item: Dict[str, Any], boosts: Optional[Dict[str, float]] = None) -> float:
+        """
+        命中关键词的加权和
+        Args:
+            item: 新闻条目
+            boosts: 按词匹配时token_boosts已算出的该条新闻的结果，为None时单独计算
+        Returns:
+            关键词得分
+        """
+        if self.token_mode:
+            if boosts is None:
+                boosts = self.token_boosts([item])[0]
+        else:
+            boosts = {}
+            for field, boost in self.field_boosts:
+                for keyword in self.matcher.matches(item.get(field) or ''):
+                    boosts.setdefault(keyword, boost)
+        default = self.config['default_keyword_weight']
+        return sum(self.keyword_weights.get(keyword, default) * boost for keyword, boost in boosts.items())
+
+    def recency(self, item: Dict[str, Any]) -> float:
+        """时间衰减系数，发布时间无法解析时按一个半衰期计算（收集时间是每次运行的时间，不能代表新旧）"""
+        if not self.half_life:
+            return 1.0
+        timestamp = item_timestamp(item)
+        age = self.half_life if timestamp is None else max(self.now - timestamp, 0)
+        return 0.5 ** (age / self.half_life)
+
+    def score(self, item: Dict[str, Any], boosts: Optional[Dict[str, float]] = None) -> float:
+        """
+        计算新闻的相关度
+        Args:
+            item: 新闻条目
+            boosts: 按词匹配时token_boosts已算出的该条新闻的结果
+        Returns:
+            相关度，越大越相关
+        """
+        source_weight = self.source_weights.get(item.get('source', ''), self.config['default_source_weight'])
+        return (1 + self.keyword_score(item, boosts)) * self.recency(item) * source_weight
+
+    def top_k(self, news_list: Iterable[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """
+        选取相关度最高的k条新闻
+        Args:
+            news_list: 新闻列表
+            k: 条数
+        Returns:
+            按相关度从高到低排列的新闻，相关度相同时保持原顺序
+        """
+        if k <= 0:
+            return []
+        if self.token_mode:
+            # 全部新闻建一个索引，每个关键词只查询一次
+            news_list = list(news_list)
+            all_boosts = self.token_boosts(news_list)
+            scored = ((self.score(item, all_boosts[index]), -index, item) for index, item in enumerate(news_list))
+        else:
+            scored = ((self.score(item), -index, item) for index, item in enumerate(news_list))
+        return [item for _, _, item in heapq.nlargest(k, scored, key=lambda entry: entry[:2])]
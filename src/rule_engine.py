@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+关键词规则引擎
+解析keywords.yaml中rules的布尔/邻近表达式，与include_keywords、exclude_keywords一起编译成一个执行计划。
+每个字段的全部关键词合并成一个匹配器，每条新闻的每个字段最多扫描一遍，规则只在扫描结果上求值，
+规则变多不会成倍增加单条新闻的匹配开销。
+keywords.yaml中match_mode为token时按词匹配，执行计划改为在倒排索引（inverted_index.py）上求值。
+
+表达式语法:
+    特斯拉                      关键词，在规则的默认字段中查找（不区分大小写）
+    "Elon Musk"                 含空格或特殊字符的关键词用双引号括起
+    title:特斯拉                只在指定字段中查找，字段为 title/description/content/source
+    A AND B / A OR B / NOT A    布尔运算，优先级 NOT > AND > OR，相邻的关键词视为AND
+    (A OR B) AND C              括号分组
+    A NEAR/20 B                 A与B出现在同一字段中，且相隔不超过20个字符
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from keyword_matcher import KeywordMatcher
+
+FIELDS = ('title', 'description', 'content', 'source')
+# 规则未指定fields时的默认字段，与include_keywords一致只看标题
+DEFAULT_FIELDS = ('title',)
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<lparen>\() |
+        (?P<rparen>\)) |
+        (?P<near>NEAR/(?P<distance>\d+))(?![^\s()]) |
+        (?P<op>AND|OR|NOT)(?![^\s()]) |
+        (?:(?P<field>[a-z]+):)?(?:"(?P<quoted>[^"]*)"|(?P<bare>[^\s()"]+))
+    )
+''', re.VERBOSE)
+
+
+class RuleSyntaxError(ValueError):
+    """规则表达式语法错误"""
+
+
+def _tokenize(expression: str) -> List[Tuple[str, Any]]:
+    """将表达式切分为 (类型, 值) 列表"""
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match or match.end() == position:
+            raise RuleSyntaxError(f"无法解析 '{expression[position:]}'")
+        position = match.end()
+        if match.group('lparen'):
+            tokens.append(('(', None))
+        elif match.group('rparen'):
+            tokens.append((')', None))
+        elif match.group('near'):
+            tokens.append(('NEAR', int(match.group('distance'))))
+        elif match.group('op'):
+            tokens.append((match.group('op'), None))
+        else:
+            field = match.group('field')
+            text = match.group('quoted') if match.group('quoted') is not None else match.group('bare')
+            if field and field not in FIELDS:
+                # 不是字段前缀，冒号属于关键词本身
+                text = match.group(0).strip()
+                field = None
+            if not text:
+                raise RuleSyntaxError("关键词不能为空")
+            tokens.append(('TERM', (field, text.lower())))
+    return tokens
+
+
+class _Parser:
+    """递归下降解析器，生成由元组组成的语法树"""
+
+    def __init__(self, tokens: List[Tuple[str, Any]], default_fields: Tuple[str, ...]):
+        self.tokens = tokens
+        self.index = 0
+        self.default_fields = default_fields
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.index][0] if self.index < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, Any]:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise RuleSyntaxError("表达式为空")
+        node = self.parse_or()
+        if self.index < len(self.tokens):
+            raise RuleSyntaxError(f"多余的 '{self.peek()}'")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == 'OR':
+            self.take()
+            children.append(self.parse_and())
+        if len(children) == 1:
+            return children[0]
+        # 同一组字段上的关键词之间的OR合并为一次集合判断
+        if all(child[0] == 'term' and child[1] == children[0][1] for child in children):
+            return ('any', children[0][1], frozenset(child[2] for child in children))
+        return ('or', tuple(children))
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek() in ('AND', 'NOT', 'TERM', '('):
+            if self.peek() == 'AND':
+                self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else ('and', tuple(children))
+
+    def parse_not(self):
+        if self.peek() == 'NOT':
+            self.take()
+            return ('not', self.parse_not())
+        return self.parse_near()
+
+    def parse_near(self):
+        node = self.parse_primary()
+        while self.peek() == 'NEAR':
+            _, distance = self.take()
+            right = self.parse_primary()
+            if node[0] != 'term' or right[0] != 'term':
+                raise RuleSyntaxError("NEAR的两侧必须是关键词")
+            fields = tuple(field for field in node[1] if field in right[1])
+            if not fields:
+                raise RuleSyntaxError("NEAR两侧的关键词没有共同的字段")
+            node = ('near', fields, node[2], right[2], distance)
+        return node
+
+    def parse_primary(self):
+        kind = self.peek()
+        if kind == '(':
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ')':
+                raise RuleSyntaxError("缺少 ')'")
+            self.take()
+            return node
+        if kind == 'TERM':
+            _, (field, text) = self.take()
+            return ('term', (field,) if field else self.default_fields, text)
+        raise RuleSyntaxError(f"此处需要关键词或 '('，实际为 '{kind or '结尾'}'")
+
+
+def parse_rule(expression: str, default_fields: Iterable[str] = DEFAULT_FIELDS):
+    """
+    解析规则表达式
+    Args:
+        expression: 规则表达式
+        default_fields: 未指定字段的关键词查找的字段
+    Returns:
+        语法树
+    Raises:
+        RuleSyntaxError: 表达式语法错误
+    """
+    return _Parser(_tokenize(expression), tuple(default_fields)).parse()
+
+
+def _collect_terms(node, terms: Dict[str, set], positional_fields: set):
+    """收集语法树中每个字段需要查找的关键词，以及需要命中位置（用于NEAR）的字段"""
+    kind = node[0]
+    if kind == 'term':
+        for field in node[1]:
+            terms[field].add(node[2])
+    elif kind == 'near':
+        positional_fields.update(node[1])
+        for field in node[1]:
+            terms[field].update((node[2], node[3]))
+    elif kind == 'any':
+        for field in node[1]:
+            terms[field].update(node[2])
+    elif kind == 'not':
+        _collect_terms(node[1], terms, positional_fields)
+    else:
+        for child in node[1]:
+            _collect_terms(child, terms, positional_fields)
+
+
+def _within(left: List[Tuple[int, int]], right: List[Tuple[int, int]], distance: int) -> bool:
+    """判断两组命中中是否有一对相隔不超过distance个字符"""
+    for left_start, left_end in left:
+        for right_start, right_end in right:
+            if max(right_start - left_end, left_start - right_end, 0) <= distance:
+                return True
+    return False
+
+
+def _evaluate_index(node, index, universe: Set[int]) -> Set[int]:
+    """在倒排索引上对语法树求值，返回满足条件的新闻序号"""
+    kind = node[0]
+    if kind == 'term':
+        return index.phrase(node[2], node[1])
+    if kind == 'any':
+        return set().union(*(index.phrase(term, node[1]) for term in node[2]))
+    if kind == 'and':
+        result = _evaluate_index(node[1][0], index, universe)
+        for child in node[1][1:]:
+            if not result:
+                break
+            result &= _evaluate_index(child, index, universe)
+        return result
+    if kind == 'or':
+        return set().union(*(_evaluate_index(child, index, universe) for child in node[1]))
+    if kind == 'not':
+        return universe - _evaluate_index(node[1], index, universe)
+    # near
+    result = set()
+    for field in node[1]:
+        left = index.occurrences(node[2], (field,))
+        right = index.occurrences(node[3], (field,))
+        for doc_id in left.keys() & right.keys():
+            if _within([hit[1:] for hit in left[doc_id]], [hit[1:] for hit in right[doc_id]], node[4]):
+                result.add(doc_id)
+    return result
+
+
+class _ItemHits:
+    """单条新闻的扫描结果，每个字段在第一次用到时扫描"""
+
+    def __init__(self, item: Dict[str, Any], plan: 'RulePlan'):
+        self.item = item
+        self.plan = plan
+        self.fields: Dict[str, Dict[str, List[Tuple[int, int]]]] = {}
+
+    def field(self, name: str) -> Dict[str, List[Tuple[int, int]]]:
+        """返回字段中命中的关键词，只有NEAR用到的字段才记录位置"""
+        hits = self.fields.get(name)
+        if hits is None:
+            text = self.item.get(name) or ''
+            matcher = self.plan.matchers[name]
+            if name in self.plan.positional_fields:
+                hits = {}
+                for start, end, term in matcher.find_all(text):
+                    hits.setdefault(term, []).append((start, end))
+            else:
+                hits = dict.fromkeys(matcher.matches(text))
+            self.fields[name] = hits
+        return hits
+
+    def evaluate(self, node) -> bool:
+        kind = node[0]
+        if kind == 'term':
+            return any(node[2] in self.field(field) for field in node[1])
+        if kind == 'any':
+            return any(not node[2].isdisjoint(self.field(field)) for field in node[1])
+        if kind == 'and':
+            return all(self.evaluate(child) for child in node[1])
+        if kind == 'or':
+            return any(self.evaluate(child) for child in node[1])
+        if kind == 'not':
+            return not self.evaluate(node[1])
+        # near
+        for field in node[1]:
+            hits = self.field(field)
+            if node[2] in hits and node[3] in hits and _within(hits[node[2]], hits[node[3]], node[4]):
+                return True
+        return False
+
+
+class RulePlan:
+    """include/exclude关键词与表达式规则编译成的执行计划"""
+
+    def __init__(self, include_keywords: Iterable[str] = (), exclude_keywords: Iterable[str] = (),
+                 rules: Optional[List[Dict[str, Any]]] = None):
+        """
+        编译执行计划
+        Args:
+            include_keywords: 标题中包含任一即保留的关键词
+            exclude_keywords: 标题中包含任一即排除的关键词，对规则命中的新闻同样生效
+            rules: 规则配置，每项包含name、match和可选的fields
+        Raises:
+            RuleSyntaxError: 规则表达式语法错误
+        """
+        # include/exclude只是标题上的关键词列表，用匹配器的首个命中判断即可，不需要完整的扫描结果
+        self.include = KeywordMatcher(include_keywords)
+        self.exclude = KeywordMatcher(exclude_keywords)
+        self.rules: List[Tuple[str, Any]] = []
+        for index, rule in enumerate(rules or []):
+            name = rule.get('name') or f"rule-{index + 1}"
+            try:
+                node = parse_rule(rule['match'], rule.get('fields') or DEFAULT_FIELDS)
+            except RuleSyntaxError as e:
+                raise RuleSyntaxError(f"规则 {name}: {e}") from None
+            self.rules.append((name, node))
+
+        terms = {field: set() for field in FIELDS}
+        self.positional_fields = set()
+        for _, node in self.rules:
+            _collect_terms(node, terms, self.positional_fields)
+        # 每个字段一个匹配器，包含所有规则在该字段上用到的关键词
+        self.matchers = {field: KeywordMatcher(sorted(terms[field])) for field in FIELDS}
+        # 按词匹配时需要建立索引的字段，以及需要加入分词词典的全部关键词
+        self.fields = tuple(field for field in FIELDS if field == 'title' or terms[field])
+        self.vocabulary = sorted({keyword.lower() for keyword in self.include.keywords + self.exclude.keywords}
+                                 .union(*terms.values()))
+
+    def __bool__(self) -> bool:
+        return bool(self.include) or bool(self.rules)
+
+    def match(self, item: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        对单条新闻求值
+        Args:
+            item: 新闻条目
+        Returns:
+            保留时返回命中的规则名列表（只命中include_keywords时为空列表），不保留时返回None
+        """
+        title = item.get('title', '')
+        if self.exclude.contains(title):
+            return None
+        hits = _ItemHits(item, self)
+        matched = [name for name, node in self.rules if hits.evaluate(node)]
+        if matched or self.include.contains(title):
+            return matched
+        return None
+
+    def keep(self, item: Dict[str, Any]) -> bool:
+        """
+        判断新闻是否保留，命中第一条规则即返回
+        Args:
+            item: 新闻条目
+        Returns:
+            bool: 保留返回True
+        """
+        title = item.get('title', '')
+        if self.exclude.contains(title):
+            return False
+        if self.include.contains(title):
+            return True
+        hits = _ItemHits(item, self)
+        return any(hits.evaluate(node) for _, node in self.rules)
+
+    def select(self, index) -> List[int]:
+        """
+        按词匹配筛选：在倒排索引上对include/exclude关键词和规则求值，不再逐条扫描新闻
+        Args:
+            index: InvertedIndex，至少包含self.fields中的字段
+        Returns:
+            保留的新闻在索引中的序号，按加入索引的顺序排列
+        """
+        universe = set(range(len(index)))
+        excluded = set().union(*(index.phrase(keyword, ('title',)) for keyword in self.exclude.keywords))
+        kept = set().union(*(index.phrase(keyword, ('title',)) for keyword in self.include.keywords))
+        for _, node in self.rules:
+            kept |= _evaluate_index(node, index, universe)
+        return sorted(kept - excluded)
+
+    def filter(self, news_list: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        筛选新闻
+        Args:
+            news_list: 新闻列表
+        Returns:
+            保留的新闻，保持原顺序
+        """
+        return [item for item in news_list if self.keep(item)]
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+RSS源自适应抓取调度
+根据历史发布时间学习每个源的更新频率，并参考RSS自带的<ttl>、<skipHours>、<skipDays>
+和sy:updatePeriod/sy:updateFrequency提示，决定每次运行时哪些源需要重新抓取
+"""
+import logging
+import os
+import re
+import statistics
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from utils import load_config, save_json_data
+
+DEFAULT_MIN_INTERVAL_MINUTES = 60
+DEFAULT_MAX_INTERVAL_MINUTES = 24 * 60
+# 定时任务的触发时间会有偏差，提前这么多分钟到期的源也视为到期
+DEFAULT_DUE_TOLERANCE_MINUTES = 10
+# 学习到的发布间隔的平滑系数
+CADENCE_SMOOTHING = 0.3
+# 没有新内容时抓取间隔的增长倍数
+IDLE_GROWTH = 1.5
+# 计算发布间隔时最多参考的条目数
+MAX_CADENCE_SAMPLES = 20
+
+UPDATE_PERIOD_MINUTES = {
+    'hourly': 60,
+    'daily': 24 * 60,
+    'weekly': 7 * 24 * 60,
+    'monthly': 30 * 24 * 60,
+    'yearly': 365 * 24 * 60
+}
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# 只在条目之前的频道头部查找提示
+_HEADER_END_RE = re.compile(r'<(?:item|entry)[\s>]', re.IGNORECASE)
+_TTL_RE = re.compile(r'<ttl>\s*(\d+)\s*</ttl>', re.IGNORECASE)
+_UPDATE_PERIOD_RE = re.compile(r'<sy:updatePeriod>\s*(\w+)\s*</sy:updatePeriod>', re.IGNORECASE)
+_UPDATE_FREQUENCY_RE = re.compile(r'<sy:updateFrequency>\s*(\d+)\s*</sy:updateFrequency>', re.IGNORECASE)
+_SKIP_HOURS_RE = re.compile(r'<skipHours>(.*?)</skipHours>', re.IGNORECASE | re.DOTALL)
+_SKIP_DAYS_RE = re.compile(r'<skipDays>(.*?)</skipDays>', re.IGNORECASE | re.DOTALL)
+_HOUR_RE = re.compile(r'<hour>\s*(\d+)\s*</hour>', re.IGNORECASE)
+_DAY_RE = re.compile(r'<day>\s*(\w+)\s*</day>', re.IGNORECASE)
+
+
+def extract_feed_hints(content: str) -> Dict[str, Any]:
+    """
+    从RSS内容的频道头部提取抓取频率提示
+    feedparser只保留skipHours中的最后一个小时，因此直接从原始内容中解析
+    Args:
+        content: RSS内容
+    Returns:
+        包含ttl_minutes、update_period_minutes、skip_hours(UTC)、skip_days的字典
+    """
+    hints = {}
+    if not content:
+        return hints
+    match = _HEADER_END_RE.search(content)
+    header = content[:match.start()] if match else content[:8192]
+
+    ttl = _TTL_RE.search(header)
+    if ttl:
+        hints['ttl_minutes'] = int(ttl.group(1))
+
+    period = _UPDATE_PERIOD_RE.search(header)
+    if period and period.group(1).lower() in UPDATE_PERIOD_MINUTES:
+        frequency = _UPDATE_FREQUENCY_RE.search(header)
+        times = max(int(frequency.group(1)), 1) if frequency else 1
+        hints['update_period_minutes'] = UPDATE_PERIOD_MINUTES[period.group(1).lower()] / times
+
+    skip_hours = _SKIP_HOURS_RE.search(header)
+    if skip_hours:
+        hours = sorted({int(h) % 24 for h in _HOUR_RE.findall(skip_hours.group(1))})
+        if hours:
+            hints['skip_hours'] = hours
+
+    skip_days = _SKIP_DAYS_RE.search(header)
+    if skip_days:
+        days = sorted({d.lower() for d in _DAY_RE.findall(skip_days.group(1)) if d.lower() in WEEKDAYS})
+        if days:
+            hints['skip_days'] = days
+    return hints
+
+
+def observed_cadence_minutes(entry_timestamps: List[float]) -> Optional[float]:
+    """
+    根据条目发布时间计算发布间隔的中位数
+    Args:
+        entry_timestamps: 条目发布时间（UTC时间戳）
+    Returns:
+        发布间隔（分钟），条目不足时返回None
+    """
+    timestamps = sorted(set(ts for ts in entry_timestamps if ts), reverse=True)[:MAX_CADENCE_SAMPLES]
+    if len(timestamps) < 2:
+        return None
+    gaps = [(a - b) / 60 for a, b in zip(timestamps, timestamps[1:])]
+    return max(statistics.median(gaps), 1.0)
+
+
+def skip_forward(due: datetime, hints: Dict[str, Any]) -> datetime:
+    """
+    将到期时间推迟到不在skipHours/skipDays内的第一个整点
+    Args:
+        due: 到期时间（UTC）
+        hints: 抓取频率提示
+    Returns:
+        调整后的到期时间
+    """
+    skip_hours = set(hints.get('skip_hours', []))
+    skip_days = set(hints.get('skip_days', []))
+    if not skip_hours and not skip_days:
+        return due
+    # 最多向后查找一周
+    for _ in range(7 * 24):
+        if due.hour not in skip_hours and WEEKDAYS[due.weekday()] not in skip_days:
+            return due
+        due = due.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return due
+
+
+class SourceScheduler:
+    """按源保存抓取间隔并判断是否到期"""
+
+    def __init__(self, state_path: str = 'cache/source-schedule.json',
+                 min_interval: float = DEFAULT_MIN_INTERVAL_MINUTES,
+                 max_interval: float = DEFAULT_MAX_INTERVAL_MINUTES,
+                 tolerance: float = DEFAULT_DUE_TOLERANCE_MINUTES):
+        """
+        加载调度状态
+        Args:
+            state_path: 调度状态文件
+            min_interval: 默认最小抓取间隔（分钟）
+            max_interval: 默认最大抓取间隔（分钟）
+            tolerance: 到期容差（分钟）
+        """
+        self.state_path = state_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.tolerance = timedelta(minutes=tolerance)
+        self.state = load_config(state_path) if os.path.exists(state_path) else {}
+
+    def _bounds(self, source: Dict[str, Any]):
+        """返回源的最小和最大抓取间隔，源配置中的min/max_interval_minutes优先"""
+        min_interval = source.get('min_interval_minutes', self.min_interval)
+        max_interval = max(source.get('max_interval_minutes', self.max_interval), min_interval)
+        return min_interval, max_interval
+
+    def is_due(self, source: Dict[str, Any], now: datetime) -> bool:
+        """
+        判断源本次运行是否需要重新抓取
+        Args:
+            source: RSS源配置
+            now: 当前时间（UTC）
+        Returns:
+            bool: 需要抓取返回True
+        """
+        state = self.state.get(source.get('url', ''))
+        if not state or not state.get('next_due'):
+            return True
+        return now + self.tolerance >= datetime.fromisoformat(state['next_due'])
+
+    def record(self, source: Dict[str, Any], hints: Dict[str, Any], entry_timestamps: List[float],
+               new_entries: int, now: datetime) -> Dict[str, Any]:
+        """
+        记录一次抓取并计算下次到期时间
+        Args:
+            source: RSS源配置
+            hints: 从RSS内容中提取的抓取频率提示
+            entry_timestamps: 条目发布时间（UTC时间戳）
+            new_entries: 本次新增的条目数
+            now: 当前时间（UTC）
+        Returns:
+            更新后的调度状态
+        """
+        url = source.get('url', '')
+        min_interval, max_interval = self._bounds(source)
+        state = dict(self.state.get(url, {}))
+        previous_interval = state.get('interval_minutes')
+
+        # 用指数平滑更新学习到的发布间隔
+        cadence = observed_cadence_minutes(entry_timestamps)
+        if cadence is not None:
+            if state.get('cadence_minutes'):
+                cadence = CADENCE_SMOOTHING * cadence + (1 - CADENCE_SMOOTHING) * state['cadence_minutes']
+            state['cadence_minutes'] = round(cadence, 1)
+
+        # 以发布间隔的一半抓取，没有新内容时逐步放慢
+        if state.get('cadence_minutes'):
+            interval = state['cadence_minutes'] / 2
+        else:
+            interval = previous_interval or min_interval
+        if new_entries == 0 and previous_interval:
+            interval = max(interval, previous_interval * IDLE_GROWTH)
+
+        # RSS自带的提示作为下限
+        interval = max(interval, hints.get('ttl_minutes', 0), hints.get('update_period_minutes', 0))
+        interval = min(max(interval, min_interval), max_interval)
+
+        state['interval_minutes'] = round(interval, 1)
+        state['hints'] = hints
+        state['last_fetch'] = now.isoformat()
+        state['last_new_entries'] = new_entries
+        state['next_due'] = skip_forward(now + timedelta(minutes=interval), hints).isoformat()
+        self.state[url] = state
+        return state
+
+    def save(self) -> bool:
+        """保存调度状态"""
+        return save_json_data(self.state, self.state_path, compact=True)
+
+
+def create_scheduler(collector_config: Dict[str, Any]) -> Optional[SourceScheduler]:
+    """
+    根据收集器配置创建调度器
+    Args:
+        collector_config: config/collector.json内容
+    Returns:
+        调度器，未启用时返回None
+    """
+    schedule_config = collector_config.get('schedule', {})
+    if not schedule_config.get('enabled', False):
+        return None
+    logging.debug("已启用自适应抓取调度")
+    return SourceScheduler(
+        schedule_config.get('state_path', 'cache/source-schedule.json'),
+        schedule_config.get('min_interval_minutes', DEFAULT_MIN_INTERVAL_MINUTES),
+        schedule_config.get('max_interval_minutes', DEFAULT_MAX_INTERVAL_MINUTES),
+        schedule_config.get('due_tolerance_minutes', DEFAULT_DUE_TOLERANCE_MINUTES)
+    )
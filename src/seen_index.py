@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+已收集条目索引
+用SQLite持久化每条新闻的标识（guid或规范化链接的哈希）和首次出现时间，
+用于在增量模式下只输出新增或内容有变化的新闻
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+# 条目状态
+STATUS_NEW = 'new'
+STATUS_CHANGED = 'changed'
+STATUS_SEEN = 'seen'
+
+# 默认保留期（天），超过该时间未再出现的条目会被清理
+DEFAULT_RETENTION_DAYS = 30
+
+
+def _hash(text: str) -> str:
+    """计算文本的SHA-1摘要"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def normalize_link(link: str) -> str:
+    """
+    规范化链接：去除首尾空白和片段，协议和主机名转为小写
+    Args:
+        link: 原始链接
+    Returns:
+        规范化后的链接
+    """
+    link = (link or '').strip()
+    if not link:
+        return ''
+    parts = urlsplit(link)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ''))
+
+
+def entry_key(item: Dict[str, Any]) -> str:
+    """
+    计算新闻条目的标识：优先使用guid，其次使用规范化链接，最后使用来源和标题
+    Args:
+        item: 新闻条目
+    Returns:
+        条目标识
+    """
+    guid = (item.get('guid') or '').strip()
+    if guid:
+        return 'guid:' + _hash(guid)
+    link = normalize_link(item.get('link', ''))
+    if link:
+        return 'link:' + _hash(link)
+    return 'title:' + _hash(f"{item.get('source', '')}\n{item.get('title', '')}")
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """
+    计算新闻内容摘要，用于判断已见条目是否有更新
+    Args:
+        item: 新闻条目
+    Returns:
+        内容摘要
+    """
+    fields = ('title', 'link', 'description', 'published', 'content')
+    return _hash('\x1f'.join(str(item.get(field, '')) for field in fields))
+
+
+class SeenIndex:
+    """基于SQLite的已收集条目索引"""
+
+    def __init__(self, db_path: str = 'cache/seen_entries.db'):
+        """
+        打开（必要时创建）索引数据库
+        Args:
+            db_path: 数据库文件路径
+        """
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS seen_entries (
+                entry_key TEXT PRIMARY KEY,
+                source TEXT,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_seen_last_seen ON seen_entries (last_seen)')
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def update(self, items: Iterable[Dict[str, Any]], now: float = None) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        将本次收集的条目写入索引，并返回每条的状态
+        Args:
+            items: 新闻条目
+            now: 当前时间戳，默认为time.time()
+        Returns:
+            (条目, 状态) 列表，状态为new/changed/seen
+        """
+        if now is None:
+            now = time.time()
+        results = []
+        cursor = self.conn.cursor()
+        with self.conn:
+            for item in items:
+                key = entry_key(item)
+                digest = content_hash(item)
+                row = cursor.execute(
+                    'SELECT content_hash FROM seen_entries WHERE entry_key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    status = STATUS_NEW
+                    cursor.execute(
+                        'INSERT INTO seen_entries (entry_key, source, content_hash, first_seen, last_seen) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (key, item.get('source', ''), digest, now, now)
+                    )
+                else:
+                    status = STATUS_CHANGED if row[0] != digest else STATUS_SEEN
+                    cursor.execute(
+                        'UPDATE seen_entries SET content_hash = ?, last_seen = ? WHERE entry_key = ?',
+                        (digest, now, key)
+                    )
+                results.append((item, status))
+        return results
+
+    def prune(self, retention_days: int = DEFAULT_RETENTION_DAYS, now: float = None) -> int:
+        """
+        清理长时间未再出现的条目
+        Args:
+            retention_days: 保留天数
+            now: 当前时间戳，默认为time.time()
+        Returns:
+            删除的条目数
+        """
+        if now is None:
+            now = time.time()
+        with self.conn:
+            cursor = self.conn.execute(
+                'DELETE FROM seen_entries WHERE last_seen < ?', (now - retention_days * 86400,)
+            )
+        if cursor.rowcount:
+            logging.info(f"已从条目索引中清理 {cursor.rowcount} 条过期记录")
+        return cursor.rowcount
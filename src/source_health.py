@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+RSS源健康状态跟踪
+根据每次抓取的结果更新源的健康状态，连续失败的源按指数退避推迟下次抓取
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+# 状态：正常抓取
+STATE_HEALTHY = 'healthy'
+# 状态：连续失败，等待退避时间结束
+STATE_BACKOFF = 'backoff'
+
+
+def load_health_options(health_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    从health-check.json配置生成健康检查选项
+    Args:
+        health_config: 健康检查配置
+    Returns:
+        健康检查选项，未启用时返回None
+    """
+    if not health_config.get('enabled', False):
+        return None
+    return {
+        'backoff_base': timedelta(minutes=health_config.get('backoff_base_minutes', 30)),
+        'backoff_max': timedelta(hours=health_config.get('backoff_max_hours', 24)),
+        'backoff_multiplier': health_config.get('backoff_multiplier', 2),
+        'auto_disable': health_config.get('auto_disable', True)
+    }
+
+
+def new_health_status() -> Dict[str, Any]:
+    """创建初始健康状态"""
+    return {
+        'state': STATE_HEALTHY,
+        'consecutive_failures': 0,
+        'next_attempt_at': None,
+        'last_check': None,
+        'last_success': None,
+        'last_status_code': None,
+        'last_error': None,
+        'last_latency_ms': None,
+        'last_bytes': None,
+        'total_successes': 0,
+        'total_failures': 0
+    }
+
+
+def get_health_status(health_status: Dict[str, Any], url: str) -> Dict[str, Any]:
+    """
+    获取源的健康状态副本，兼容旧版failures/disabled格式
+    Args:
+        health_status: 全部源的健康状态
+        url: 源地址
+    Returns:
+        该源的健康状态
+    """
+    status = new_health_status()
+    stored = health_status.get(url) or {}
+    if 'state' in stored:
+        status.update(stored)
+    elif stored:
+        # 旧格式：失败计数迁移为连续失败次数，禁用状态在下次运行时重新尝试
+        status['consecutive_failures'] = stored.get('failures', 0)
+        status['last_check'] = stored.get('last_check')
+    return status
+
+
+def is_due(status: Dict[str, Any], now: datetime) -> bool:
+    """
+    判断源当前是否可以抓取
+    Args:
+        status: 源的健康状态
+        now: 当前时间
+    Returns:
+        bool: 不在退避期内返回True
+    """
+    if status['state'] != STATE_BACKOFF or not status['next_attempt_at']:
+        return True
+    return now >= datetime.fromisoformat(status['next_attempt_at'])
+
+
+def backoff_delay(consecutive_failures: int, options: Dict[str, Any]) -> timedelta:
+    """
+    计算退避时长：base * multiplier^(n-1)，不超过backoff_max
+    Args:
+        consecutive_failures: 连续失败次数
+        options: 健康检查选项
+    Returns:
+        退避时长
+    """
+    exponent = max(consecutive_failures - 1, 0)
+    delay = options['backoff_base'] * (options['backoff_multiplier'] ** exponent)
+    return min(delay, options['backoff_max'])
+
+
+def record_fetch_result(status: Dict[str, Any], fetch_result: Dict[str, Any],
+                        now: datetime, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    根据抓取结果更新健康状态
+    Args:
+        status: 源的健康状态（原地更新）
+        fetch_result: 抓取结果，包含ok、status_code、error、latency_ms、bytes
+        now: 当前时间
+        options: 健康检查选项
+    Returns:
+        更新后的健康状态
+    """
+    status['last_check'] = now.isoformat()
+    status['last_status_code'] = fetch_result.get('status_code')
+    status['last_latency_ms'] = fetch_result.get('latency_ms')
+    status['last_bytes'] = fetch_result.get('bytes')
+    if fetch_result.get('ok'):
+        status['state'] = STATE_HEALTHY
+        status['consecutive_failures'] = 0
+        status['next_attempt_at'] = None
+        status['last_success'] = now.isoformat()
+        status['last_error'] = None
+        status['total_successes'] += 1
+        return status
+
+    status['consecutive_failures'] += 1
+    status['total_failures'] += 1
+    status['last_error'] = fetch_result.get('error')
+    if options['auto_disable']:
+        status['state'] = STATE_BACKOFF
+        delay = backoff_delay(status['consecutive_failures'], options)
+        status['next_attempt_at'] = (now + delay).isoformat()
+    return status
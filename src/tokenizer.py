@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+中英文分词
+按子串匹配中文关键词会命中跨越词边界的位置（"发展中国家"含"中国"，"手指数量"含"指数"），
+因此先把文本切分为词，再按词匹配：
+- 文本按空白和标点分为若干段，每段由单元组成：连续的字母数字为一个单元（转小写），每个中日韩文字为一个单元
+- 每段用词典做最少词数的切分，词数相同时单字词少的优先，再相同时靠前的词较长的优先
+- 词典由config/dictionary.txt和关键词规则中的全部关键词组成，不依赖外部分词模型
+- 建立索引时，长词开头和结尾的词典词作为子词一并索引（"阿里巴巴集团"也能按"阿里巴巴"查到），
+  不在词典中的连续单字按相邻两字（bigram）索引，未登录词也能查到
+
+每个词记为 (词, 起始单元, 结束单元, 起始字符, 结束字符)：单元位置用于短语匹配，字符位置用于NEAR距离
+"""
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+DEFAULT_DICTIONARY_PATH = 'config/dictionary.txt'
+
+CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'
+# 段：不含空白和标点的连续文字；单元：单个中日韩文字，或连续的字母数字
+_SEGMENT_RE = re.compile(r'[^\W_]+')
+_UNIT_RE = re.compile(f'[{CJK_CHARS}]|[^\\W_{CJK_CHARS}]+')
+_CJK_RE = re.compile(f'[{CJK_CHARS}]')
+_NON_CJK_RE = re.compile(f'[^{CJK_CHARS}]')
+
+# (词, 起始单元, 结束单元, 起始字符, 结束字符)
+Token = Tuple[str, int, int, int, int]
+
+
+def load_dictionary(path: str = DEFAULT_DICTIONARY_PATH) -> List[str]:
+    """
+    读取词典，词之间以空白分隔，#之后为注释
+    Args:
+        path: 词典文件路径
+    Returns:
+        词列表，文件不存在时为空列表
+    """
+    if not os.path.exists(path):
+        logging.warning(f"词典文件不存在: {path}，只使用关键词作为词典")
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [word for line in f for word in line.split('#', 1)[0].split()]
+
+
+class Tokenizer:
+    """基于词典的分词器，未登录的中文按相邻两字切分"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        """
+        Args:
+            words: 词典中的词，按与文本相同的方式切分为单元后保存，不区分大小写
+        """
+        self.words = set()
+        # 词的前缀（两个单元及以上），切分时前缀不存在即停止向后查找
+        self.prefixes = set()
+        self.max_units = 1
+        for word in words:
+            units = [match.group().lower() for match in _UNIT_RE.finditer(word)]
+            # 只有一个单元的词不影响切分结果
+            if len(units) > 1:
+                self.words.add(''.join(units))
+                self.prefixes.update(''.join(units[:length]) for length in range(2, len(units) + 1))
+                self.max_units = max(self.max_units, len(units))
+
+    @staticmethod
+    def _units(text: str) -> List[Tuple[str, int, int]]:
+        """切分单元，返回 (单元, 起始字符, 结束字符) 列表"""
+        return [(match.group().lower(), match.start(), match.end()) for match in _UNIT_RE.finditer(text)]
+
+    def _split(self, units: List[str]) -> List[int]:
+        """
+        对一段单元做最少词数的切分
+        Returns:
+            每个词的单元数
+        """
+        count = len(units)
+        # best[i]: 从第i个单元到结尾的最优切分的 (词数, 单字词数)，lengths[i]为第一个词的单元数
+        best = [(0, 0)] * (count + 1)
+        lengths = [1] * count
+        for start in range(count - 1, -1, -1):
+            cost, singles = best[start + 1]
+            best[start] = (cost + 1, singles + 1)
+            word = units[start]
+            for length in range(2, min(self.max_units, count - start) + 1):
+                word += units[start + length - 1]
+                if word not in self.prefixes:
+                    break
+                if word not in self.words:
+                    continue
+                cost, singles = best[start + length]
+                candidate = (cost + 1, singles)
+                # 从短到长遍历，代价相同时较长的词后出现，用<=使其优先
+                if candidate <= best[start]:
+                    best[start] = candidate
+                    lengths[start] = length
+        result = []
+        position = 0
+        while position < count:
+            result.append(lengths[position])
+            position += lengths[position]
+        return result
+
+    def segment(self, text: str) -> List[Token]:
+        """
+        切分文本
+        Args:
+            text: 文本
+        Returns:
+            按位置排列的词，不含子词和bigram
+        """
+        tokens = []
+        position = 0
+        for match in _SEGMENT_RE.finditer(text or ''):
+            segment = match.group()
+            offset = match.start()
+            # 不含中日韩文字的段（英文单词、数字）只有一个单元
+            if not _CJK_RE.search(segment):
+                tokens.append((segment.lower(), position, position + 1, offset, match.end()))
+                position += 1
+                continue
+            if _NON_CJK_RE.search(segment):
+                units = self._units(segment)
+            else:
+                # 只含中日韩文字的段每个字是一个单元
+                units = [(char, index, index + 1) for index, char in enumerate(segment)]
+            index = 0
+            for length in self._split([unit[0] for unit in units]):
+                word = ''.join(unit[0] for unit in units[index:index + length])
+                tokens.append((word, position, position + length,
+                               offset + units[index][1], offset + units[index + length - 1][2]))
+                index += length
+                position += length
+        return tokens
+
+    def tokenize(self, text: str) -> List[Token]:
+        """
+        切分用于索引的词：切分结果、长词开头和结尾的词典子词，以及未登录的连续单字组成的bigram
+        Args:
+            text: 文本
+        Returns:
+            词列表，子词和bigram与所在位置的词重叠
+        """
+        tokens = self.segment(text)
+        extra = []
+        previous = None
+        for token in tokens:
+            word, start, end = token[0], token[1], token[2]
+            if end - start > 2:
+                extra.extend(self._subwords(token))
+            # 紧挨着且都是单个中文字的词组成bigram
+            if (previous is not None and previous[4] == token[3] and end - start == 1
+                    and previous[2] - previous[1] == 1 and _CJK_RE.match(word) and _CJK_RE.match(previous[0])):
+                extra.append((previous[0] + word, previous[1], end, previous[3], token[4]))
+            previous = token
+        return tokens + extra
+
+    def _subwords(self, token: Token) -> List[Token]:
+        """
+        长词开头或结尾的词典词（不含整个词本身）
+        词中间的词往往跨越了内部的词边界（"发展中国家"中的"中国"），不作为子词
+        """
+        word, start, end, char_start, char_end = token
+        units = self._units(word)
+        count = len(units)
+        spans = [(0, length) for length in range(2, count)] + [(count - length, count) for length in range(2, count)]
+        subwords = []
+        for first, last in spans:
+            sub = ''.join(unit[0] for unit in units[first:last])
+            if sub in self.words:
+                subwords.append((sub, start + first, start + last, char_start + units[first][1],
+                                 char_start + units[last - 1][2]))
+        return subwords
+
+    def query(self, text: str) -> List[Tuple[str, int]]:
+        """
+        将查询词切分为短语查询用的词
+        未登录的连续单字改用bigram，与索引中的bigram对应
+        Args:
+            text: 查询词
+        Returns:
+            (词, 相对第一个词的单元偏移) 列表，没有可查询的内容时为空列表
+        """
+        tokens = self.segment(text)
+        if not tokens:
+            return []
+        result = []
+        run = []
+
+        def flush():
+            if len(run) == 1:
+                result.append((run[0][0], run[0][1]))
+            else:
+                result.extend((run[i][0] + run[i + 1][0], run[i][1]) for i in range(len(run) - 1))
+            run.clear()
+
+        for token in tokens:
+            if token[2] - token[1] == 1 and _CJK_RE.match(token[0]):
+                if run and run[-1][4] != token[3]:
+                    flush()
+                run.append(token)
+                continue
+            if run:
+                flush()
+            result.append((token[0], token[1]))
+        if run:
+            flush()
+        base = tokens[0][1]
+        return [(word, offset - base) for word, offset in result]
+
+
+@lru_cache(maxsize=1)
+def _dictionary_words(path: str) -> Tuple[str, ...]:
+    return tuple(load_dictionary(path))
+
+
+@lru_cache(maxsize=8)
+def _build_tokenizer(words: Tuple[str, ...], path: str) -> Tokenizer:
+    return Tokenizer(_dictionary_words(path) + words)
+
+
+def get_tokenizer(words: Iterable[str] = (), dictionary_path: str = DEFAULT_DICTIONARY_PATH) -> Tokenizer:
+    """
+    获取由词典文件和额外的词组成的分词器，相同的参数只构造一次
+    Args:
+        words: 额外的词，通常是关键词规则中的全部关键词
+        dictionary_path: 词典文件路径
+    Returns:
+        Tokenizer: 分词器
+    """
+    return _build_tokenizer(tuple(sorted(set(words))), dictionary_path)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+按规范化链接去重
+同一篇文章经不同的源（或同一网站的多个分类源）收录时，链接往往只差跟踪参数、协议或结尾的斜杠。
+收集时按源的顺序逐条送入EntryDeduplicator，只保留每个规范化链接第一次出现的条目，
+重复条目合并到已保留的条目中：发布时间取最早的，分类取并集
+"""
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from date_parser import item_timestamp
+from seen_index import entry_key
+
+# 默认去除的跟踪参数，以*结尾的表示前缀
+DEFAULT_TRACKING_PARAMS = ['utm_*', 'from', 'ref', 'spm', 'fbclid', 'gclid', 'rss', 'af', 'rft_dat']
+# 参数值为这些时视为来源标记（如 f=rss、from=feed），不论参数名
+DEFAULT_TRACKING_VALUES = ['rss', 'feed', 'atom']
+_DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+class UrlCanonicalizer:
+    """链接规范化"""
+
+    def __init__(self, tracking_params: Iterable[str] = DEFAULT_TRACKING_PARAMS,
+                 tracking_values: Iterable[str] = DEFAULT_TRACKING_VALUES):
+        """
+        Args:
+            tracking_params: 需要去除的参数名，不区分大小写，以*结尾的表示前缀
+            tracking_values: 参数值为这些（不区分大小写）时同样去除
+        """
+        params = [param.lower() for param in tracking_params]
+        self.exact_params = {param for param in params if not param.endswith('*')}
+        self.prefix_params = tuple(param[:-1] for param in params if param.endswith('*'))
+        self.tracking_values = {value.lower() for value in tracking_values}
+
+    def is_tracking(self, name: str, value: str) -> bool:
+        """判断查询参数是否为跟踪参数"""
+        name = name.lower()
+        return (name in self.exact_params or name.startswith(self.prefix_params)
+                or value.lower() in self.tracking_values)
+
+    def canonical(self, link: str) -> str:
+        """
+        规范化链接：统一为https，主机名转小写并去除默认端口，去除结尾的斜杠、片段和跟踪参数，
+        其余参数按名称排序
+        Args:
+            link: 原始链接
+        Returns:
+            规范化后的链接，无法解析时返回去除首尾空白的原链接
+        """
+        link = (link or '').strip()
+        if not link:
+            return ''
+        try:
+            parts = urlsplit(link)
+            port = parts.port
+        except ValueError:
+            return link
+        scheme = parts.scheme.lower()
+        if scheme not in _DEFAULT_PORTS:
+            return link
+        host = (parts.hostname or '').rstrip('.')
+        if port is not None and str(port) != _DEFAULT_PORTS[scheme]:
+            host = f'{host}:{port}'
+        path = parts.path.rstrip('/') or '/'
+        query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                       if not self.is_tracking(name, value))
+        return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+class EntryDeduplicator:
+    """流式的按链接去重，只保存规范化链接的摘要和已保留条目的位置"""
+
+    def __init__(self, canonicalizer: Optional[UrlCanonicalizer] = None):
+        self.canonicalizer = canonicalizer or UrlCanonicalizer()
+        self.items: List[Dict[str, Any]] = []
+        # 规范化链接的摘要 -> (条目在items中的位置, 发布时间戳)
+        self._index: Dict[bytes, tuple] = {}
+        self.duplicates = 0
+
+    def key(self, item: Dict[str, Any]) -> bytes:
+        """条目的去重键：规范化链接的摘要，没有链接时使用条目标识"""
+        link = self.canonicalizer.canonical(item.get('link', ''))
+        text = 'url:' + link if link else entry_key(item)
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """
+        加入一条新闻
+        Args:
+            item: 新闻条目
+        Returns:
+            bool: 新条目返回True，与已保留的条目重复（已合并）返回False
+        """
+        key = self.key(item)
+        existing = self._index.get(key)
+        if existing is None:
+            self._index[key] = (len(self.items), item_timestamp(item))
+            self.items.append(item)
+            return True
+        self.duplicates += 1
+        position, timestamp = existing
+        kept = self.items[position]
+        # 保留最早的发布时间
+        other_timestamp = item_timestamp(item)
+        if other_timestamp is not None and (timestamp is None or other_timestamp < timestamp):
+            kept['published'] = item['published']
+            kept['published_ts'] = other_timestamp
+            self._index[key] = (position, other_timestamp)
+        # 合并分类
+        category = item.get('category')
+        if category and category != kept.get('category'):
+            categories = kept.setdefault('categories', [kept.get('category')])
+            if category not in categories:
+                categories.append(category)
+        return False
+
+    def extend(self, items: Iterable[Dict[str, Any]]):
+        """依次加入多条新闻"""
+        for item in items:
+            self.add(item)
+
+
+def display_categories(item: Dict[str, Any], default: str = '未分类') -> str:
+    """返回用于展示的分类，合并过的条目列出全部分类"""
+    return ' / '.join(item.get('categories') or [item.get('category') or default])
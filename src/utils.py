@@ -1,11 +1,15 @@
-import json
+import html
 import os
 import logging
+import re
 import sys
 import yaml
 from jsonschema import validate
-from datetime import datetime
 from logging.handlers import TimedRotatingFileHandler
+from atomic_io import atomic_write
+import json_backend
+from date_parser import format_timestamp, parse_timestamp
+from keyword_matcher import get_keyword_matcher
 
 
 def setup_logging():
@@ -54,7 +58,7 @@ def load_config(config_path, schema_path=None):
             if config_path.endswith('.yaml') or config_path.endswith('.yml'):
                 config = yaml.safe_load(f)
             else:
-                config = json.load(f)
+                config = json_backend.load(f)
     except Exception as e:
         logging.error(f"加载配置文件失败: {e}")
         return {}
@@ -62,7 +66,7 @@ def load_config(config_path, schema_path=None):
     if schema_path and os.path.exists(schema_path):
         try:
             with open(schema_path, 'r', encoding='utf-8') as f:
-                schema = json.load(f)
+                schema = json_backend.load(f)
             validate(config, schema)
         except Exception as e:
             logging.error(f"配置文件验证失败: {e}")
@@ -75,12 +79,19 @@ def load_json_config(file_path):
     return load_config(file_path)
 
 
-def save_json_data(data, file_path):
-    """保存数据到JSON文件"""
+def save_json_data(data, file_path, compact=False):
+    """保存数据到JSON文件，原子写入，内容未变化时不改写文件
+
+    Args:
+        data: 要保存的数据
+        file_path (str): 文件路径
+        compact (bool, optional): 不缩进，用于只由程序读取的文件. Defaults to False.
+
+    Returns:
+        bool: 保存成功返回True
+    """
     try:
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write(file_path, json_backend.dumps(data, compact))
         return True
     except Exception as e:
         logging.error(f"保存JSON文件失败: {e}")
@@ -91,22 +102,21 @@ def contains_keywords(text, keywords):
     """检查文本是否包含关键词
     Args:
         text (str): 要检查的文本
-        keywords (list): 关键词列表
+        keywords (list | KeywordMatcher): 关键词列表或已编译的匹配器
     Returns:
         bool: 如果包含任一关键词返回True
     """
     if not text or not keywords:
         return False
-    text_lower = text.lower()
-    return any(keyword.lower() in text_lower for keyword in keywords)
+    return get_keyword_matcher(keywords).contains(text)
 
 
 def filter_by_keywords(news_list, keywords, exclude_keywords=None):
     """根据关键词筛选新闻
     Args:
         news_list (list): 新闻列表
-        keywords (list): 包含关键词列表
-        exclude_keywords (list, optional): 排除关键词列表. Defaults to None.
+        keywords (list | KeywordMatcher): 包含关键词列表
+        exclude_keywords (list | KeywordMatcher, optional): 排除关键词列表. Defaults to None.
     Returns:
         list: 筛选后的新闻列表
     """
@@ -114,32 +124,42 @@ def filter_by_keywords(news_list, keywords, exclude_keywords=None):
         return []
     if not keywords:
         return news_list
+    # 关键词只编译一次，每条新闻只扫描一遍
+    include_matcher = get_keyword_matcher(keywords)
+    exclude_matcher = get_keyword_matcher(exclude_keywords) if exclude_keywords else None
     filtered = []
     for news in news_list:
-        title = news.get('title', '')
-        description = news.get('description', '')
-        content = title
+        content = news.get('title', '')
         # 检查是否包含关键词
-        if contains_keywords(content, keywords):
+        if include_matcher.contains(content):
             # 检查是否包含排除关键词
-            if exclude_keywords and contains_keywords(content, exclude_keywords):
+            if exclude_matcher and exclude_matcher.contains(content):
                 continue
             filtered.append(news)
     return filtered
 
 
-def format_datetime(dt_str, input_format="%a, %d %b %Y %H:%M:%S %z",
-                   output_format="%Y-%m-%d %H:%M:%S"):
-    """格式化日期时间字符串
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def strip_html(text):
+    """去除HTML标签和实体，合并空白
     Args:
-        dt_str (str): 输入的日期时间字符串
-        input_format (str): 输入格式. Defaults to "%a, %d %b %Y %H:%M:%S %z"
-        output_format (str): 输出格式. Defaults to "%Y-%m-%d %H:%M:%S"
+        text (str): 可能含HTML的文本
     Returns:
-        str: 格式化后的日期时间字符串
+        str: 纯文本
     """
-    try:
-        dt = datetime.strptime(dt_str, input_format)
-        return dt.strftime(output_format)
-    except (ValueError, TypeError):
-        return dt_str
+    return _SPACE_RE.sub(' ', html.unescape(_HTML_TAG_RE.sub(' ', text or ''))).strip()
+
+
+def format_datetime(value, output_format="%Y-%m-%d %H:%M:%S"):
+    """格式化日期时间
+    Args:
+        value (int | str): UTC时间戳，或date_parser支持的日期字符串
+        output_format (str): 输出格式（UTC+8）. Defaults to "%Y-%m-%d %H:%M:%S"
+    Returns:
+        str: 格式化后的日期时间字符串，无法解析时原样返回
+    """
+    timestamp = value if isinstance(value, (int, float)) else parse_timestamp(value or '')
+    return format_timestamp(timestamp, output_format, default=value)